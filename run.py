@@ -9,16 +9,16 @@ from datetime import datetime, timedelta
 from io import BytesIO
 from pathlib import Path
 from typing import Iterable
-from decimal import Decimal
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import yaml
 
-from src import allocator, async_data, ledger, risk, score
+from src import allocator, async_data, backtest, costs, denom, fundamentals as fund, ledger, meo, risk, score, sweep
+from src.backtest import FEE_BP
 
-FEE_BP = 12.0  # fixed commission in basis points
-PIT_LAG_DAYS = 45  # backtest point-in-time lag for fundamentals
+PIT_LAG_DAYS = 90  # period end to 10-K filing; rows are dated by fiscal period
 
 
 def load_config(path: str = "config.yml") -> dict:
@@ -28,47 +28,22 @@ def load_config(path: str = "config.yml") -> dict:
     return yaml.safe_load(cfg_path.read_text())
 
 
-async def pull_data(tickers: list[str], start: str, end: str) -> tuple[pd.DataFrame, pd.DataFrame]:
-    prices = await async_data.fetch_prices(tickers, start, end)
-    fundamentals = await async_data.fetch_fundamentals(tickers)
+async def pull_data(
+    tickers: list[str], start: str, end: str, cfg: dict
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    db_path = cfg.get("db_path", "portfolio.db")
+    prices = await async_data.fetch_prices(tickers, start, end, db_path)
+    fundamentals = await async_data.fetch_fundamentals(
+        tickers, db_path, int(cfg.get("fundamentals_ttl_days", 365))
+    )
     return prices, fundamentals
 
 
-async def gather_meo_series(dates: Iterable[pd.Timestamp]) -> pd.Series:
-    """Return MEΩ prices for each date."""
-    async def _fetch(d: pd.Timestamp) -> float:
-        s = await async_data.fetch_meo(d.date())
-        return float(s.get("meo_usd", float("nan")))
-
-    prices = await asyncio.gather(*[_fetch(d) for d in dates])
-    return pd.Series(prices, index=pd.DatetimeIndex(dates))
-
-
-def latest_sigma(price_df: pd.DataFrame, date: pd.Timestamp, method: str, window: int, denom: pd.Series) -> pd.Series:
-    levels = price_df.columns.levels[0]
-    sigmas: dict[str, float] = {}
-    for t in levels:
-        series = price_df[t]["adj_close"].loc[:date]
-        if series.empty:
-            sigmas[t] = float("nan")
-            continue
-        denom_series = denom.loc[series.index]
-        if method == "garch":
-            s = risk.garch_sigma(series, denom_series)
-        else:
-            s = risk.realised_sigma(series, window, denom_series)
-        sigmas[t] = s.iloc[-1] if not s.empty else float("nan")
-    return pd.Series(sigmas)
-
-
-def size_cash(nav: float, cfg: dict, budget: float | None, pct: float | None) -> float:
-    if budget is not None:
-        return float(budget)
-    if pct is not None:
-        return nav * float(pct)
-    if "weekly_pct" in cfg:
-        return nav * float(cfg["weekly_pct"])
-    return float(cfg.get("weekly_buy", 100))
+async def gather_meo_series(
+    dates: Iterable[pd.Timestamp], db_path: str = "portfolio.db"
+) -> pd.Series:
+    """Return MEΩ prices for each date, reusing benchmarks already stored."""
+    return await async_data.fetch_meo_history(dates, db_path)
 
 
 def generate_report(dates: Iterable[datetime], navs: Iterable[float], path: str) -> None:
@@ -86,118 +61,122 @@ def generate_report(dates: Iterable[datetime], navs: Iterable[float], path: str)
     Path(path).write_text(html)
 
 
-def run_backtest(args: argparse.Namespace, cfg: dict) -> None:
-    start = args.start
-    end = args.end
+def load_inputs(
+    start: str, end: str, cfg: dict, with_meo: bool
+) -> backtest.BacktestInputs:
     tickers = cfg.get("tickers", [])
-    prices, fundamentals = asyncio.run(pull_data(tickers, start, end))
-    fundamentals = fundamentals.sort_values("date")
-    adv10 = prices.xs("volume", level=1, axis=1).rolling(10).mean()
-    if args.denom == "MEΩ":
-        meo_series = asyncio.run(gather_meo_series(prices.index))
+    prices, fundamentals = asyncio.run(pull_data(tickers, start, end, cfg))
+    if with_meo:
+        meo_series = asyncio.run(
+            gather_meo_series(prices.index, cfg.get("db_path", "portfolio.db"))
+        )
     else:
         meo_series = pd.Series(1.0, index=prices.index)
+    return backtest.prepare(
+        prices,
+        fundamentals,
+        meo_series,
+        start,
+        end,
+        lag=timedelta(days=PIT_LAG_DAYS),
+        rules=score.RuleSet.from_config(cfg),
+    )
+
+
+def run_backtest(args: argparse.Namespace, cfg: dict) -> None:
+    inputs = load_inputs(args.start, args.end, cfg, args.denom == "MEΩ")
     book = ledger.Ledger(cfg.get("db_path", "portfolio.db"))
-    nav_hist: list[tuple[datetime, float]] = []
-    last = book.last_ticker()
-    nav = book.nav()
-    for date in prices.index:
-        if date < pd.to_datetime(start) or date > pd.to_datetime(end):
-            continue
-        if date.weekday() != 4:  # weekly on Friday
-            continue
-        f = (
-            fundamentals[fundamentals["date"] <= date - timedelta(days=PIT_LAG_DAYS)]
-            .drop_duplicates("ticker", keep="last")
-            .set_index("ticker")
-        )
-        if f.empty:
-            continue
-        scores = score.apply_scores(f)
-        sigma = latest_sigma(prices, date, cfg.get("sigma_method", "garch"), int(cfg.get("risk_window", 63)), meo_series)
-        best = allocator.pick_asset(scores, sigma, last)
-        if not best:
-            continue
-        price = prices.at[date, (best, "adj_close")]
-        adv = adv10.at[date, best]
-        if args.denom == "MEΩ":
-            nav = float(
-                book.nav_meo(
-                    prices.xs("adj_close", level=1, axis=1).loc[date],
-                    meo_series.at[date],
-                )
-            )
-        else:
-            nav = book.nav()
-        cash = size_cash(nav, cfg, args.budget, args.pct)
-        budget_meo = Decimal(str(cash)) / Decimal(str(meo_series.at[date]))
-        qty = allocator.size_trade(price, budget_meo, meo_series.at[date])
-        if qty and allocator.decision_block(qty, adv, FEE_BP, float(cfg.get("slip_cap_bp", 35))):
-            fee = price * float(qty) * FEE_BP / 10000
-            book.book_trade(date.to_pydatetime(), best, qty, price, fee)
-            if args.denom == "MEΩ":
-                nav = float(
-                    book.nav_meo(
-                        prices.xs("adj_close", level=1, axis=1).loc[date],
-                        meo_series.at[date],
-                    )
-                )
-            else:
-                nav = book.nav()
-            nav_hist.append((date.to_pydatetime(), nav))
-            last = best
-    if nav_hist:
-        dates, navs = zip(*nav_hist)
-        generate_report(dates, navs, cfg.get("report_path", "reports/latest.html"))
+    backtest.simulate(inputs, cfg, args.denom, args.budget, args.pct, book=book)
+    window = inputs.close.loc[pd.to_datetime(args.start) : pd.to_datetime(args.end)]
+    curve = book.daily_nav(window)
+    book.close()
+    if not book.holdings().empty:
+        navs = inputs.numeraire(args.denom).convert(curve["nav"])
+        generate_report(curve.index, navs, cfg.get("report_path", "reports/latest.html"))
+
+
+def parse_grid(items: Iterable[str]) -> dict[str, list]:
+    """Parse ``key=v1,v2`` arguments into a sweep grid."""
+    grid: dict[str, list] = {}
+    for item in items:
+        key, _, values = item.partition("=")
+        grid[key.strip()] = [yaml.safe_load(v) for v in values.split(",")]
+    return grid
+
+
+def run_sweep(args: argparse.Namespace, cfg: dict) -> None:
+    grid = parse_grid(args.grid)
+    denoms = grid.get("denom", [args.denom])
+    inputs = load_inputs(args.start, args.end, cfg, "MEΩ" in denoms)
+    results = sweep.run_sweep(inputs, {**cfg, "denom": args.denom}, grid, args.workers)
+    print(results.to_string(index=False))
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        results.to_csv(args.out, index=False)
 
 
 def run_trade(args: argparse.Namespace, cfg: dict) -> None:
     end = datetime.utcnow().date().isoformat()
     start = (datetime.utcnow() - timedelta(days=365)).date().isoformat()
     tickers = cfg.get("tickers", [])
-    prices, fundamentals = asyncio.run(pull_data(tickers, start, end))
-    fundamentals = fundamentals.sort_values("date")
-    adv10 = prices.xs("volume", level=1, axis=1).rolling(10).mean()
+    prices, fundamentals = asyncio.run(pull_data(tickers, start, end, cfg))
+    store = fund.PointInTimeStore(fundamentals)
+    cost_model = costs.CostModel(
+        prices.xs("volume", level=1, axis=1),
+        FEE_BP,
+        int(cfg.get("adv_window", costs.ADV_WINDOW)),
+    )
     if args.denom == "MEΩ":
-        meo_series = asyncio.run(gather_meo_series(prices.index))
+        meo_series = asyncio.run(
+            gather_meo_series(prices.index, cfg.get("db_path", "portfolio.db"))
+        )
     else:
         meo_series = pd.Series(1.0, index=prices.index)
     book = ledger.Ledger(cfg.get("db_path", "portfolio.db"))
     today = prices.index[-1]
     if args.denom == "MEΩ":
-        nav = float(
-            book.nav_meo(
-                prices.xs("adj_close", level=1, axis=1).loc[today],
-                meo_series.at[today],
-            )
+        numeraire = denom.Denominator.meo_units(meo_series)
+    else:
+        numeraire = denom.Denominator.fiat(args.denom, prices.index[0].date(), today.date())
+    per_usd = numeraire.factors(prices.index)[-1]
+    if args.denom == "MEΩ":
+        nav = book.value_meo(
+            prices.xs("adj_close", level=1, axis=1).loc[today], meo_series.at[today]
         )
     else:
-        nav = book.nav()
+        nav = book.nav() * per_usd
     last = book.last_ticker()
-    f = (
-        fundamentals[fundamentals["date"] <= today - timedelta(days=PIT_LAG_DAYS)]
-        .drop_duplicates("ticker", keep="last")
-        .set_index("ticker")
+    f = store.as_of(today - timedelta(days=PIT_LAG_DAYS))
+    scores = score.apply_scores(f, score.RuleSet.from_config(cfg))
+    stored = book.risk_state(numeraire.name)
+    online = risk.OnlineRisk.from_frame(
+        stored[stored["ticker"].isin(tickers)],
+        int(cfg.get("risk_window", 63)),
+        refit_freq=cfg.get("garch_refit", "M"),
     )
-    scores = score.apply_scores(f)
-    sigma = latest_sigma(prices, today, cfg.get("sigma_method", "garch"), int(cfg.get("risk_window", 63)), meo_series)
-    best = allocator.pick_asset(scores, sigma, last)
+    # log returns of the numéraire against USD feed the running FX beta
+    unit_usd = pd.Series(1.0 / numeraire.factors(prices.index), index=prices.index)
+    fx_returns = np.log(unit_usd).diff()
+    online.catch_up(numeraire.convert(prices.xs("adj_close", level=1, axis=1)), fx_returns)
+    book.save_risk_state(online.to_frame(), numeraire.name)
+    sigma = online.sigma(cfg.get("sigma_method", "garch"))
+    best = allocator.pick_asset(scores, sigma.reindex(tickers), last)
     if not best:
         print("No suitable asset to trade.")
         return
     price = prices.at[today, (best, "adj_close")]
-    adv = adv10.at[today, best]
-    cash = size_cash(nav, cfg, args.budget, args.pct)
-    budget_meo = Decimal(str(cash)) / Decimal(str(meo_series.at[today]))
-    qty = allocator.size_trade(price, budget_meo, meo_series.at[today])
-    if qty and allocator.decision_block(qty, adv, FEE_BP, float(cfg.get("slip_cap_bp", 35))):
-        fee = price * float(qty) * FEE_BP / 10000
+    max_qty = cost_model.max_qty(float(cfg.get("slip_cap_bp", 35))).at[today, best]
+    cash = backtest.size_cash(nav, cfg, args.budget, args.pct)
+    budget_units = 0.0 if pd.isna(per_usd) else cash * per_usd
+    qty = float(allocator.size_trades(price, budget_units, 1.0 / per_usd))
+    if qty and qty <= max_qty:
+        fee = price * qty * FEE_BP / 10000
         book.book_trade(today.to_pydatetime(), best, qty, price, fee)
-    nav_df = book.con.execute("SELECT ts, nav FROM positions ORDER BY ts").df()
-    if not nav_df.empty:
-        if args.denom == "MEΩ":
-            nav_df["nav"] = nav_df["nav"] / meo_series.reindex(pd.to_datetime(nav_df["ts"])).values
-        generate_report(pd.to_datetime(nav_df["ts"]), nav_df["nav"], cfg.get("report_path", "reports/latest.html"))
+    curve = book.daily_nav(prices.xs("adj_close", level=1, axis=1))
+    book.close()
+    if not book.holdings().empty:
+        navs = numeraire.convert(curve["nav"])
+        generate_report(curve.index, navs, cfg.get("report_path", "reports/latest.html"))
 
 
 def main() -> None:
@@ -216,13 +195,31 @@ def main() -> None:
     trade.add_argument("--pct", type=float, help="Cash as fraction of NAV")
     trade.add_argument("--denom", choices=["CHF", "MEΩ"], default="MEΩ", help="Reporting currency")
 
+    sw = sub.add_parser("sweep", help="Backtest a parameter grid in parallel")
+    sw.add_argument("--start", required=True, help="Start date YYYY-MM-DD")
+    sw.add_argument("--end", required=True, help="End date YYYY-MM-DD")
+    sw.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="KEY=V1,V2",
+        help="Config key to sweep, e.g. risk_window=21,63 or denom=CHF,MEΩ",
+    )
+    sw.add_argument("--denom", choices=["CHF", "MEΩ"], default="MEΩ", help="Default reporting currency")
+    sw.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    sw.add_argument("--out", help="Optional CSV path for the results table")
+
     args = parser.parse_args()
     cfg = load_config()
+    if cfg.get("meo_cache_dir"):
+        meo.configure_cache(directory=cfg["meo_cache_dir"])
 
     if args.cmd == "backtest":
         run_backtest(args, cfg)
     elif args.cmd == "trade":
         run_trade(args, cfg)
+    elif args.cmd == "sweep":
+        run_sweep(args, cfg)
 
 
 if __name__ == "__main__":
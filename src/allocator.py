@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import warnings
 from decimal import Decimal, ROUND_HALF_UP
 
+import numpy as np
 import pandas as pd
 
+from . import costs
+
 
 def pick_asset(
     scores: pd.Series, sigma: pd.Series, last_winner: str | None = None
@@ -30,6 +34,91 @@ def pick_asset(
     return str(best.idxmax())
 
 
+def _argbest(scores: np.ndarray, sigma: np.ndarray, eligible: np.ndarray) -> np.ndarray:
+    masked = np.where(eligible, scores, -np.inf)
+    top = masked.max(axis=1)
+    tied = eligible & (masked == top[:, None])
+    pick = np.where(tied, sigma, np.inf).argmin(axis=1)
+    return np.where(tied.any(axis=1), pick, -1)
+
+
+def rank_candidates(
+    scores: np.ndarray, sigma: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Apply the :func:`pick_asset` rule to every row of ``dates × tickers`` arrays.
+
+    ``scores`` and ``sigma`` share one ticker axis; a NaN score marks a
+    ticker outside that date's cross-section.  Returns the winning column
+    per row and the runner-up that wins when the winner is excluded as the
+    previous pick (``-1`` where no ticker qualifies).  Because the risk gate
+    uses the median of the whole sigma row, excluding any other ticker never
+    changes the winner, so these two columns resolve every case.
+    """
+
+    if not scores.shape[1]:
+        none = np.full(len(scores), -1)
+        return none, none.copy()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN sigma rows
+        median = np.nanmedian(sigma, axis=1)
+    eligible = (sigma <= median[:, None]) & ~np.isnan(scores)
+    first = _argbest(scores, sigma, eligible)
+    rows = np.flatnonzero(first >= 0)
+    eligible[rows, first[rows]] = False
+    return first, _argbest(scores, sigma, eligible)
+
+
+def chain_winners(first: np.ndarray, second: np.ndarray, last: int = -1) -> np.ndarray:
+    """Resolve the exclude-last-winner rule over consecutive dates.
+
+    ``first`` and ``second`` come from :func:`rank_candidates`; ``last`` is
+    the column picked before the first row.  Every pick becomes the
+    excluded ticker for the next row.
+    """
+
+    out = np.full(len(first), -1)
+    for i in range(len(first)):
+        w = int(second[i]) if last >= 0 and first[i] == last else int(first[i])
+        out[i] = w
+        if w >= 0:
+            last = w
+    return out
+
+
+def ticker_axis(score_columns: pd.Index, sigma_columns: pd.Index) -> pd.Index:
+    """Return the ticker axis shared by score and sigma matrices.
+
+    Scored tickers keep their order, which decides exact score and sigma
+    ties as in :func:`pick_asset`; sigma-only tickers follow.
+    """
+
+    return score_columns.append(sigma_columns.difference(score_columns, sort=False))
+
+
+def pick_assets(
+    scores: pd.DataFrame, sigma: pd.DataFrame, last_winner: str | None = None
+) -> pd.Series:
+    """Return :func:`pick_asset` for every date, each excluding the previous pick.
+
+    ``scores`` and ``sigma`` are ``dates × tickers`` frames; tickers missing
+    from a date's scores are NaN.  Matches calling :func:`pick_asset` date by
+    date and feeding each winner back as ``last_winner``.
+    """
+
+    columns = ticker_axis(scores.columns, sigma.columns)
+    first, second = rank_candidates(
+        scores.reindex(columns=columns).to_numpy(dtype=float),
+        sigma.reindex(index=scores.index, columns=columns).to_numpy(dtype=float),
+    )
+    last = columns.get_loc(last_winner) if last_winner in columns else -1
+    winners = chain_winners(first, second, last)
+    return pd.Series(
+        [str(columns[w]) if w >= 0 else None for w in winners],
+        index=scores.index,
+        dtype=object,
+    )
+
+
 def size_trade(price_usd: float, budget_meo: Decimal, meo_usd: float) -> Decimal:
     """Size the trade in units rounded to four decimals."""
 
@@ -45,10 +134,43 @@ def decision_block(
 ) -> bool:
     """Return ``True`` if total cost from fee and slippage is acceptable."""
 
-    if adv10 <= 0:
-        slip_bp = 0.0
-    else:
-        slip_decimal = 0.001 * ((float(quantity) / adv10) ** 0.5)
-        slip_bp = slip_decimal * 10000
-
-    return fee_bp + slip_bp <= cap_bp
+    return bool(costs.cost_bp(float(quantity), adv10, fee_bp) <= cap_bp)
+
+
+def size_trades(
+    price_usd: np.ndarray | float,
+    budget_meo: np.ndarray | float,
+    meo_usd: np.ndarray | float,
+    mask: np.ndarray | None = None,
+) -> np.ndarray:
+    """Vectorised :func:`size_trade` in floats.
+
+    Quantities are rounded half away from zero to four decimals; entries
+    with a non-positive price or MEΩ price, or where ``mask`` is false, are
+    ``0``.  Binary rounding can differ from :func:`size_trade` by one lot
+    at exact half-lot boundaries, so the ledger quantises again when a
+    trade is booked.
+    """
+
+    price = np.asarray(price_usd, dtype=float)
+    meo = np.asarray(meo_usd, dtype=float)
+    ok = (price > 0) & (meo > 0)
+    if mask is not None:
+        ok &= mask
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        raw = np.asarray(budget_meo, dtype=float) * meo / price
+        qty = np.sign(raw) * np.floor(np.abs(raw) * 1e4 + 0.5) / 1e4
+    return np.where(ok & np.isfinite(qty), qty, 0.0)
+
+
+def decision_blocks(
+    quantity: np.ndarray | float,
+    adv10: np.ndarray | float,
+    fee_bp: float,
+    cap_bp: float,
+    mask: np.ndarray | None = None,
+) -> np.ndarray:
+    """Vectorised :func:`decision_block`; ``False`` where ``mask`` is false."""
+
+    ok = costs.cost_bp(quantity, adv10, fee_bp) <= cap_bp
+    return ok & mask if mask is not None else ok
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime, date
+import math
+import time
+import weakref
+from dataclasses import dataclass
+from datetime import datetime, date, timedelta
+from typing import Any, Callable, Hashable, Iterable
 
 import pandas as pd
+import requests
 import requests_cache
 import yfinance as yf
 from alpha_vantage.fundamentaldata import FundamentalData
@@ -13,9 +19,271 @@ from . import meo, db
 # Enable local HTTP caching for all network calls
 requests_cache.install_cache("metiseon_cache", expire_after=86400)
 
-async def fetch_prices(tickers: list[str], start: str, end: str) -> pd.DataFrame:
+
+@dataclass(frozen=True)
+class ProviderLimits:
+    """Throughput limits for one data provider.
+
+    Attributes
+    ----------
+    concurrency : int
+        Maximum number of requests in flight.
+    rate : float
+        Sustained requests per second (token-bucket refill rate).
+    burst : int
+        Token-bucket capacity.
+    retries : int
+        Retries after the first attempt fails with a transient error
+        (HTTP 429, HTTP 5xx or a timeout).
+    backoff : float
+        Initial retry delay in seconds, doubled on every retry.
+    """
+
+    concurrency: int = 4
+    rate: float = 4.0
+    burst: int = 4
+    retries: int = 3
+    backoff: float = 0.5
+
+
+PROVIDER_LIMITS: dict[str, ProviderLimits] = {
+    "yahoo": ProviderLimits(concurrency=4, rate=2.0, burst=4),
+    "alphavantage": ProviderLimits(concurrency=1, rate=5 / 60, burst=1, backoff=15.0),
+    "fred": ProviderLimits(concurrency=2, rate=2.0, burst=2),
+    "coingecko": ProviderLimits(concurrency=1, rate=0.5, burst=1, backoff=2.0),
+}
+
+
+def _retryable(exc: BaseException) -> bool:
+    """Return ``True`` for HTTP 429, HTTP 5xx and timeout errors."""
+
+    if isinstance(exc, (TimeoutError, requests.Timeout)):
+        return True
+    if isinstance(getattr(exc, "reason", None), TimeoutError):  # urllib.error.URLError
+        return True
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        status = getattr(exc, "code", None)  # urllib.error.HTTPError
+    return isinstance(status, int) and (status == 429 or 500 <= status < 600)
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass
+class _ProviderStats:
+    queued: int = 0
+    in_flight: int = 0
+    completed: int = 0
+    failed: int = 0
+    retries: int = 0
+    coalesced: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+
+
+class FetchScheduler:
+    """Run blocking provider calls under per-provider limits.
+
+    Each provider gets a semaphore capping concurrent requests and a token
+    bucket capping the request rate.  Calls failing with HTTP 429, HTTP 5xx
+    or a timeout are retried with exponential backoff (the semaphore is
+    released while waiting); any other error propagates at once.  Calls
+    sharing a ``key`` while one is still in
+    flight await the same result instead of hitting the provider again.
+
+    Asyncio primitives are bound to one event loop, so use
+    :func:`scheduler` to get the instance for the running loop.
+
+    Parameters
+    ----------
+    limits : dict[str, ProviderLimits], optional
+        Overrides for :data:`PROVIDER_LIMITS`.
+    """
+
+    def __init__(self, limits: dict[str, ProviderLimits] | None = None) -> None:
+        self.limits = {**PROVIDER_LIMITS, **(limits or {})}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._buckets: dict[str, _TokenBucket] = {}
+        self._stats: dict[str, _ProviderStats] = {}
+        self._inflight: dict[tuple[str, Hashable], asyncio.Future[Any]] = {}
+
+    def _limits(self, provider: str) -> ProviderLimits:
+        return self.limits.get(provider, ProviderLimits())
+
+    def _state(self, provider: str) -> tuple[asyncio.Semaphore, _TokenBucket, _ProviderStats]:
+        if provider not in self._stats:
+            lim = self._limits(provider)
+            self._semaphores[provider] = asyncio.Semaphore(lim.concurrency)
+            self._buckets[provider] = _TokenBucket(lim.rate, lim.burst)
+            self._stats[provider] = _ProviderStats()
+        return self._semaphores[provider], self._buckets[provider], self._stats[provider]
+
+    async def run(
+        self,
+        provider: str,
+        key: Hashable | None,
+        fn: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Call ``fn(*args, **kwargs)`` in a worker thread under ``provider`` limits.
+
+        ``key`` identifies the request for coalescing; ``None`` disables it.
+        """
+
+        _, _, stats = self._state(provider)
+        if key is None:
+            return await self._execute(provider, fn, args, kwargs)
+        slot = (provider, key)
+        pending = self._inflight.get(slot)
+        if pending is not None:
+            stats.coalesced += 1
+            return await asyncio.shield(pending)
+        task = asyncio.ensure_future(self._execute(provider, fn, args, kwargs))
+        self._inflight[slot] = task
+        task.add_done_callback(lambda _: self._inflight.pop(slot, None))
+        return await asyncio.shield(task)
+
+    async def _execute(
+        self,
+        provider: str,
+        fn: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        lim = self._limits(provider)
+        semaphore, bucket, stats = self._state(provider)
+        attempt = 0
+        while True:
+            stats.queued += 1
+            async with semaphore:
+                stats.queued -= 1
+                stats.in_flight += 1
+                try:
+                    await bucket.acquire()
+                    started = time.monotonic()
+                    result = await asyncio.to_thread(fn, *args, **kwargs)
+                except Exception as exc:
+                    if attempt >= lim.retries or not _retryable(exc):
+                        stats.failed += 1
+                        raise
+                    stats.retries += 1
+                else:
+                    elapsed = time.monotonic() - started
+                    stats.completed += 1
+                    stats.latency_total += elapsed
+                    stats.latency_max = max(stats.latency_max, elapsed)
+                    return result
+                finally:
+                    stats.in_flight -= 1
+            # back off outside the semaphore so other calls keep flowing
+            await asyncio.sleep(lim.backoff * 2**attempt)
+            attempt += 1
+
+    def metrics(self) -> pd.DataFrame:
+        """Return queue depth, throughput and latency per provider."""
+
+        rows = {}
+        for provider, st in self._stats.items():
+            rows[provider] = {
+                "queued": st.queued,
+                "in_flight": st.in_flight,
+                "completed": st.completed,
+                "failed": st.failed,
+                "retries": st.retries,
+                "coalesced": st.coalesced,
+                "latency_mean": st.latency_total / st.completed if st.completed else float("nan"),
+                "latency_max": st.latency_max,
+            }
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+
+_schedulers: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, FetchScheduler] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def scheduler() -> FetchScheduler:
+    """Return the fetch scheduler shared by all calls on the running loop."""
+
+    loop = asyncio.get_running_loop()
+    sched = _schedulers.get(loop)
+    if sched is None:
+        sched = FetchScheduler()
+        _schedulers[loop] = sched
+    return sched
+
+
+_PRICE_FIELDS = ["adj_close", "volume"]
+
+
+def _download_prices(ticker: str, start: date, end: date) -> pd.DataFrame:
+    """Download ``[start, end)`` from Yahoo as ``date, ticker, adj_close, volume`` rows."""
+
+    df = yf.download(
+        ticker,
+        start=start.isoformat(),
+        end=end.isoformat(),
+        progress=False,
+        auto_adjust=True,
+        threads=False,
+    )
+    if df.empty:
+        return pd.DataFrame(columns=["date", "ticker", *_PRICE_FIELDS])
+    df = df[["Adj Close", "Volume"]].rename(
+        columns={"Adj Close": "adj_close", "Volume": "volume"}
+    )
+    df = df.rename_axis("date").reset_index()
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    df = df[(df["date"] >= start) & (df["date"] < end)]
+    return df.assign(ticker=ticker)[["date", "ticker", *_PRICE_FIELDS]]
+
+
+def _rebased(fresh: pd.DataFrame, day: date, stored: float) -> bool:
+    """Return ``True`` when ``fresh`` re-prices ``day`` away from ``stored``."""
+
+    bar = fresh.loc[fresh["date"] == day, "adj_close"]
+    if bar.empty or pd.isna(bar.iloc[0]) or pd.isna(stored):
+        return False
+    return not math.isclose(float(bar.iloc[0]), float(stored), rel_tol=1e-6)
+
+
+async def fetch_prices(
+    tickers: list[str], start: str, end: str, db_path: str = "portfolio.db"
+) -> pd.DataFrame:
     """Fetch Yahoo Finance prices asynchronously.
 
+    Prices are kept in the DuckDB ``prices`` table keyed by
+    ``(date, ticker)``.  Only the part of ``[start, end)`` outside the stored
+    span of each ticker is downloaded, so repeated runs append the missing
+    tail instead of re-downloading the whole range.
+
+    Adjusted closes change retroactively after dividends and splits, so the
+    last stored bar of every ticker is downloaded again with its tail.  If
+    it no longer matches, the ticker's whole stored range is refetched and
+    replaced so the series never mixes adjustment bases.
+
     Parameters
     ----------
     tickers : list[str]
@@ -24,6 +292,8 @@ async def fetch_prices(tickers: list[str], start: str, end: str) -> pd.DataFrame
         Inclusive start date (YYYY-MM-DD).
     end : str
         Exclusive end date (YYYY-MM-DD).
+    db_path : str, default "portfolio.db"
+        DuckDB file holding the price store.
 
     Returns
     -------
@@ -32,123 +302,339 @@ async def fetch_prices(tickers: list[str], start: str, end: str) -> pd.DataFrame
         ``volume``. Missing values are forward-filled.
     """
 
-    async def _download(ticker: str) -> pd.DataFrame:
-        return await asyncio.to_thread(
-            yf.download,
-            ticker,
-            start=start,
-            end=end,
-            progress=False,
-            auto_adjust=True,
-            threads=False,
-        )
-
-    results = await asyncio.gather(*[_download(t) for t in tickers])
+    start_d = pd.Timestamp(start).date()
+    end_d = pd.Timestamp(end).date()
+    con = db.cursor(db_path)
+    try:
+        spans = {
+            t: (lo, hi, last)
+            for t, lo, hi, last in con.execute(
+                """
+                SELECT ticker, MIN(date), MAX(date), arg_max(adj_close, date)
+                FROM prices
+                WHERE list_contains(?, ticker)
+                GROUP BY ticker
+                """,
+                (tickers,),
+            ).fetchall()
+        }
+    finally:
+        con.close()
 
-    frames = []
-    for t, df in zip(tickers, results):
-        if df.empty:
+    jobs: list[tuple[str, date, date]] = []
+    for t in tickers:
+        if t not in spans:
+            jobs.append((t, start_d, end_d))
             continue
-        df = df[["Adj Close", "Volume"]].rename(
-            columns={"Adj Close": "adj_close", "Volume": "volume"}
+        lo, hi, _ = spans[t]
+        if start_d < lo:
+            jobs.append((t, start_d, lo))
+        # always re-download the last stored bar to detect re-adjustment
+        jobs.append((t, hi, max(end_d, hi + timedelta(days=1))))
+
+    if jobs:
+        sched = scheduler()
+        results = await asyncio.gather(
+            *[sched.run("yahoo", ("prices", *job), _download_prices, *job) for job in jobs]
         )
-        df.columns = pd.MultiIndex.from_product([[t], df.columns])
-        frames.append(df)
+        rebased = {
+            t
+            for (t, s, _), df in zip(jobs, results)
+            if t in spans and s == spans[t][1] and _rebased(df, s, spans[t][2])
+        }
+        if rebased:
+            full = [
+                (t, min(start_d, spans[t][0]), max(end_d, spans[t][1] + timedelta(days=1)))
+                for t in sorted(rebased)
+            ]
+            results = [df for (t, _, _), df in zip(jobs, results) if t not in rebased]
+            results += await asyncio.gather(
+                *[sched.run("yahoo", ("prices", *job), _download_prices, *job) for job in full]
+            )
+        fresh = [df for df in results if not df.empty]
+        if fresh:
+            await asyncio.to_thread(
+                db.insert_frame,
+                db_path,
+                "prices",
+                pd.concat(fresh, ignore_index=True),
+                True,
+            )
 
-    if not frames:
+    con = db.cursor(db_path)
+    try:
+        long = con.execute(
+            """
+            SELECT date, ticker, adj_close, volume FROM prices
+            WHERE list_contains(?, ticker) AND date >= ? AND date < ?
+            """,
+            (tickers, start_d, end_d),
+        ).df()
+    finally:
+        con.close()
+    if long.empty:
         return pd.DataFrame()
 
-    combined = pd.concat(frames, axis=1).sort_index()
+    long["date"] = pd.to_datetime(long["date"])
+    wide = long.pivot(index="date", columns="ticker", values=_PRICE_FIELDS)
+    present = [t for t in tickers if t in set(long["ticker"])]
+    columns = pd.MultiIndex.from_product([present, _PRICE_FIELDS])
+    combined = wide.swaplevel(axis=1).reindex(columns=columns).sort_index()
     return combined.ffill()
 
 
-async def fetch_fundamentals(tickers: list[str]) -> pd.DataFrame:
+_FUNDAMENTAL_FIELDS = ["roe", "debt_equity", "profit_margin", "rd_to_rev", "insider_own"]
+_RECHECK_AFTER = timedelta(days=1)  # minimum gap between provider checks per ticker
+
+
+def _av_client() -> FundamentalData:
+    return FundamentalData(key="demo", output_format="pandas")
+
+
+def _as_frame(data: Any) -> pd.DataFrame:
+    if isinstance(data, pd.DataFrame):
+        return data
+    if isinstance(data, dict):
+        return pd.DataFrame([data])
+    return pd.DataFrame(data)
+
+
+def _fundamental_rows(
+    ticker: str, overview: Any, income: Any, balance: Any, fetched_at: datetime
+) -> pd.DataFrame:
+    """Turn the three AlphaVantage payloads into one row per fiscal period.
+
+    Ratios for each annual period come from the statements alone.  The TTM
+    ROE and profit margin of the overview are stored as a separate row
+    dated at its ``LatestQuarter`` (``fetched_at`` if absent), so they are
+    never back-dated into an annual period; the other ratios of that row
+    are left NaN and forward-filled on read.
+    """
+
+    ov = _as_frame(overview)
+    ov_row = ov.iloc[0] if not ov.empty else pd.Series(dtype=object)
+    inc = _as_frame(income).reindex(
+        columns=["fiscalDateEnding", "netIncome", "totalRevenue", "researchAndDevelopment"]
+    )
+    bal = _as_frame(balance).reindex(
+        columns=["fiscalDateEnding", "totalLiabilities", "totalShareholderEquity"]
+    )
+    df = inc.merge(bal, on="fiscalDateEnding", how="outer").dropna(subset=["fiscalDateEnding"])
+
+    num = df.drop(columns="fiscalDateEnding").apply(pd.to_numeric, errors="coerce")
+    equity = num["totalShareholderEquity"].where(num["totalShareholderEquity"] != 0)
+    revenue = num["totalRevenue"].where(num["totalRevenue"] != 0)
+    annual = pd.DataFrame(
+        {
+            "ticker": ticker,
+            "fiscal_date": pd.to_datetime(df["fiscalDateEnding"]).dt.date,
+            "fetched_at": fetched_at,
+            "roe": num["netIncome"] / equity,
+            "debt_equity": num["totalLiabilities"] / equity,
+            "profit_margin": num["netIncome"] / revenue,
+            "rd_to_rev": num["researchAndDevelopment"] / revenue,
+            "insider_own": float("nan"),  # not available from demo endpoint
+        }
+    )
+
+    quarter = pd.to_datetime(ov_row.get("LatestQuarter"), errors="coerce")
+    snapshot_date = fetched_at.date() if pd.isna(quarter) else quarter.date()
+    if snapshot_date not in set(annual["fiscal_date"]):
+        ttm = {
+            col: pd.to_numeric(ov_row.get(key), errors="coerce")
+            for col, key in (("roe", "ReturnOnEquityTTM"), ("profit_margin", "ProfitMargin"))
+        }
+        snapshot = pd.DataFrame(
+            [{"ticker": ticker, "fiscal_date": snapshot_date, "fetched_at": fetched_at, **ttm}]
+        ).reindex(columns=annual.columns)
+        annual = pd.concat([annual, snapshot], ignore_index=True) if len(annual) else snapshot
+    rows = annual.sort_values("fiscal_date")
+    return rows.drop_duplicates("fiscal_date", keep="last")
+
+
+async def fetch_fundamentals(
+    tickers: list[str], db_path: str = "portfolio.db", ttl_days: int = 365
+) -> pd.DataFrame:
     """Retrieve fundamental ratios using the AlphaVantage demo API.
 
+    Ratios are cached in the DuckDB ``fundamentals`` table keyed by
+    ``(ticker, fiscal_date)``, which accumulates a filing history over
+    time: one statement-derived row per fiscal year plus the overview's
+    TTM snapshot dated at its latest quarter.  A ticker is only re-queried
+    when its latest fiscal period is older than ``ttl_days`` and it has not
+    been checked in the last day; its three endpoint calls then run
+    concurrently through the scheduler.
+
     Parameters
     ----------
     tickers : list[str]
         Company symbols to query.
+    db_path : str, default "portfolio.db"
+        DuckDB file holding the cache.
+    ttl_days : int, default 365
+        Maximum age of the latest fiscal period before a refresh.
 
     Returns
     -------
     pd.DataFrame
-        Frame indexed by ticker with columns ``date``, ``roe``, ``debt_equity``,
-        ``profit_margin``, ``rd_to_rev`` and ``insider_own``. Missing values are
-        forward-filled.
+        Frame indexed by ticker with one row per fiscal period (or TTM
+        snapshot) and columns ``date`` (period end), ``roe``, ``debt_equity``,
+        ``profit_margin``, ``rd_to_rev`` and ``insider_own``. Missing values
+        are forward-filled within each ticker.
     """
 
-    today = pd.Timestamp.utcnow().normalize()
+    now = datetime.utcnow()
+    con = db.cursor(db_path)
+    try:
+        latest = {
+            t: (fiscal, fetched)
+            for t, fiscal, fetched in con.execute(
+                """
+                SELECT ticker, MAX(fiscal_date), MAX(fetched_at) FROM fundamentals
+                WHERE list_contains(?, ticker)
+                GROUP BY ticker
+                """,
+                (tickers,),
+            ).fetchall()
+        }
+    finally:
+        con.close()
 
-    async def _fetch(ticker: str) -> pd.Series:
-        fd = FundamentalData(key="demo")
-        overview, _ = await asyncio.to_thread(fd.get_company_overview, ticker)
-        income, _ = await asyncio.to_thread(fd.get_income_statement_annual, ticker)
-        balance, _ = await asyncio.to_thread(fd.get_balance_sheet_annual, ticker)
+    def _stale(ticker: str) -> bool:
+        if ticker not in latest:
+            return True
+        fiscal, fetched = latest[ticker]
+        return (
+            now.date() - fiscal > timedelta(days=ttl_days)
+            and now - fetched > _RECHECK_AFTER
+        )
 
-        roe = pd.to_numeric(overview.get("ReturnOnEquityTTM"), errors="coerce")
-        profit_margin = pd.to_numeric(overview.get("ProfitMargin"), errors="coerce")
+    fd = _av_client()
+    sched = scheduler()
 
-        debt_equity = pd.NA
-        if not balance.empty:
-            latest = balance.iloc[0]
-            liabilities = pd.to_numeric(latest.get("totalLiabilities"), errors="coerce")
-            equity = pd.to_numeric(
-                latest.get("totalShareholderEquity"), errors="coerce"
-            )
-            if pd.notna(liabilities) and pd.notna(equity) and equity != 0:
-                debt_equity = liabilities / equity
-
-        rd_to_rev = pd.NA
-        if not income.empty:
-            latest = income.iloc[0]
-            rd = pd.to_numeric(latest.get("researchAndDevelopment"), errors="coerce")
-            rev = pd.to_numeric(latest.get("totalRevenue"), errors="coerce")
-            if pd.notna(rd) and pd.notna(rev) and rev != 0:
-                rd_to_rev = rd / rev
-
-        insider_own = pd.NA  # not available from demo endpoint
-
-        return pd.Series(
-            {
-                "ticker": ticker,
-                "date": today,
-                "roe": roe,
-                "debt_equity": debt_equity,
-                "profit_margin": profit_margin,
-                "rd_to_rev": rd_to_rev,
-                "insider_own": insider_own,
-            }
+    async def _fetch(ticker: str) -> pd.DataFrame:
+        (overview, _), (income, _), (balance, _) = await asyncio.gather(
+            sched.run("alphavantage", ("overview", ticker), fd.get_company_overview, ticker),
+            sched.run(
+                "alphavantage", ("income", ticker), fd.get_income_statement_annual, ticker
+            ),
+            sched.run(
+                "alphavantage", ("balance", ticker), fd.get_balance_sheet_annual, ticker
+            ),
+        )
+        return _fundamental_rows(ticker, overview, income, balance, now)
+
+    refresh = [t for t in tickers if _stale(t)]
+    if refresh:
+        frames = await asyncio.gather(*[_fetch(t) for t in refresh])
+        await asyncio.to_thread(
+            db.insert_frame,
+            db_path,
+            "fundamentals",
+            pd.concat(frames, ignore_index=True),
+            True,
         )
 
-    rows = await asyncio.gather(*[_fetch(t) for t in tickers])
-    df = pd.DataFrame(rows).set_index("ticker")
-    return df.ffill()
+    con = db.cursor(db_path)
+    try:
+        df = con.execute(
+            """
+            SELECT ticker, fiscal_date AS date, roe, debt_equity, profit_margin,
+                   rd_to_rev, insider_own
+            FROM fundamentals
+            WHERE list_contains(?, ticker)
+            ORDER BY ticker, fiscal_date
+            """,
+            (tickers,),
+        ).df()
+    finally:
+        con.close()
+    df["date"] = pd.to_datetime(df["date"])
+    df[_FUNDAMENTAL_FIELDS] = df.groupby("ticker")[_FUNDAMENTAL_FIELDS].ffill()
+    return df.set_index("ticker")
 
 
-async def fetch_meo(as_of: date) -> pd.Series:
+async def _warm_meo(start: date, end: date | None = None) -> None:
+    """Download the MEΩ component series under each provider's limits."""
+
+    sched = scheduler()
+    await asyncio.gather(
+        *[
+            sched.run(provider, key, fn, *args)
+            for provider, key, fn, args in meo.component_requests(start, end)
+        ]
+    )
+
+
+async def fetch_meo(as_of: date, db_path: str = "portfolio.db") -> pd.Series:
     """Fetch MEΩ price and store in DuckDB benchmarks table."""
 
-    loop = asyncio.get_running_loop()
-    df, m_world = await loop.run_in_executor(None, meo.fetch_meo_components, as_of)
+    await _warm_meo(as_of)
+    df, m_world = await asyncio.to_thread(meo.fetch_meo_components, as_of)
     price = meo.meo_price_usd(m_world)
 
-    con = db.connect("portfolio.db")
-    con.execute(
-        """
-        CREATE TABLE IF NOT EXISTS benchmarks (
-            date DATE,
-            symbol TEXT,
-            weight DOUBLE,
-            meo_usd DOUBLE,
-            m_world_usd DOUBLE
-        )
-        """
+    rows = pd.DataFrame(
+        {
+            "date": as_of,
+            "symbol": df.index,
+            "weight": df["weight"].astype(float).to_numpy(),
+            "meo_usd": price,
+            "m_world_usd": m_world,
+        }
     )
-    for sym, row in df.iterrows():
-        con.execute(
-            "INSERT INTO benchmarks VALUES (?, ?, ?, ?, ?)",
-            (as_of, sym, float(row["weight"]), price, m_world),
-        )
-    con.commit()
+    await asyncio.to_thread(db.insert_frame, db_path, "benchmarks", rows, True)
     return pd.Series({"meo_usd": price, "m_world_usd": m_world})
+
+
+async def fetch_meo_history(
+    dates: Iterable[pd.Timestamp], db_path: str = "portfolio.db"
+) -> pd.Series:
+    """Return daily MEΩ prices for ``dates`` backed by the benchmarks table.
+
+    Dates already present in ``benchmarks`` are read back from DuckDB; the
+    remaining ones are built in a single :func:`meo.fetch_meo_history` call
+    and upserted on ``(date, symbol)`` in one bulk insert, so reruns only
+    hit the network for new days.  Dates without any MEΩ component stay NaN and are not stored.
+    """
+
+    idx = pd.DatetimeIndex(pd.to_datetime(list(dates)))
+    wanted = idx.normalize().unique().sort_values()
+    if wanted.empty:
+        return pd.Series(index=idx, dtype=float)
+
+    con = db.cursor(db_path)
+    try:
+        cached = con.execute(
+            """
+            SELECT DISTINCT date, meo_usd
+            FROM benchmarks
+            WHERE date BETWEEN ? AND ?
+            """,
+            (wanted[0].date(), wanted[-1].date()),
+        ).df()
+    finally:
+        con.close()
+    stored = pd.Series(
+        cached["meo_usd"].to_numpy(dtype=float),
+        index=pd.to_datetime(cached["date"]),
+        dtype=float,
+    )
+    missing = wanted.difference(stored.index)
+    if not missing.empty:
+        await _warm_meo(missing[0].date(), missing[-1].date())
+        mc, m_world = await asyncio.to_thread(meo.fetch_meo_history, missing)
+        m_world = m_world[m_world > 0]
+        price = m_world.map(meo.meo_price_usd)
+        rows = (
+            mc.loc[m_world.index]
+            .div(m_world, axis=0)
+            .reset_index()
+            .melt(id_vars="date", var_name="symbol", value_name="weight")
+            .dropna(subset=["weight"])
+        )
+        rows["meo_usd"] = price.reindex(rows["date"]).to_numpy()
+        rows["m_world_usd"] = m_world.reindex(rows["date"]).to_numpy()
+        await asyncio.to_thread(db.insert_frame, db_path, "benchmarks", rows, True)
+        stored = pd.concat([stored, price]).sort_index()
+
+    return pd.Series(stored.reindex(idx.normalize()).to_numpy(), index=idx)
@@ -0,0 +1,426 @@
+"""Weekly rebalance loop shared by the CLI backtest and parameter sweeps."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from . import allocator, costs, denom as denom_mod, fundamentals as fund, ledger, risk, score
+
+FEE_BP = 12.0  # fixed commission in basis points
+
+
+@dataclass
+class BacktestInputs:
+    """Market data needed by :func:`simulate`, built once per backtest.
+
+    Attributes
+    ----------
+    prices : pandas.DataFrame or None
+        ``(ticker, field)`` columns with ``adj_close`` and ``volume``; may be
+        ``None`` when ``panels`` already holds every field.
+    meo : pandas.Series
+        MEΩ prices in USD aligned with ``prices``.
+    scores : dict[pandas.Timestamp, pandas.Series]
+        Durability scores per rebalance date.
+    rebalance : list[pandas.Timestamp]
+        Rebalance dates in chronological order.
+    panels : dict[str, pandas.DataFrame]
+        ``dates × tickers`` panel per field, sliced from ``prices`` on first
+        use or supplied directly (e.g. wrapping memory-mapped arrays).
+    numeraires : dict[str, denom.Denominator]
+        Numéraire per ``denom`` name, built on first use by
+        :meth:`numeraire` or supplied directly.
+    """
+
+    prices: pd.DataFrame | None
+    meo: pd.Series
+    scores: dict[pd.Timestamp, pd.Series]
+    rebalance: list[pd.Timestamp]
+    panels: dict[str, pd.DataFrame] = field(default_factory=dict)
+    numeraires: dict[str, denom_mod.Denominator] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    _cost_model: costs.CostModel | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def panel(self, name: str) -> pd.DataFrame:
+        """Return the ``dates × tickers`` panel of field ``name``."""
+
+        frame = self.panels.get(name)
+        if frame is None:
+            if self.prices is None:
+                raise KeyError(name)
+            frame = self.panels[name] = self.prices.xs(name, level=1, axis=1)
+        return frame
+
+    @property
+    def close(self) -> pd.DataFrame:
+        return self.panel("adj_close")
+
+    @property
+    def volume(self) -> pd.DataFrame:
+        return self.panel("volume")
+
+    def numeraire(self, denom: str) -> denom_mod.Denominator:
+        """Return the :class:`denom.Denominator` named ``denom``.
+
+        ``"MEΩ"`` converts with :attr:`meo`; any other name is a fiat
+        currency whose FX series is fetched over the span of :attr:`close`.
+        """
+
+        numeraire = self.numeraires.get(denom)
+        if numeraire is None:
+            if denom == "MEΩ":
+                numeraire = denom_mod.Denominator.meo_units(self.meo)
+            else:
+                index = self.close.index
+                numeraire = denom_mod.Denominator.fiat(
+                    denom, index[0].date(), index[-1].date()
+                )
+            self.numeraires[denom] = numeraire
+        return numeraire
+
+    def cost_model(self) -> costs.CostModel:
+        """Return the :class:`costs.CostModel` shared by every run on these inputs.
+
+        ADV panels and max-size surfaces are cached on it, so a sweep
+        computes each of them once per window and cost cap.
+        """
+
+        if self._cost_model is None:
+            self._cost_model = costs.CostModel(self.volume, FEE_BP)
+        return self._cost_model
+
+
+def prepare(
+    prices: pd.DataFrame,
+    fundamentals: pd.DataFrame,
+    meo: pd.Series,
+    start: str,
+    end: str,
+    lag: timedelta,
+    rules: score.RuleSet | None = None,
+) -> BacktestInputs:
+    """Select Friday rebalances in ``[start, end]`` and score them in bulk.
+
+    Fundamentals are read point-in-time as of each rebalance minus ``lag``
+    and scored with ``rules`` (default :data:`score.DEFAULT_RULES`).
+    """
+
+    rebalance = [
+        d
+        for d in prices.index
+        if pd.to_datetime(start) <= d <= pd.to_datetime(end) and d.weekday() == 4
+    ]  # weekly on Friday
+    store = fund.PointInTimeStore(fundamentals)
+    snapshots = store.as_of_many(rebalance, lag=lag)
+    all_scores = score.apply_scores(snapshots, rules)
+    scores = {d: s.droplevel(0) for d, s in all_scores.groupby(level=0)}
+    return BacktestInputs(prices=prices, meo=meo, scores=scores, rebalance=rebalance)
+
+
+def latest_sigma(
+    price_df: pd.DataFrame,
+    date: pd.Timestamp,
+    method: str,
+    window: int,
+    denom: pd.Series | None,
+    engine: risk.GarchSigmaEngine | None = None,
+) -> pd.Series:
+    if method == "garch_np":
+        close = price_df.xs("adj_close", level=1, axis=1)
+        return risk.garch_np_sigma(close, [date], None, denom).iloc[0]
+    if method == "garch" and engine is not None:
+        return engine.sigma(price_df, date, denom)
+    levels = price_df.columns.levels[0]
+    sigmas: dict[str, float] = {}
+    for t in levels:
+        series = price_df[t]["adj_close"].loc[:date]
+        if series.empty:
+            sigmas[t] = float("nan")
+            continue
+        denom_series = denom.loc[series.index] if denom is not None else None
+        if method == "garch":
+            s = risk.garch_sigma(series, denom_series)
+        else:
+            s = risk.realised_sigma(series, window, denom_series)
+        sigmas[t] = s.iloc[-1] if not s.empty else float("nan")
+    return pd.Series(sigmas)
+
+
+def cash_is_fixed(cfg: dict, budget: float | None, pct: float | None) -> bool:
+    """Return ``True`` when :func:`size_cash` does not depend on NAV."""
+    return budget is not None or (pct is None and "weekly_pct" not in cfg)
+
+
+def size_cash(nav: float, cfg: dict, budget: float | None, pct: float | None) -> float:
+    if budget is not None:
+        return float(budget)
+    if pct is not None:
+        return nav * float(pct)
+    if "weekly_pct" in cfg:
+        return nav * float(cfg["weekly_pct"])
+    return float(cfg.get("weekly_buy", 100))
+
+
+@dataclass
+class EngineResult:
+    """Output of :func:`run_engine`.
+
+    Attributes
+    ----------
+    trades : pandas.DataFrame
+        One row per fill with ``ts``, ``ticker``, ``qty`` (float; quantised
+        to lots by :meth:`ledger.Ledger.book_trade`), ``price``, ``fee`` and
+        ``slippage`` (both USD).
+    holdings : pandas.DataFrame
+        ``dates × tickers`` quantity held at each close.
+    nav_usd : pandas.Series
+        Daily mark-to-market NAV in the price currency.
+    nav_meo : pandas.Series
+        ``nav_usd`` in MEΩ units (NaN where no positive MEΩ price exists).
+    """
+
+    trades: pd.DataFrame
+    holdings: pd.DataFrame
+    nav_usd: pd.Series
+    nav_meo: pd.Series
+
+    def stats(self) -> dict[str, float]:
+        """Return trade count, traded notional, fees and slippage in USD."""
+
+        notional = self.trades["qty"].astype(float) * self.trades["price"]
+        return {
+            "n_trades": float(len(self.trades)),
+            "traded_usd": float(notional.sum()),
+            "fees_usd": float(self.trades["fee"].sum()),
+            "slippage_usd": float(self.trades["slippage"].sum()),
+        }
+
+    def persist(self, book: ledger.Ledger) -> None:
+        """Book every fill into ``book`` and flush it."""
+
+        for ts, ticker, qty, price, fee in self.trades[
+            ["ts", "ticker", "qty", "price", "fee"]
+        ].itertuples(index=False):
+            book.book_trade(ts, ticker, qty, price, fee)
+        book.flush()
+
+
+_TRADE_COLUMNS = ["ts", "ticker", "qty", "price", "fee", "slippage"]
+
+
+def run_engine(
+    close: pd.DataFrame,
+    cost_model: costs.CostModel,
+    sigma: pd.DataFrame,
+    scores: dict[pd.Timestamp, pd.Series],
+    meo: pd.Series,
+    rebalance: list[pd.Timestamp],
+    cfg: dict,
+    denom: str = "MEΩ",
+    budget: float | None = None,
+    pct: float | None = None,
+    start_qty: pd.Series | None = None,
+    start_booked: pd.Series | None = None,
+    last: str | None = None,
+    numeraire: denom_mod.Denominator | None = None,
+) -> EngineResult:
+    """Run the weekly pick → size → cost-gate loop purely in memory.
+
+    All inputs are prebuilt: ``close`` is a ``dates × tickers`` panel,
+    ``cost_model`` supplies the cached ADV and max-size surfaces for the
+    ``adv_window`` and ``slip_cap_bp`` of ``cfg``, ``sigma`` holds one
+    row per rebalance date and ``scores`` maps rebalance dates to score
+    series.  Holdings live in a NumPy vector, so nothing touches DuckDB
+    or the network.
+
+    ``numeraire`` converts budgets and NAV for sizing; by default it is
+    MEΩ units of ``meo`` when ``denom`` is MEΩ and USD otherwise.
+    ``start_qty`` and ``start_booked`` seed the quantities and the
+    last-trade valuation per ticker (see :meth:`ledger.Ledger.booked_navs`)
+    used for NAV-based sizing when ``denom`` is not MEΩ.
+    """
+
+    tickers = close.columns
+    col = {t: j for j, t in enumerate(tickers)}
+    px = close.to_numpy(dtype=float)
+    window = int(cfg.get("adv_window", costs.ADV_WINDOW))
+    slip_cap = float(cfg.get("slip_cap_bp", 35))
+    adv_a = (
+        cost_model.adv(window)
+        .reindex(index=close.index, columns=tickers)
+        .to_numpy(dtype=float)
+    )
+    cap_a = (
+        cost_model.max_qty(slip_cap, window)
+        .reindex(index=close.index, columns=tickers)
+        .to_numpy(dtype=float)
+    )
+    meo_units = denom_mod.Denominator.meo_units(meo)
+    if numeraire is None:
+        numeraire = meo_units if denom == "MEΩ" else denom_mod.Denominator()
+    per_usd = numeraire.factors(close.index)  # NaN where the unit is unpriced
+    with np.errstate(divide="ignore"):
+        unit_usd = 1.0 / per_usd
+    qty = np.zeros(len(tickers))
+    booked = np.zeros(len(tickers))
+    if start_qty is not None:
+        qty = start_qty.reindex(tickers).fillna(0.0).to_numpy(dtype=float)
+    if start_booked is not None:
+        booked = start_booked.reindex(tickers).fillna(0.0).to_numpy(dtype=float)
+    start = qty.copy()
+    flows = np.zeros_like(px)
+
+    # pick rule for every scored date at once; only the exclusion of the
+    # last filled ticker is resolved inside the loop
+    scored = [d for d in rebalance if d in scores]
+    if scored:
+        score_df = pd.concat([scores[d] for d in scored], axis=1, keys=scored).T
+    else:
+        score_df = pd.DataFrame(index=pd.DatetimeIndex([]), dtype=float)
+    axis = allocator.ticker_axis(score_df.columns, sigma.columns)
+    first, second = allocator.rank_candidates(
+        score_df.reindex(columns=axis).to_numpy(dtype=float),
+        sigma.reindex(index=scored, columns=axis).to_numpy(dtype=float),
+    )
+    last_j = axis.get_loc(last) if last in axis else -1
+
+    # gather price, ADV, the cost-cap order size and MEΩ for both candidates
+    # of every scored date; with a fixed cash amount sizing and the cost gate
+    # run vectorised too
+    cand = np.stack([first, second])
+    r_k = close.index.get_indexer(scored)
+    j_c = np.array(
+        [[col.get(axis[c], -1) if c >= 0 else -1 for c in row] for row in cand],
+        dtype=int,
+    ).reshape(cand.shape)
+    valid = (j_c >= 0) & (r_k >= 0)
+    rr, jj = np.where(r_k >= 0, r_k, 0), np.where(valid, j_c, 0)
+    cand_px = np.where(valid, px[rr, jj], np.nan)
+    cand_adv = np.where(valid, adv_a[rr, jj], np.nan)
+    cand_cap = np.where(valid, cap_a[rr, jj], np.nan)
+    f_k, m_k = per_usd[rr], unit_usd[rr]
+    fixed_cash = cash_is_fixed(cfg, budget, pct)
+    if fixed_cash:
+        cash = size_cash(0.0, cfg, budget, pct)
+        budget_units = np.nan_to_num(cash * f_k, nan=0.0)
+        cand_q = allocator.size_trades(cand_px, budget_units, m_k, mask=valid)
+        cand_ok = (cand_q != 0) & (cand_q <= cand_cap)
+
+    fills: list[tuple[object, ...]] = []
+    for k, date in enumerate(scored):
+        c = 1 if last_j >= 0 and first[k] == last_j else 0
+        if not valid[c, k]:
+            continue
+        r, j = r_k[k], j_c[c, k]
+        price, a, cap = cand_px[c, k], cand_adv[c, k], cand_cap[c, k]
+        if fixed_cash:
+            qf, ok = float(cand_q[c, k]), bool(cand_ok[c, k])
+        else:
+            f = f_k[k]
+            if np.isnan(f):
+                nav = 0.0
+            elif denom == "MEΩ":
+                held = qty != 0
+                nav = float(px[r, held] @ qty[held] * f)
+            else:
+                nav = float(booked.sum() * f)
+            cash = size_cash(nav, cfg, budget, pct)
+            qf = float(allocator.size_trades(price, 0.0 if np.isnan(f) else cash * f, m_k[k]))
+            ok = qf != 0 and qf <= cap
+        if ok:
+            notional = price * qf
+            fee = notional * FEE_BP / 10000
+            qty[j] += qf
+            booked[j] = qty[j] * price
+            flows[r, j] += qf
+            slippage = notional * float(costs.impact(qf, a))
+            fills.append((date.to_pydatetime(), str(tickers[j]), qf, price, fee, slippage))
+            last_j = int(cand[c, k])
+
+    holdings = start + np.cumsum(flows, axis=0)
+    with np.errstate(invalid="ignore"):
+        nav = np.where(holdings != 0, holdings * px, 0.0).sum(axis=1)
+    nav_usd = pd.Series(nav, index=close.index)
+    return EngineResult(
+        trades=pd.DataFrame(fills, columns=_TRADE_COLUMNS),
+        holdings=pd.DataFrame(holdings, index=close.index, columns=tickers),
+        nav_usd=nav_usd,
+        nav_meo=meo_units.convert(nav_usd),
+    )
+
+
+def sigma_matrix(
+    inputs: BacktestInputs, cfg: dict, numeraire: denom_mod.Denominator
+) -> pd.DataFrame:
+    """Return per-ticker volatility for each scored rebalance date.
+
+    Prices are converted into ``numeraire`` once for the whole panel.
+    """
+
+    dates = [d for d in inputs.rebalance if d in inputs.scores]
+    sigma_method = cfg.get("sigma_method", "garch")
+    risk_window = int(cfg.get("risk_window", 63))
+    rel = numeraire.convert(inputs.close)
+    mode = cfg.get("garch_mode", "incremental")
+    if sigma_method == "garch_np":
+        refit = None if mode == "refit" else cfg.get("garch_refit", "M")
+        return risk.garch_np_sigma(rel, dates, refit)
+    if sigma_method != "garch":
+        return risk.realised_sigma_panel(rel, risk_window).reindex(dates)
+    if mode == "refit":
+        workers = cfg.get("garch_workers")
+        return risk.garch_sigma_batch(
+            rel, dates, workers=int(workers) if workers else None
+        )
+    rel_prices = pd.concat({"adj_close": rel}, axis=1).swaplevel(axis=1)
+    engine = risk.GarchSigmaEngine(mode, cfg.get("garch_refit", "M"))
+    rows = {
+        d: latest_sigma(rel_prices, d, sigma_method, risk_window, None, engine)
+        for d in dates
+    }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def simulate(
+    inputs: BacktestInputs,
+    cfg: dict,
+    denom: str = "MEΩ",
+    budget: float | None = None,
+    pct: float | None = None,
+    book: ledger.Ledger | None = None,
+) -> EngineResult:
+    """Run :func:`run_engine` on prepared inputs.
+
+    ``denom`` selects the numéraire used for risk and NAV-based sizing
+    (see :meth:`BacktestInputs.numeraire`).  When ``book`` is given the
+    run starts from its current positions and the fills are persisted to
+    it at the end.
+    """
+
+    numeraire = inputs.numeraire(denom)
+    result = run_engine(
+        inputs.close,
+        inputs.cost_model(),
+        sigma_matrix(inputs, cfg, numeraire),
+        inputs.scores,
+        inputs.meo,
+        inputs.rebalance,
+        cfg,
+        denom,
+        budget,
+        pct,
+        start_qty=book.holdings() if book is not None else None,
+        start_booked=book.booked_navs() if book is not None else None,
+        last=book.last_ticker() if book is not None else None,
+        numeraire=numeraire,
+    )
+    if book is not None:
+        result.persist(book)
+    return result
@@ -0,0 +1,122 @@
+"""Transaction-cost model: ADV panels and square-root market impact.
+
+The impact formula used by :func:`src.risk.slipped_cost` and the cost gate
+in :mod:`src.allocator` lives here, together with its inverse, so the
+backtest can precompute a ``dates × tickers`` surface of the largest order
+that stays within the slippage cap instead of sizing a trial trade and
+gating it afterwards.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+IMPACT_COEF = 0.001  # Almgren-Chriss: cost = k * sqrt(qty / adv)
+ADV_WINDOW = 10  # days in the average daily volume
+
+
+def impact(
+    qty: np.ndarray | float, adv: np.ndarray | float, coef: float = IMPACT_COEF
+) -> np.ndarray:
+    """Square-root impact as a decimal fraction (0.001 = 10bp), 0 if ``adv <= 0``."""
+
+    q = np.asarray(qty, dtype=float)
+    a = np.asarray(adv, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(a <= 0, 0.0, coef * np.sqrt(q / a))
+
+
+def cost_bp(
+    qty: np.ndarray | float,
+    adv: np.ndarray | float,
+    fee_bp: float,
+    coef: float = IMPACT_COEF,
+) -> np.ndarray:
+    """Total cost of an order in basis points: fee plus impact."""
+
+    return fee_bp + 1e4 * impact(qty, adv, coef)
+
+
+def max_qty(
+    adv: np.ndarray | float,
+    fee_bp: float,
+    cap_bp: float,
+    coef: float = IMPACT_COEF,
+) -> np.ndarray:
+    """Largest order whose :func:`cost_bp` stays within ``cap_bp``.
+
+    Unbounded (``inf``) where ``adv <= 0`` since no impact is charged, ``0``
+    everywhere when the fee alone exceeds the cap and NaN where ADV is
+    unknown, so ``qty <= max_qty`` reproduces the cost gate.
+    """
+
+    a = np.asarray(adv, dtype=float)
+    if fee_bp > cap_bp:
+        return np.zeros(a.shape)
+    headroom = (cap_bp - fee_bp) / (1e4 * coef)
+    return np.where(a <= 0, np.inf, a * headroom**2)
+
+
+class CostModel:
+    """ADV panels and cost surfaces precomputed once per volume panel.
+
+    Parameters
+    ----------
+    volume : pandas.DataFrame
+        ``dates × tickers`` traded volume.
+    fee_bp : float
+        Fixed commission in basis points.
+    window : int, default 10
+        Default ADV window; other windows are computed on request and cached.
+    coef : float, default 0.001
+        Square-root impact coefficient.
+    """
+
+    def __init__(
+        self,
+        volume: pd.DataFrame,
+        fee_bp: float,
+        window: int = ADV_WINDOW,
+        coef: float = IMPACT_COEF,
+    ) -> None:
+        self.volume = volume
+        self.fee_bp = fee_bp
+        self.window = window
+        self.coef = coef
+        self._adv: dict[int, pd.DataFrame] = {}
+        self._max: dict[tuple[float, int], pd.DataFrame] = {}
+
+    def adv(self, window: int | None = None) -> pd.DataFrame:
+        """Rolling average daily volume."""
+
+        w = window or self.window
+        panel = self._adv.get(w)
+        if panel is None:
+            panel = self.volume.rolling(w).mean()
+            self._adv[w] = panel
+        return panel
+
+    def cost_bp(
+        self, qty: pd.DataFrame | np.ndarray | float, window: int | None = None
+    ) -> pd.DataFrame:
+        """Cost in basis points of ``qty`` (broadcast) for every date and ticker."""
+
+        adv = self.adv(window)
+        q = qty.reindex_like(adv) if isinstance(qty, pd.DataFrame) else qty
+        values = cost_bp(
+            np.asarray(q, dtype=float), adv.to_numpy(dtype=float), self.fee_bp, self.coef
+        )
+        return pd.DataFrame(values, index=adv.index, columns=adv.columns)
+
+    def max_qty(self, cap_bp: float, window: int | None = None) -> pd.DataFrame:
+        """Largest order per date and ticker within ``cap_bp`` (cached)."""
+
+        key = (float(cap_bp), window or self.window)
+        surface = self._max.get(key)
+        if surface is None:
+            adv = self.adv(window)
+            values = max_qty(adv.to_numpy(dtype=float), self.fee_bp, cap_bp, self.coef)
+            surface = pd.DataFrame(values, index=adv.index, columns=adv.columns)
+            self._max[key] = surface
+        return surface
@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
+import threading
+from pathlib import Path
+
 import duckdb
+import pandas as pd
 
 
 SCHEMA_SQL = """\
@@ -22,6 +26,43 @@ CREATE TABLE IF NOT EXISTS positions (
     cost_basis DOUBLE,
     nav DOUBLE
 );
+
+CREATE TABLE IF NOT EXISTS prices (
+    date DATE,
+    ticker TEXT,
+    adj_close DOUBLE,
+    volume DOUBLE,
+    PRIMARY KEY (date, ticker)
+);
+
+CREATE TABLE IF NOT EXISTS fundamentals (
+    ticker TEXT,
+    fiscal_date DATE,
+    fetched_at TIMESTAMP,
+    roe DOUBLE,
+    debt_equity DOUBLE,
+    profit_margin DOUBLE,
+    rd_to_rev DOUBLE,
+    insider_own DOUBLE,
+    PRIMARY KEY (ticker, fiscal_date)
+);
+
+CREATE TABLE IF NOT EXISTS benchmarks (
+    date DATE,
+    symbol TEXT,
+    weight DOUBLE,
+    meo_usd DOUBLE,
+    m_world_usd DOUBLE,
+    PRIMARY KEY (date, symbol)
+);
+
+CREATE TABLE IF NOT EXISTS risk_state (
+    ticker TEXT,
+    numeraire TEXT,
+    as_of DATE,
+    state TEXT,
+    PRIMARY KEY (ticker, numeraire)
+);
 """
 
 
@@ -30,3 +71,86 @@ def connect(path: str) -> duckdb.DuckDBPyConnection:
     con = duckdb.connect(path)
     con.execute(SCHEMA_SQL)
     return con
+
+
+_pool: dict[str, duckdb.DuckDBPyConnection] = {}
+_write_locks: dict[str, threading.Lock] = {}
+_pool_lock = threading.Lock()
+
+
+def _key(path: str) -> str:
+    return str(Path(path).resolve())
+
+
+def shared(path: str) -> duckdb.DuckDBPyConnection:
+    """Return the process-wide connection for ``path``.
+
+    The connection is opened and the schema applied only on first use; later
+    calls for the same database file return the same object.  ``":memory:"``
+    databases are private, so every call returns a fresh one.
+    """
+
+    if path == ":memory:":
+        return connect(path)
+    key = _key(path)
+    with _pool_lock:
+        con = _pool.get(key)
+        if con is None:
+            con = connect(path)
+            _pool[key] = con
+            _write_locks[key] = threading.Lock()
+        return con
+
+
+def cursor(path: str) -> duckdb.DuckDBPyConnection:
+    """Return a new cursor on the shared connection for ``path``.
+
+    Cursors are cheap and may be used from another thread than the one that
+    created the shared connection.
+    """
+
+    if path == ":memory:":
+        return shared(path)
+    return shared(path).cursor()
+
+
+def write_lock(path: str) -> threading.Lock:
+    """Return the lock serialising writes to ``path``."""
+
+    if path == ":memory:":
+        return threading.Lock()
+    shared(path)
+    return _write_locks[_key(path)]
+
+
+def insert_frame(
+    path: str, table: str, frame: pd.DataFrame, replace: bool = False
+) -> None:
+    """Append ``frame`` to ``table`` with a single bulk insert.
+
+    Columns are matched by name.  With ``replace`` rows whose primary key
+    already exists are overwritten.  Writers are serialised per database, so
+    this is safe to call from ``asyncio.to_thread`` under heavy concurrency.
+    """
+
+    if frame.empty:
+        return
+    with write_lock(path):
+        cur = cursor(path)
+        try:
+            cur.register("_insert_frame", frame)
+            verb = "INSERT OR REPLACE" if replace else "INSERT"
+            cur.execute(f"{verb} INTO {table} BY NAME SELECT * FROM _insert_frame")
+            cur.unregister("_insert_frame")
+        finally:
+            cur.close()
+
+
+def close_all() -> None:
+    """Close every shared connection."""
+
+    with _pool_lock:
+        for con in _pool.values():
+            con.close()
+        _pool.clear()
+        _write_locks.clear()
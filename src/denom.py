@@ -0,0 +1,117 @@
+"""Conversion of USD prices into MEΩ units or a fiat currency.
+
+Every step that needs prices in another unit (risk, NAV, sizing,
+reporting) goes through a :class:`Denominator`.  The numéraire series is
+aligned to a date index once and the factors for the last index are kept,
+so converting a whole ``dates × tickers`` panel is a single broadcast
+multiplication.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import TypeVar
+
+import numpy as np
+import pandas as pd
+
+from . import meo
+
+_P = TypeVar("_P", pd.Series, pd.DataFrame)
+
+
+class Denominator:
+    """USD value of one numéraire unit over time.
+
+    Parameters
+    ----------
+    usd_per_unit : pandas.Series, optional
+        USD price of one unit per date (MEΩ price, ``{SYM}USD`` rate).
+        ``None`` denotes USD itself.
+    name : str, default "USD"
+        Label of the numéraire.
+    max_age_days : int, optional
+        Align by as-of lookup, accepting a unit price up to this many days
+        old; by default dates must match exactly.
+    """
+
+    def __init__(
+        self,
+        usd_per_unit: pd.Series | None = None,
+        name: str = "USD",
+        max_age_days: int | None = None,
+    ) -> None:
+        self.name = name
+        self.max_age_days = max_age_days
+        self._source = usd_per_unit
+        self._aligned: tuple[pd.Index, np.ndarray] | None = None
+
+    @classmethod
+    def meo_units(cls, meo_usd: pd.Series) -> Denominator:
+        """Numéraire of MEΩ units priced by ``meo_usd``."""
+        return cls(meo_usd, "MEΩ")
+
+    @classmethod
+    def fiat(cls, code: str, start: date, end: date) -> Denominator:
+        """Numéraire of a fiat currency in :data:`meo.M2_MAP`.
+
+        The ``{code}USD`` rate over ``[start, end]`` comes from the MEΩ
+        component cache and is looked up as of each date (7 days at most),
+        as in :func:`meo.fetch_meo_history`.
+        """
+
+        if code not in meo.M2_MAP:
+            raise ValueError(f"unsupported currency {code!r}")
+        if code == "USD":
+            return cls()
+        return cls(meo.fx_series(code, start, end), code, max_age_days=7)
+
+    @staticmethod
+    def per_usd(usd_per_unit: np.ndarray | float) -> np.ndarray:
+        """Return units per USD, NaN where the unit price is not positive."""
+
+        usd = np.asarray(usd_per_unit, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(usd > 0, 1.0 / usd, np.nan)
+
+    def factors(self, index: pd.Index) -> np.ndarray:
+        """Return ``1 / usd_per_unit`` aligned to ``index`` (NaN where unpriced).
+
+        Only the factors of the most recent index are kept.
+        """
+
+        hit = self._aligned
+        if hit is not None and hit[0] is index:
+            return hit[1]
+        if self._source is None:
+            factors = np.ones(len(index))
+        else:
+            factors = self.per_usd(self._usd(index).to_numpy(dtype=float))
+        self._aligned = (index, factors)
+        return factors
+
+    def _usd(self, index: pd.Index) -> pd.Series:
+        assert self._source is not None
+        if self.max_age_days is None:
+            return self._source.reindex(index)
+        return self._source.reindex(
+            index, method="ffill", tolerance=pd.Timedelta(days=self.max_age_days)
+        )
+
+    def convert(self, values: _P) -> _P:
+        """Express a USD series or ``dates × tickers`` panel in this numéraire."""
+
+        f = self.factors(values.index)
+        if isinstance(values, pd.DataFrame):
+            data = values.to_numpy(dtype=float) * f[:, None]
+            return pd.DataFrame(data, index=values.index, columns=values.columns)
+        return pd.Series(
+            values.to_numpy(dtype=float) * f, index=values.index, name=values.name
+        )
+
+    def unit_price(self, date: pd.Timestamp) -> float:
+        """USD price of one unit on ``date``."""
+
+        if self._source is None:
+            return 1.0
+        return float(self._usd(pd.DatetimeIndex([date])).iloc[0])
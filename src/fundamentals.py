@@ -0,0 +1,86 @@
+"""Point-in-time access to fundamentals snapshots."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+
+class PointInTimeStore:
+    """Latest fundamentals snapshot per ticker as of any date.
+
+    The snapshots are sorted once by ``(ticker, date)`` so that an as-of
+    query is a binary search per ticker instead of a filter over every row.
+
+    Parameters
+    ----------
+    fundamentals : pandas.DataFrame
+        Snapshots with a ``date`` column and the ticker either as a
+        ``ticker`` column or as the index, as returned by
+        :func:`src.async_data.fetch_fundamentals`.
+    """
+
+    def __init__(self, fundamentals: pd.DataFrame) -> None:
+        df = fundamentals
+        if "ticker" not in df.columns:
+            df = df.rename_axis("ticker").reset_index()
+        df = df.assign(date=pd.to_datetime(df["date"]))
+        df = df.sort_values(["ticker", "date"], kind="stable").reset_index(drop=True)
+        self._frame = df
+        self._dates = df["date"].to_numpy(dtype="datetime64[ns]")
+        tickers = df["ticker"].to_numpy()
+        starts = np.flatnonzero(np.r_[True, tickers[1:] != tickers[:-1]])
+        self._tickers = tickers[starts]
+        self._starts = starts
+        self._ends = np.r_[starts[1:], len(df)]
+
+    @property
+    def empty(self) -> bool:
+        """Return ``True`` when the store holds no snapshots."""
+        return self._frame.empty
+
+    def as_of(self, ts: pd.Timestamp) -> pd.DataFrame:
+        """Return the latest snapshot per ticker with ``date <= ts``.
+
+        The result is indexed by ticker; tickers without a snapshot yet are
+        omitted.
+        """
+
+        when = np.datetime64(pd.Timestamp(ts), "ns")
+        rows = []
+        for start, end in zip(self._starts, self._ends):
+            pos = start + np.searchsorted(self._dates[start:end], when, side="right")
+            if pos > start:
+                rows.append(pos - 1)
+        return self._frame.iloc[rows].set_index("ticker")
+
+    def as_of_many(
+        self, dates: Iterable[pd.Timestamp], lag: timedelta = timedelta(0)
+    ) -> pd.DataFrame:
+        """Bulk as-of join of every ticker against every date in ``dates``.
+
+        Each date ``d`` is answered with the snapshots visible at ``d - lag``.
+        The result has a ``(rebalance, ticker)`` MultiIndex keyed by the
+        requested dates, so a single :func:`src.score.apply_scores` call
+        scores the whole backtest.
+        """
+
+        idx = pd.DatetimeIndex(sorted(set(pd.to_datetime(list(dates)))))
+        if idx.empty or self.empty:
+            empty = self._frame.iloc[0:0].assign(rebalance=pd.NaT)
+            return empty.set_index(["rebalance", "ticker"])
+        grid = pd.DataFrame(
+            {
+                "asof": np.repeat(idx - lag, len(self._tickers)),
+                "rebalance": np.repeat(idx, len(self._tickers)),
+                "ticker": np.tile(self._tickers, len(idx)),
+            }
+        )
+        right = self._frame.sort_values("date", kind="stable")
+        right = right.assign(asof=right["date"].astype(grid["asof"].dtype))
+        joined = pd.merge_asof(grid, right, on="asof", by="ticker")
+        joined = joined.dropna(subset=["date"]).drop(columns="asof")
+        return joined.set_index(["rebalance", "ticker"])
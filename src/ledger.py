@@ -2,28 +2,84 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 import duckdb
 
-from . import db
+from . import db, denom
+
+
+LOT = Decimal("0.0001")  # smallest tradable quantity
+
+
+@dataclass(slots=True)
+class _Position:
+    qty: float
+    cost_basis: float
+    nav: float  # qty valued at the last traded price
 
 
 class Ledger:
     """Simple trading ledger.
 
+    Current quantities and cost bases are loaded once when the ledger is
+    opened and kept in memory afterwards; trades and position rows are
+    buffered and appended to DuckDB in batches.  Call :meth:`flush` (or
+    :meth:`close`, or use the ledger as a context manager) before reading
+    the tables directly.  A batch that fails to persist is dropped and the
+    in-memory positions are restored to the last flushed state.
+
     Parameters
     ----------
     path : str
         File path to the DuckDB database.
+    batch_size : int, default 1000
+        Number of buffered trades that triggers an automatic flush.
     """
 
-    def __init__(self, path: str) -> None:
-        self.con: duckdb.DuckDBPyConnection = db.connect(path)
+    def __init__(self, path: str, batch_size: int = 1000) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.con: duckdb.DuckDBPyConnection = db.cursor(path)
+        self._positions: dict[str, _Position] = {}
+        self._last: tuple[datetime, str] | None = None
+        self._pending_trades: list[tuple[Any, ...]] = []
+        self._pending_positions: list[tuple[Any, ...]] = []
+        self._pending_keys: set[tuple[datetime, str]] = set()
+        self._persisted_ts: datetime | None = None
+        self._flushed: tuple[dict[str, _Position], tuple[datetime, str] | None] = ({}, None)
+        self._load()
+
+    def _load(self) -> None:
+        rows = self.con.execute(
+            """
+            SELECT ticker, qty, cost_basis, nav FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY ts DESC) AS r
+                FROM positions
+            ) WHERE r = 1
+            """
+        ).fetchall()
+        self._positions = {
+            str(t): _Position(float(q), float(c), float(n)) for t, q, c, n in rows
+        }
+        row = self.con.execute(
+            "SELECT ts, ticker FROM trades ORDER BY ts DESC LIMIT 1"
+        ).fetchone()
+        self._last = (row[0], str(row[1])) if row else None
+        self._persisted_ts = row[0] if row else None
+        self._flushed = (dict(self._positions), self._last)
+
+    def __enter__(self) -> Ledger:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
 
     def book_trade(
         self,
@@ -33,24 +89,21 @@ class Ledger:
         price: float,
         fee: float = 0.0,
     ) -> None:
-        """Record a trade and update positions."""
+        """Record a trade and update positions.
 
-        quantity = float(qty)
-        self.con.execute(
-            "INSERT INTO trades VALUES (?, ?, ?, ?, ?)",
-            (ts, ticker, quantity, price, fee),
-        )
+        ``qty`` is quantised to :data:`LOT` here, so sizing code can work in
+        floats and only booked trades pay for the ``Decimal`` rounding.
+        A trade whose ``(ts, ticker)`` key is already booked raises
+        ``ValueError`` before any state changes.
+        """
 
-        prev = self.con.execute(
-            "SELECT qty, cost_basis FROM positions WHERE ticker = ? ORDER BY ts DESC LIMIT 1",
-            (ticker,),
-        ).fetchone()
-        if prev is None:
-            prev_qty = 0.0
-            prev_cost = 0.0
-        else:
-            prev_qty = float(prev[0])
-            prev_cost = float(prev[1])
+        key = (ts, ticker)
+        if key in self._pending_keys or self._is_persisted(ts, ticker):
+            raise ValueError(f"trade {ticker} at {ts} already booked")
+        quantity = float(Decimal(str(qty)).quantize(LOT, rounding=ROUND_HALF_UP))
+        prev = self._positions.get(ticker)
+        prev_qty = prev.qty if prev is not None else 0.0
+        prev_cost = prev.cost_basis if prev is not None else 0.0
 
         new_qty = prev_qty + quantity
         if new_qty == 0:
@@ -59,45 +112,210 @@ class Ledger:
             new_cost = (prev_qty * prev_cost + quantity * price + fee) / new_qty
 
         nav = new_qty * price
-        self.con.execute(
-            "INSERT INTO positions VALUES (?, ?, ?, ?, ?)",
-            (ts, ticker, new_qty, new_cost, nav),
-        )
-        self.con.commit()
+        self._positions[ticker] = _Position(new_qty, new_cost, nav)
+        if self._last is None or ts >= self._last[0]:
+            self._last = (ts, ticker)
+
+        self._pending_keys.add(key)
+        self._pending_trades.append((ts, ticker, quantity, price, fee))
+        self._pending_positions.append((ts, ticker, new_qty, new_cost, nav))
+        if len(self._pending_trades) >= self.batch_size:
+            self.flush()
+
+    def _is_persisted(self, ts: datetime, ticker: str) -> bool:
+        # trades normally arrive in time order, so only look up keys that
+        # could collide with a row already in the table
+        if self._persisted_ts is None or ts > self._persisted_ts:
+            return False
+        row = self.con.execute(
+            "SELECT 1 FROM trades WHERE ts = ? AND ticker = ?", [ts, ticker]
+        ).fetchone()
+        return row is not None
+
+    def _discard_pending(self) -> None:
+        self._pending_trades.clear()
+        self._pending_positions.clear()
+        self._pending_keys.clear()
+
+    def flush(self) -> None:
+        """Persist buffered trades and positions in a single transaction.
+
+        If the insert fails the batch is discarded and positions roll back
+        to the last successful flush before the error is re-raised.
+        """
+
+        if not self._pending_trades:
+            return
+        with db.write_lock(self.path):
+            self.con.begin()
+            try:
+                self.con.executemany(
+                    "INSERT INTO trades VALUES (?, ?, ?, ?, ?)", self._pending_trades
+                )
+                self.con.executemany(
+                    "INSERT INTO positions VALUES (?, ?, ?, ?, ?)",
+                    self._pending_positions,
+                )
+            except Exception:
+                self.con.rollback()
+                positions, self._last = self._flushed
+                self._positions = dict(positions)
+                self._discard_pending()
+                raise
+            self.con.commit()
+        latest = max(t[0] for t in self._pending_trades)
+        if self._persisted_ts is None or latest > self._persisted_ts:
+            self._persisted_ts = latest
+        self._flushed = (dict(self._positions), self._last)
+        self._discard_pending()
+
+    def close(self) -> None:
+        """Flush pending writes and release the cursor."""
+
+        self.flush()
+        self.con.close()
 
     def nav(self) -> float:
         """Return current portfolio NAV."""
 
-        result = self.con.execute(
+        return float(sum(p.nav for p in self._positions.values()))
+
+    def holdings(self) -> pd.Series:
+        """Return the current quantity per ticker."""
+
+        return pd.Series(
+            {t: p.qty for t, p in self._positions.items()}, dtype=float
+        )
+
+    def booked_navs(self) -> pd.Series:
+        """Return each position valued at its last traded price."""
+
+        return pd.Series(
+            {t: p.nav for t, p in self._positions.items()}, dtype=float
+        )
+
+    def _value_usd(self, prices_usd: pd.DataFrame) -> np.ndarray:
+        qty = self.holdings()
+        common = prices_usd.columns.intersection(qty.index)
+        px = prices_usd[common].to_numpy(dtype=float)
+        return px @ qty[common].to_numpy(dtype=float)
+
+    def value_meo(self, prices_usd: pd.Series, meo_usd: float) -> float:
+        """Return NAV in MEΩ units as a float.
+
+        Same valuation as :meth:`nav_meo` without the ``Decimal``
+        conversion; use it inside loops and round only when reporting.
+        """
+
+        per_usd = float(denom.Denominator.per_usd(meo_usd))
+        if np.isnan(per_usd):
+            return 0.0
+        qty = self.holdings()
+        common = prices_usd.index.intersection(qty.index)
+        usd = prices_usd[common].to_numpy(dtype=float) @ qty[common].to_numpy(dtype=float)
+        return float(usd * per_usd)
+
+    def nav_meo_series(
+        self, prices_usd: pd.DataFrame, meo_usd: pd.Series | float
+    ) -> pd.Series:
+        """Value current holdings against a whole ``dates × tickers`` panel.
+
+        Returns a NAV series in MEΩ units indexed like ``prices_usd``;
+        dates with a non-positive MEΩ price are valued at zero.
+        """
+
+        usd = pd.Series(self._value_usd(prices_usd), index=prices_usd.index)
+        if not isinstance(meo_usd, pd.Series):
+            meo_usd = pd.Series(float(meo_usd), index=prices_usd.index)
+        numeraire = denom.Denominator.meo_units(meo_usd)
+        priced = ~np.isnan(numeraire.factors(usd.index))
+        return numeraire.convert(usd).where(priced, 0.0)
+
+    def daily_holdings(self, dates: pd.DatetimeIndex) -> pd.DataFrame:
+        """Return the ``dates × tickers`` quantity held at each date's close.
+
+        Trades are aggregated per day in DuckDB and cumulated per ticker, so
+        the result reflects every booked trade including earlier sessions.
+        """
+
+        self.flush()
+        trades = self.con.execute(
             """
-            SELECT SUM(nav) FROM (
-                SELECT nav, ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY ts DESC) AS r
-                FROM positions
-            ) WHERE r = 1
+            SELECT CAST(ts AS DATE) AS date, ticker, SUM(qty) AS qty
+            FROM trades
+            GROUP BY 1, 2
             """
-        ).fetchone()
-        return float(result[0]) if result and result[0] is not None else 0.0
+        ).df()
+        if trades.empty:
+            return pd.DataFrame(index=dates, dtype=float)
+        trades["date"] = pd.to_datetime(trades["date"])
+        flows = trades.pivot(index="date", columns="ticker", values="qty")
+        flows = flows.reindex(flows.index.union(dates)).fillna(0.0)
+        return flows.cumsum().reindex(dates)
+
+    def daily_nav(
+        self, prices_usd: pd.DataFrame, meo_usd: pd.Series | None = None
+    ) -> pd.DataFrame:
+        """Mark the ledger to market on every row of ``prices_usd``.
+
+        Returns a frame indexed like ``prices_usd`` with ``nav`` in the price
+        currency and ``nav_meo`` in MEΩ units (NaN where no MEΩ price is
+        given).  Holdings and prices are combined in one columnar pass.
+        """
+
+        held = self.daily_holdings(prices_usd.index)
+        common = prices_usd.columns.intersection(held.columns)
+        qty = held[common].to_numpy(dtype=float)
+        px = prices_usd[common].to_numpy(dtype=float)
+        with np.errstate(invalid="ignore"):
+            nav = pd.Series(
+                np.where(qty != 0, qty * px, 0.0).sum(axis=1), index=prices_usd.index
+            )
+        if meo_usd is None:
+            nav_meo = pd.Series(np.nan, index=prices_usd.index)
+        else:
+            nav_meo = denom.Denominator.meo_units(meo_usd).convert(nav)
+        return pd.DataFrame({"nav": nav, "nav_meo": nav_meo})
 
     def nav_meo(self, prices_usd: pd.Series, meo_usd: float) -> Decimal:
         """Return NAV expressed in MEΩ units."""
 
-        total = Decimal("0")
-        for ticker, price in prices_usd.items():
-            row = self.con.execute(
-                "SELECT qty FROM positions WHERE ticker = ? ORDER BY ts DESC LIMIT 1",
-                (ticker,),
-            ).fetchone()
-            if row is None:
-                continue
-            total += Decimal(str(row[0])) * Decimal(str(price))
-        if meo_usd <= 0:
-            return Decimal("0")
-        return total / Decimal(str(meo_usd))
+        return Decimal(str(self.value_meo(prices_usd, meo_usd)))
+
+    def risk_state(self, numeraire: str) -> pd.DataFrame:
+        """Return the stored :class:`src.risk.OnlineRisk` rows for ``numeraire``."""
+
+        return self.con.execute(
+            "SELECT ticker, as_of, state FROM risk_state WHERE numeraire = ?",
+            [numeraire],
+        ).df()
+
+    def save_risk_state(self, frame: pd.DataFrame, numeraire: str) -> None:
+        """Replace the stored rows for ``numeraire`` with ``frame``.
+
+        ``frame`` is :meth:`src.risk.OnlineRisk.to_frame` output; tickers
+        missing from it are dropped, so the table never outgrows the
+        universe the state was last saved for.
+        """
+
+        with db.write_lock(self.path):
+            self.con.register("_risk_state", frame.assign(numeraire=numeraire))
+            self.con.begin()
+            try:
+                self.con.execute("DELETE FROM risk_state WHERE numeraire = ?", [numeraire])
+                if not frame.empty:
+                    self.con.execute(
+                        "INSERT INTO risk_state BY NAME SELECT * FROM _risk_state"
+                    )
+            except Exception:
+                self.con.rollback()
+                raise
+            else:
+                self.con.commit()
+            finally:
+                self.con.unregister("_risk_state")
 
     def last_ticker(self) -> str | None:
         """Return the most recently traded ticker, if any."""
 
-        row = self.con.execute(
-            "SELECT ticker FROM trades ORDER BY ts DESC LIMIT 1"
-        ).fetchone()
-        return row[0] if row else None
+        return self._last[1] if self._last else None
@@ -1,7 +1,13 @@
+import asyncio
+import math
+import threading
 import pandas as pd
 import numpy as np
-from datetime import date, timedelta
-from typing import Tuple, Dict
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Hashable, Iterable, List, Mapping, Tuple, Dict
 
 import requests
 import yfinance as yf
@@ -15,46 +21,147 @@ M2_MAP: Dict[str, str] = {
     "CHF": "MYAGM2CHM196N",
 }
 
+_METAL_CODES = ("GOLDAMGBD228NLBM", "SLVPRUSD")  # FRED gold and silver fixings
+
 _GOLD_STOCK_T = 205_000
 _SILVER_STOCK_T = 1_600_000
 _OZ_PER_TON = 32150.7
 
 
-def _fred_series(code: str, as_of: date) -> float | None:
-    fred = Fred()
-    start = as_of - timedelta(days=90)
-    s = fred.get_series(code, observation_start=start)
-    s = s.dropna()
-    if s.empty:
+class SeriesCache:
+    """LRU cache of downloaded time series keyed by ``(kind, code, start, end)``.
+
+    A request is answered from any cached range of the same series that
+    covers it, so one download per window serves every as-of date inside
+    it.  With ``directory`` set, downloads are also pickled to disk and
+    reused across processes and runs.  Lookups are thread-safe, so several
+    loaders may run concurrently in worker threads.
+
+    Parameters
+    ----------
+    maxsize : int, default 64
+        Number of series kept in memory.
+    directory : str or pathlib.Path, optional
+        On-disk tier; disabled when ``None``.
+    """
+
+    def __init__(self, maxsize: int = 64, directory: str | Path | None = None) -> None:
+        self.maxsize = maxsize
+        self.directory = Path(directory) if directory is not None else None
+        self._entries: OrderedDict[Tuple[str, str, date, date], pd.Series] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _path(self, kind: str, code: str, start: date, end: date) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{kind}-{code}-{start:%Y%m%d}-{end:%Y%m%d}.pkl"
+
+    def _from_memory(self, kind: str, code: str, start: date, end: date) -> pd.Series | None:
+        with self._lock:
+            for key in list(self._entries):
+                k, c, lo, hi = key
+                if k == kind and c == code and lo <= start and end <= hi:
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
         return None
-    val = s.iloc[-1]
-    if (as_of - s.index[-1].date()).days > 60:
+
+    def _from_disk(self, kind: str, code: str, start: date, end: date) -> pd.Series | None:
+        if self.directory is None:
+            return None
+        for path in self.directory.glob(f"{kind}-{code}-*.pkl"):
+            lo_s, hi_s = path.stem.rsplit("-", 2)[1:]
+            lo = datetime.strptime(lo_s, "%Y%m%d").date()
+            hi = datetime.strptime(hi_s, "%Y%m%d").date()
+            if lo <= start and end <= hi:
+                s: pd.Series = pd.read_pickle(path)
+                self._remember((kind, code, lo, hi), s)
+                return s
         return None
-    return float(val)
+
+    def _remember(self, key: Tuple[str, str, date, date], s: pd.Series) -> None:
+        with self._lock:
+            self._entries[key] = s
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(
+        self,
+        kind: str,
+        code: str,
+        start: date,
+        end: date,
+        loader: Callable[[str, date, date], pd.Series],
+    ) -> pd.Series:
+        """Return the series for ``[start, end]``, calling ``loader`` on a miss."""
+
+        s = self._from_memory(kind, code, start, end)
+        if s is None:
+            s = self._from_disk(kind, code, start, end)
+        if s is None:
+            s = loader(code, start, end)
+            self._remember((kind, code, start, end), s)
+            if self.directory is not None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                s.to_pickle(self._path(kind, code, start, end))
+        return s
+
+
+_cache = SeriesCache()
+
+
+def configure_cache(maxsize: int = 64, directory: str | Path | None = None) -> None:
+    """Replace the module-level component cache."""
+
+    global _cache
+    _cache = SeriesCache(maxsize, directory)
+
+
+def clear_cache() -> None:
+    """Drop every in-memory entry of the component cache."""
+
+    _cache.clear()
+    _crypto_snapshot.cache_clear()
+
+
+def _window(as_of: date) -> Tuple[date, date]:
+    """Calendar-year window containing ``as_of``, clipped to today."""
+
+    return date(as_of.year, 1, 1), min(date(as_of.year, 12, 31), date.today())
+
+
+@lru_cache(maxsize=1)
+def _fred() -> Fred:
+    return Fred()
+
+
+def _fred_series(code: str, as_of: date) -> float | None:
+    s = _cache.get("fred", code, *_window(as_of), _fred_history)
+    val = _as_of(s, pd.DatetimeIndex([as_of]), 60).iloc[0]
+    return None if pd.isna(val) else float(val)
 
 
 def _fx_rate(sym: str, as_of: date) -> float:
     if sym == "USD":
         return 1.0
-    pair = f"{sym}USD=X"
-    df = yf.download(
-        pair,
-        start=as_of - timedelta(days=7),
-        end=as_of + timedelta(days=1),
-        progress=False,
-        auto_adjust=True,
-        threads=False,
-    )
-    if df.empty:
-        return float("nan")
-    return float(df["Adj Close"].iloc[-1])
+    s = _cache.get("fx", sym, *_window(as_of), _fx_history)
+    return float(_as_of(s, pd.DatetimeIndex([as_of]), 7).iloc[0])
 
 
-def _crypto_caps(as_of: date) -> Dict[str, float]:
+@lru_cache(maxsize=1)
+def _crypto_snapshot(day: date) -> Tuple[Tuple[str, float], ...]:
     url = "https://api.coingecko.com/api/v3/coins/markets"
     params = {"vs_currency": "usd", "ids": "bitcoin,ethereum"}
     data = requests.get(url, params=params, timeout=10).json()
-    return {d["symbol"].upper(): d["market_cap"] / 1e9 for d in data}
+    return tuple((d["symbol"].upper(), d["market_cap"] / 1e9) for d in data)
+
+
+def _crypto_caps(as_of: date) -> Dict[str, float]:
+    # CoinGecko only serves current caps; fetch them at most once per day
+    return dict(_crypto_snapshot(date.today()))
 
 
 def fetch_meo_components(as_of: date) -> Tuple[pd.DataFrame, float]:
@@ -67,12 +174,12 @@ def fetch_meo_components(as_of: date) -> Tuple[pd.DataFrame, float]:
         mc_usd = m2 * fx
         rows.append({"symbol": sym, "mc_native": m2, "fx_usd": fx, "mc_usd": mc_usd})
 
-    gold_price = _fred_series("GOLDAMGBD228NLBM", as_of)
+    gold_price = _fred_series(_METAL_CODES[0], as_of)
     if gold_price:
         mc = _GOLD_STOCK_T * _OZ_PER_TON * gold_price / 1e9
         rows.append({"symbol": "XAU", "mc_native": mc, "fx_usd": 1.0, "mc_usd": mc})
 
-    silver_price = _fred_series("SLVPRUSD", as_of)
+    silver_price = _fred_series(_METAL_CODES[1], as_of)
     if silver_price:
         mc = _SILVER_STOCK_T * _OZ_PER_TON * silver_price / 1e9
         rows.append({"symbol": "XAG", "mc_native": mc, "fx_usd": 1.0, "mc_usd": mc})
@@ -90,11 +197,271 @@ def fetch_meo_components(as_of: date) -> Tuple[pd.DataFrame, float]:
     return df, m_world
 
 
+Request = Tuple[str, Hashable, Callable[..., Any], Tuple[Any, ...]]
+
+
+def component_requests(start: date, end: date | None = None) -> List[Request]:
+    """Downloads that fill the component cache for ``[start, end]``.
+
+    Each entry is ``(provider, key, fn, args)``: FRED series, Yahoo FX
+    pairs and the CoinGecko snapshot, so callers can run them under the
+    matching provider limits before :func:`fetch_meo_history` (or, with
+    ``end`` omitted, :func:`fetch_meo_components` for ``start``) reads
+    everything from the cache.
+    """
+
+    if end is None:
+        start, end = _window(start)
+    jobs: List[Request] = [
+        ("fred", ("fred", code, start, end), _cache.get, ("fred", code, start, end, _fred_history))
+        for code in (*M2_MAP.values(), *_METAL_CODES)
+    ]
+    jobs += [
+        ("yahoo", ("fx", sym, start, end), _cache.get, ("fx", sym, start, end, _fx_history))
+        for sym in M2_MAP
+        if sym != "USD"
+    ]
+    today = date.today()
+    jobs.append(("coingecko", ("crypto", today), _crypto_snapshot, (today,)))
+    return jobs
+
+
+def _fred_history(code: str, start: date, end: date) -> pd.Series:
+    s = _fred().get_series(
+        code, observation_start=start - timedelta(days=90), observation_end=end
+    )
+    return s.dropna()
+
+
+def _fx_history(sym: str, start: date, end: date) -> pd.Series:
+    pair = f"{sym}USD=X"
+    df = yf.download(
+        pair,
+        start=start - timedelta(days=7),
+        end=end + timedelta(days=1),
+        progress=False,
+        auto_adjust=True,
+        threads=False,
+    )
+    if df.empty:
+        return pd.Series(dtype=float)
+    col = "Adj Close" if "Adj Close" in df.columns else "Close"
+    px = df[col]
+    if isinstance(px, pd.DataFrame):  # newer yfinance keeps a ticker level
+        px = px.iloc[:, 0]
+    return px.dropna()
+
+
+def _as_of(s: pd.Series, dates: pd.DatetimeIndex, max_age_days: int) -> pd.Series:
+    """Latest value of ``s`` on or before each date, NaN once it is stale."""
+
+    if s.empty:
+        return pd.Series(np.nan, index=dates)
+    s = s.copy()
+    s.index = pd.to_datetime(s.index)
+    s = s[~s.index.duplicated(keep="last")].sort_index()
+    return s.reindex(
+        dates, method="ffill", tolerance=pd.Timedelta(days=max_age_days)
+    ).astype(float)
+
+
+def fetch_meo_history(dates: Iterable[pd.Timestamp]) -> Tuple[pd.DataFrame, pd.Series]:
+    """Vectorised :func:`fetch_meo_components` for many dates at once.
+
+    Every FRED and FX series is downloaded once for the whole window and
+    aligned to ``dates`` with the same staleness rules as the single-date
+    helpers (60 days for FRED, 7 days for FX).  CoinGecko only serves
+    current market caps, so one snapshot is broadcast over the window just
+    as the per-date path does.
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, pd.Series]
+        ``dates × symbols`` market caps in USD bn (NaN where a component is
+        unavailable) and the ``m_world`` total per date.
+    """
+
+    idx = pd.DatetimeIndex(pd.to_datetime(list(dates))).normalize().unique().sort_values()
+    if idx.empty:
+        return pd.DataFrame(index=idx, dtype=float), pd.Series(index=idx, dtype=float)
+    start, end = idx[0].date(), idx[-1].date()
+
+    caps: Dict[str, pd.Series] = {}
+    for sym, code in M2_MAP.items():
+        m2 = _as_of(_cache.get("fred", code, start, end, _fred_history), idx, 60)
+        if sym == "USD":
+            fx = pd.Series(1.0, index=idx)
+        else:
+            fx = _as_of(_cache.get("fx", sym, start, end, _fx_history), idx, 7)
+        caps[sym] = m2 * fx
+
+    gold = _as_of(_cache.get("fred", _METAL_CODES[0], start, end, _fred_history), idx, 60)
+    caps["XAU"] = (_GOLD_STOCK_T * _OZ_PER_TON * gold / 1e9).where(gold > 0)
+    silver = _as_of(_cache.get("fred", _METAL_CODES[1], start, end, _fred_history), idx, 60)
+    caps["XAG"] = (_SILVER_STOCK_T * _OZ_PER_TON * silver / 1e9).where(silver > 0)
+
+    for k, v in _crypto_caps(end).items():
+        caps[k] = pd.Series(v, index=idx, dtype=float)
+
+    mc = pd.DataFrame(caps, index=idx).sort_index(axis=1)
+    mc.index.name = "date"
+    mc.columns.name = "symbol"
+    return mc, mc.sum(axis=1)
+
+
+def fx_series(sym: str, start: date, end: date) -> pd.Series:
+    """USD per unit of ``sym`` over ``[start, end]`` from the component cache.
+
+    The index is sorted and unique, ready for as-of lookups.
+    """
+
+    s = _cache.get("fx", sym, start, end, _fx_history).astype(float)
+    s.index = pd.to_datetime(s.index)
+    return s[~s.index.duplicated(keep="last")].sort_index()
+
+
 def meo_price_usd(m_world_usd: float, kappa: float = 1e-6) -> float:
     return kappa * m_world_usd
 
 
-def meo_cross_price(px_meo_usd: float, fx_j_usd: float) -> float:
-    if fx_j_usd == 0:
-        return float("nan")
-    return px_meo_usd / fx_j_usd
+def meo_cross_price(px_meo_usd: Any, fx_j_usd: Any) -> Any:
+    """MEΩ price in currency ``j``; scalars, arrays and aligned pandas objects."""
+
+    if np.ndim(px_meo_usd) == 0 and np.ndim(fx_j_usd) == 0:
+        if fx_j_usd == 0:
+            return float("nan")
+        return px_meo_usd / fx_j_usd
+    if isinstance(fx_j_usd, (pd.Series, pd.DataFrame)):
+        return px_meo_usd / fx_j_usd.where(fx_j_usd != 0)
+    fx = np.asarray(fx_j_usd, dtype=float)
+    return np.asarray(px_meo_usd, dtype=float) / np.where(fx == 0, np.nan, fx)
+
+
+_RESYNC_EVERY = 10_000  # updates between exact re-summations of m_world
+
+
+class StreamingMEO:
+    """MEΩ index kept up to date one component at a time.
+
+    Market caps are held per component; an update adjusts ``m_world`` by
+    the difference to the previous cap, so the index price and any single
+    weight are O(1) per tick.  ``m_world`` is re-summed exactly every
+    ``_RESYNC_EVERY`` updates to bound floating-point drift.
+
+    Updates must be made from the event-loop thread when :meth:`stream`
+    consumers are attached.
+
+    Parameters
+    ----------
+    mc_usd : Mapping[str, float]
+        Initial market cap per component in USD bn.
+    kappa : float, default 1e-6
+        Scale used by :func:`meo_price_usd`.
+    m2, fx : Mapping[str, float], optional
+        Native money stock and USD rate per fiat symbol, needed to apply
+        :meth:`set_fx` and :meth:`set_m2` ticks.
+    """
+
+    def __init__(
+        self,
+        mc_usd: Mapping[str, float],
+        kappa: float = 1e-6,
+        m2: Mapping[str, float] | None = None,
+        fx: Mapping[str, float] | None = None,
+    ) -> None:
+        self.kappa = kappa
+        self._mc = {k: float(v) for k, v in mc_usd.items() if math.isfinite(v)}
+        self._m2 = dict(m2 or {})
+        self._fx = dict(fx or {})
+        self._m_world = math.fsum(self._mc.values())
+        self._updates = 0
+        self._subscribers: list[asyncio.Queue[float]] = []
+
+    @classmethod
+    def from_components(cls, df: pd.DataFrame, kappa: float = 1e-6) -> "StreamingMEO":
+        """Seed from the frame returned by :func:`fetch_meo_components`."""
+
+        fiat = df.loc[df.index.isin(list(M2_MAP))]
+        return cls(
+            df["mc_usd"].to_dict(),
+            kappa,
+            fiat["mc_native"].to_dict(),
+            fiat["fx_usd"].to_dict(),
+        )
+
+    @property
+    def m_world(self) -> float:
+        return self._m_world
+
+    @property
+    def price(self) -> float:
+        return meo_price_usd(self._m_world, self.kappa)
+
+    def weight(self, symbol: str) -> float:
+        if self._m_world <= 0:
+            return float("nan")
+        return self._mc.get(symbol, 0.0) / self._m_world
+
+    def weights(self) -> pd.Series:
+        """Weight per component; NaN while ``m_world`` is not positive."""
+
+        caps = pd.Series(self._mc, dtype=float).sort_index()
+        if self._m_world <= 0:
+            return pd.Series(np.nan, index=caps.index)
+        return caps / self._m_world
+
+    def set_cap(self, symbol: str, mc_usd: float | None) -> float:
+        """Replace one component's market cap and return the new MEΩ price.
+
+        ``None``, NaN or a non-positive cap drops the component.
+        """
+
+        old = self._mc.pop(symbol, 0.0)
+        new = 0.0
+        if mc_usd is not None and math.isfinite(mc_usd) and mc_usd > 0:
+            new = float(mc_usd)
+            self._mc[symbol] = new
+        self._m_world += new - old
+        self._updates += 1
+        if not self._mc or self._updates % _RESYNC_EVERY == 0:
+            self._m_world = math.fsum(self._mc.values())
+        price = self.price
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()  # keep the freshest prices
+            queue.put_nowait(price)
+        return price
+
+    def set_fx(self, symbol: str, fx_usd: float) -> float:
+        self._fx[symbol] = fx_usd
+        m2 = self._m2.get(symbol)
+        if m2 is None:
+            return self.price
+        return self.set_cap(symbol, m2 * fx_usd)
+
+    def set_m2(self, symbol: str, m2: float) -> float:
+        self._m2[symbol] = m2
+        fx = self._fx.get(symbol, 1.0 if symbol == "USD" else float("nan"))
+        return self.set_cap(symbol, m2 * fx)
+
+    def set_gold(self, price_usd: float) -> float:
+        return self.set_cap("XAU", _GOLD_STOCK_T * _OZ_PER_TON * price_usd / 1e9)
+
+    def set_silver(self, price_usd: float) -> float:
+        return self.set_cap("XAG", _SILVER_STOCK_T * _OZ_PER_TON * price_usd / 1e9)
+
+    async def stream(self, maxsize: int = 0) -> AsyncIterator[float]:
+        """Yield the current MEΩ price, then the price after every update.
+
+        With ``maxsize`` > 0 a slow consumer only sees the latest
+        ``maxsize`` prices.
+        """
+
+        queue: asyncio.Queue[float] = asyncio.Queue(maxsize)
+        self._subscribers.append(queue)
+        try:
+            yield self.price
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.remove(queue)
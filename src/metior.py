@@ -8,11 +8,11 @@ Every public method includes doctests that run with ``pytest``.
 
 from dataclasses import dataclass
 from hashlib import sha256
-from typing import Generator, Iterable, Mapping, Sequence, cast
+from typing import Any, Generator, Iterable, Mapping, Sequence, cast
 
 import numpy as np
 import pandas as pd
-from numpy.typing import NDArray
+from numpy.typing import DTypeLike, NDArray
 from scipy import stats
 
 
@@ -99,27 +99,90 @@ class JumpDiffusionProcess:
         """Cumulative distribution of a single jump."""
         return float(stats.norm.cdf(x, loc=self.jump_mu, scale=self.jump_delta))
 
-    def sample(self, n: int, x0: float | NDArray[np.float64]) -> NDArray[np.float64]:
+    def sample(
+        self,
+        n: int,
+        x0: float | NDArray[np.floating[Any]],
+        rng: np.random.Generator | int | None = None,
+        paths: int | None = None,
+        max_bytes: int | None = None,
+        dtype: DTypeLike = np.float64,
+    ) -> NDArray[np.floating[Any]]:
         """Simulate ``n`` steps starting from ``x0``.
 
+        ``x0`` is a scalar or an array of path starts; with ``paths`` a
+        scalar start is broadcast to that many paths.  ``rng`` may be a
+        :class:`numpy.random.Generator` or a seed.  ``max_bytes`` bounds the
+        scratch memory per block of steps (see :meth:`sample_chunks`), and
+        ``dtype=np.float32`` halves memory for large runs.
+
         >>> jd = JumpDiffusionProcess(0.0, 0.1, 0.0, 0.0, 0.1)
         >>> jd.sample(3, 1.0).shape
         (4,)
+        >>> jd.sample(3, 0.0, rng=1, paths=5, dtype=np.float32).dtype
+        dtype('float32')
         """
-        rng = np.random.default_rng()
-        x = np.asarray(x0, dtype=np.float64)
-        out = np.empty((n + 1,) + x.shape, dtype=np.float64)
+        x = np.asarray(x0, dtype=dtype)
+        if paths is not None:
+            x = np.broadcast_to(x, (paths,))
+        out = np.empty((n + 1,) + x.shape, dtype=x.dtype)
         out[0] = x
-        for i in range(1, n + 1):
-            dW = rng.normal(0.0, np.sqrt(self.dt), size=x.shape)
-            count = rng.poisson(self.lam * self.dt, size=x.shape)
-            jump_mean = count * self.jump_mu
-            jump_std = np.sqrt(count) * self.jump_delta
-            jumps = rng.normal(jump_mean, jump_std)
-            x = x + self.mu * self.dt + self.sigma * dW + jumps
-            out[i] = x
+        chunk = None
+        if max_bytes is not None:
+            # standard normals, Poisson counts and jumps per step
+            per_step = max(1, x.size) * (2 * x.dtype.itemsize + 8)
+            chunk = max(1, max_bytes // per_step)
+        i = 1
+        for block in self.sample_chunks(n, x, chunk, rng, x.dtype):
+            out[i : i + len(block)] = block
+            i += len(block)
         return out
 
+    def sample_chunks(
+        self,
+        n: int,
+        x0: float | NDArray[np.floating[Any]],
+        chunk: int | None = None,
+        rng: np.random.Generator | int | None = None,
+        dtype: DTypeLike = np.float64,
+    ) -> Generator[NDArray[np.floating[Any]], None, None]:
+        """Yield the ``n`` simulated steps in blocks of at most ``chunk`` steps.
+
+        Each block draws all increments with a few array calls and
+        cumulates them onto the last state of the previous block, so runs
+        larger than memory can be streamed.  The same seed and ``chunk``
+        reproduce the same paths.
+
+        >>> jd = JumpDiffusionProcess(0.0, 0.1, 0.5, 0.0, 0.1)
+        >>> [b.shape for b in jd.sample_chunks(5, np.zeros(3), chunk=2, rng=0)]
+        [(2, 3), (2, 3), (1, 3)]
+        """
+        gen = np.random.default_rng(rng)
+        x = np.array(x0, dtype=dtype)
+        step = max(1, chunk or n)
+        drift = self.mu * self.dt
+        vol = self.sigma * np.sqrt(self.dt)
+        jumps = self.lam > 0 and (self.jump_mu != 0 or self.jump_delta != 0)
+        done = 0
+        while done < n:
+            shape = (min(step, n - done),) + x.shape
+            inc = gen.standard_normal(shape, dtype=x.dtype)
+            inc *= vol
+            inc += drift
+            if jumps:
+                count = gen.poisson(self.lam * self.dt, shape)
+                hit = count > 0
+                k = count[hit]
+                size = k * self.jump_mu
+                if self.jump_delta:
+                    size = size + np.sqrt(k) * self.jump_delta * gen.standard_normal(k.size)
+                inc[hit] += size.astype(x.dtype)
+            np.cumsum(inc, axis=0, out=inc)
+            inc += x
+            x = inc[-1].copy()
+            done += len(inc)
+            yield inc
+
 
 # ---------------------------------------------------------------------------
 # ReplicatorDynamics
@@ -219,6 +282,64 @@ class EVTThreshold:
             return float(thr + adj)
         return float(thr - adj)
 
+    def fit_rolling(
+        self,
+        returns: pd.DataFrame,
+        window: int,
+        tail: str = "left",
+        step: int = 1,
+    ) -> pd.DataFrame:
+        """Return :meth:`fit` over rolling windows of every column.
+
+        GPD fits are warm-started from the previous window of the same
+        column.  With ``step > 1`` the estimate is refitted every ``step``
+        rows and carried forward in between.  Unlike :meth:`fit`, the
+        instance is left untouched: :attr:`lambda_` keeps its last value.
+
+        >>> rng = np.random.default_rng(0)
+        >>> df = pd.DataFrame(rng.normal(0, 1, (60, 2)), columns=["a", "b"])
+        >>> out = EVTThreshold(0.95).fit_rolling(df, 40, step=10)
+        >>> out.shape
+        (60, 2)
+        >>> bool(out.iloc[:39].isna().all().all() and out.iloc[39:].notna().all().all())
+        True
+        """
+        if window < 30:
+            raise ValueError("need at least 30 samples")
+        if tail not in {"right", "left"}:
+            raise ValueError("tail must be 'right' or 'left'")
+        x = returns.to_numpy(dtype=np.float64)
+        n, k = x.shape
+        out = np.full((n, k), np.nan)
+        q = self.quantile
+        guess: list[tuple[float, float] | None] = [None] * k
+        for end in range(window, n + 1, step):
+            block = x[end - window : end]
+            thr = np.quantile(block, q if tail == "right" else 1.0 - q, axis=0)
+            for j in range(k):
+                col = block[:, j]
+                if np.isnan(col).any():
+                    continue
+                if tail == "right":
+                    excess = col[col > thr[j]] - thr[j]
+                else:
+                    excess = thr[j] - col[col < thr[j]]
+                if excess.size == 0:
+                    out[end - 1, j] = thr[j]
+                    continue
+                start = guess[j]
+                if start is None:
+                    c, _, scale = stats.genpareto.fit(excess, floc=0.0)
+                else:
+                    c, _, scale = stats.genpareto.fit(
+                        excess, start[0], floc=0.0, scale=start[1]
+                    )
+                guess[j] = (c, scale)
+                adj = stats.genpareto.ppf(q, c, loc=0.0, scale=scale)
+                out[end - 1, j] = thr[j] + adj if tail == "right" else thr[j] - adj
+        frame = pd.DataFrame(out, index=returns.index, columns=returns.columns)
+        return frame.ffill(limit=step - 1) if step > 1 else frame
+
 
 # ---------------------------------------------------------------------------
 # BenfordOptimizer
@@ -2,20 +2,55 @@
 
 from __future__ import annotations
 
+import json
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Sequence
+
 import numpy as np
 import pandas as pd
 from arch import arch_model
+from scipy.optimize import minimize
+
+from . import costs
+
+try:  # optional compiled kernel for :func:`garch11_filter`
+    import numba
+except ImportError:  # pragma: no cover - numba is not a hard dependency
+    numba = None  # type: ignore[assignment]
+
+
+_GARCH_SCALE = 100.0
+
+
+def _fit_garch(r: pd.Series, starting_values: np.ndarray | None = None) -> Any:
+    """Fit a zero-mean GARCH(1,1) to scaled returns, ``None`` on failure."""
+
+    model = arch_model(r, p=1, q=1, mean="zero", vol="GARCH", rescale=False)
+    try:
+        return model.fit(disp="off", starting_values=starting_values)
+    except Exception:
+        return None
+
 
+def _relative(prices: pd.Series, denom_series: pd.Series | None) -> pd.Series:
+    return prices if denom_series is None else prices / denom_series
 
-def garch_sigma(prices: pd.Series, denom_series: pd.Series) -> pd.Series:
+
+def garch_sigma(prices: pd.Series, denom_series: pd.Series | None = None) -> pd.Series:
     """Estimate conditional volatility via a GARCH(1,1) model.
 
     Parameters
     ----------
     prices : pandas.Series
         Price series.
-    denom_series : pandas.Series
-        Series of MEΩ prices aligned to ``prices``.
+    denom_series : pandas.Series, optional
+        Series of MEΩ prices aligned to ``prices``; ``None`` when ``prices``
+        are already denominated (see :class:`src.denom.Denominator`).
 
     Returns
     -------
@@ -24,22 +59,706 @@ def garch_sigma(prices: pd.Series, denom_series: pd.Series) -> pd.Series:
         series when the model cannot be fitted.
     """
 
-    rel = prices / denom_series
+    rel = _relative(prices, denom_series)
     r = np.log(rel).diff().dropna()
     if len(r) < 20:
         return pd.Series(index=prices.index, dtype=float)
 
-    scale = 100.0
-    model = arch_model(r * scale, p=1, q=1, mean="zero", vol="GARCH", rescale=False)
-    try:
-        res = model.fit(disp="off")
-    except Exception:
+    res = _fit_garch(r * _GARCH_SCALE)
+    if res is None:
         return pd.Series(index=prices.index, dtype=float)
 
-    sigma = pd.Series(res.conditional_volatility / scale, index=r.index)
+    sigma = pd.Series(
+        np.asarray(res.conditional_volatility) / _GARCH_SCALE, index=r.index
+    )
     return sigma.reindex(prices.index)
 
 
+@dataclass(slots=True)
+class _GarchState:
+    params: np.ndarray  # omega, alpha, beta on the scaled returns
+    period: pd.Period
+    last_date: pd.Timestamp
+    last_ret: float  # scaled return observed on ``last_date``
+    sigma2: float  # conditional variance for ``last_date``
+
+
+class GarchSigmaEngine:
+    """Stateful GARCH(1,1) volatility for repeated rebalances.
+
+    :func:`garch_sigma` refits the model on the whole history every time it
+    is called.  The engine keeps the fitted parameters per ticker between
+    calls and only refits once per ``refit_freq`` period, warm-starting the
+    optimiser from the previous parameters.  In between, the conditional
+    variance recursion is extended with the returns observed since the last
+    call.
+
+    Parameters
+    ----------
+    mode : {"incremental", "refit"}, default "incremental"
+        ``"refit"`` reproduces :func:`garch_sigma` exactly on every call.
+    refit_freq : str, default "M"
+        Pandas period alias for the refit schedule in incremental mode.
+    """
+
+    def __init__(self, mode: str = "incremental", refit_freq: str = "M") -> None:
+        if mode not in {"incremental", "refit"}:
+            raise ValueError("mode must be 'incremental' or 'refit'")
+        self.mode = mode
+        self.refit_freq = refit_freq
+        self._state: dict[str, _GarchState] = {}
+
+    def sigma(
+        self,
+        price_df: pd.DataFrame,
+        date: pd.Timestamp,
+        denom: pd.Series | None = None,
+    ) -> pd.Series:
+        """Return the latest conditional volatility per ticker as of ``date``.
+
+        ``price_df`` has ``(ticker, field)`` columns as returned by
+        :func:`src.async_data.fetch_prices`; pass ``denom=None`` when it is
+        already denominated.
+        """
+
+        sigmas: dict[str, float] = {}
+        for t in price_df.columns.levels[0]:
+            series = price_df[t]["adj_close"].loc[:date]
+            if series.empty:
+                sigmas[t] = float("nan")
+                continue
+            denom_series = denom.loc[series.index] if denom is not None else None
+            if self.mode == "refit":
+                s = garch_sigma(series, denom_series)
+                sigmas[t] = s.iloc[-1] if not s.empty else float("nan")
+            else:
+                sigmas[t] = self._incremental(str(t), series, denom_series, date)
+        return pd.Series(sigmas)
+
+    def _incremental(
+        self,
+        ticker: str,
+        prices: pd.Series,
+        denom_series: pd.Series | None,
+        date: pd.Timestamp,
+    ) -> float:
+        period = pd.Timestamp(date).to_period(self.refit_freq)
+        state = self._state.get(ticker)
+        if state is None or state.period != period:
+            refitted = self._refit(ticker, prices, denom_series, period, state)
+            if refitted is not None:
+                return float(np.sqrt(refitted.sigma2) / _GARCH_SCALE)
+            if state is None:
+                return float("nan")
+            # failed refit: keep extending the previous parameters until the
+            # next scheduled refit
+            state.period = period
+
+        since = slice(state.last_date, None)
+        tail = denom_series.loc[since] if denom_series is not None else None
+        rel = _relative(prices.loc[since], tail)
+        r = np.log(rel).diff().dropna() * _GARCH_SCALE
+        omega, alpha, beta = state.params
+        for ts, ret in r.items():
+            state.sigma2 = omega + alpha * state.last_ret**2 + beta * state.sigma2
+            state.last_ret = float(ret)
+            state.last_date = pd.Timestamp(ts)
+        return float(np.sqrt(state.sigma2) / _GARCH_SCALE)
+
+    def _refit(
+        self,
+        ticker: str,
+        prices: pd.Series,
+        denom_series: pd.Series | None,
+        period: pd.Period,
+        previous: _GarchState | None,
+    ) -> _GarchState | None:
+        r = np.log(_relative(prices, denom_series)).diff().dropna()
+        if len(r) < 20:
+            return None
+        start = previous.params if previous is not None else None
+        res = _fit_garch(r * _GARCH_SCALE, starting_values=start)
+        if res is None:
+            return None
+        cond_vol = np.asarray(res.conditional_volatility)
+        state = _GarchState(
+            params=np.asarray(res.params, dtype=float),
+            period=period,
+            last_date=pd.Timestamp(r.index[-1]),
+            last_ret=float(r.iloc[-1] * _GARCH_SCALE),
+            sigma2=float(cond_vol[-1] ** 2),
+        )
+        self._state[ticker] = state
+        return state
+
+
+@dataclass(slots=True)
+class _OnlineState:
+    last_date: pd.Timestamp
+    last_price: float  # denominated close on ``last_date``
+    ewma_var: float = float("nan")
+    window: deque[float] = field(default_factory=deque)
+    win_sum: float = 0.0
+    win_sumsq: float = 0.0
+    # Welford co-moments of (fx, asset) returns for ``fx_beta``
+    fx_n: int = 0
+    fx_mean: float = 0.0
+    asset_mean: float = 0.0
+    c_xy: float = 0.0
+    m2_x: float = 0.0
+
+
+class OnlineRisk:
+    """Streaming risk estimators updated in O(1) per new bar.
+
+    Keeps, per ticker, a RiskMetrics EWMA variance, a windowed realised
+    variance from running sums, a GARCH(1,1) variance extended with frozen
+    parameters (refitted once per ``refit_freq`` period as in
+    :class:`GarchSigmaEngine`) and running co-moments for :func:`fx_beta`.
+    The state round-trips through :meth:`to_frame` / :meth:`from_frame` so
+    the live trade step can resume it from DuckDB (see
+    :meth:`src.ledger.Ledger.save_risk_state`).
+
+    Parameters
+    ----------
+    window : int, default 63
+        Window of the realised volatility, as in :func:`realised_sigma`.
+    lam : float, default 0.94
+        EWMA decay.
+    refit_freq : str, default "M"
+        Pandas period alias for GARCH refits.
+    """
+
+    def __init__(self, window: int = 63, lam: float = 0.94, refit_freq: str = "M") -> None:
+        self.window = window
+        self.lam = lam
+        self.garch = GarchSigmaEngine("incremental", refit_freq)
+        self._state: dict[str, _OnlineState] = {}
+
+    def update(
+        self,
+        ticker: str,
+        date: pd.Timestamp,
+        price: float,
+        fx_return: float | None = None,
+    ) -> None:
+        """Feed one denominated close; bars at or before the last one are ignored."""
+
+        date = pd.Timestamp(date)
+        if not np.isfinite(price) or price <= 0:
+            return
+        st = self._state.get(ticker)
+        if st is None:
+            self._state[ticker] = _OnlineState(date, float(price))
+            return
+        if date <= st.last_date:
+            return
+        r = float(np.log(price / st.last_price))
+        st.last_date, st.last_price = date, float(price)
+
+        if np.isnan(st.ewma_var):
+            st.ewma_var = r * r
+        else:
+            st.ewma_var = self.lam * st.ewma_var + (1.0 - self.lam) * r * r
+        st.window.append(r)
+        st.win_sum += r
+        st.win_sumsq += r * r
+        if len(st.window) > self.window:
+            old = st.window.popleft()
+            st.win_sum -= old
+            st.win_sumsq -= old * old
+
+        if fx_return is not None and np.isfinite(fx_return):
+            st.fx_n += 1
+            dx = fx_return - st.fx_mean
+            st.fx_mean += dx / st.fx_n
+            st.asset_mean += (r - st.asset_mean) / st.fx_n
+            st.c_xy += dx * (r - st.asset_mean)
+            st.m2_x += dx * (fx_return - st.fx_mean)
+
+        g = self.garch._state.get(ticker)
+        if g is not None and date > g.last_date:
+            omega, alpha, beta = g.params
+            g.sigma2 = omega + alpha * g.last_ret**2 + beta * g.sigma2
+            g.last_ret = r * _GARCH_SCALE
+            g.last_date = date
+
+    def catch_up(
+        self, prices: pd.DataFrame, fx_returns: pd.Series | None = None
+    ) -> None:
+        """Feed the bars of ``prices`` newer than the stored state.
+
+        ``prices`` is a ``dates × tickers`` panel already in the target
+        numéraire.  GARCH parameters are refitted on the supplied history
+        when a new ``refit_freq`` period starts (or no fit exists yet).
+        """
+
+        for t in prices.columns:
+            series = prices[t].dropna()
+            series = series[series > 0]
+            if series.empty:
+                continue
+            ticker = str(t)
+            st = self._state.get(ticker)
+            new = series if st is None else series[series.index > st.last_date]
+            for d, px in new.items():
+                fx = fx_returns.get(d) if fx_returns is not None else None
+                self.update(ticker, d, float(px), fx)
+            period = pd.Timestamp(series.index[-1]).to_period(self.garch.refit_freq)
+            g = self.garch._state.get(ticker)
+            if g is None or g.period != period:
+                self.garch._refit(ticker, series, None, period, g)
+
+    def sigma(self, method: str = "garch") -> pd.Series:
+        """Latest volatility per ticker.
+
+        ``method`` is ``"garch"`` (or ``"garch_np"``), ``"ewma"`` or anything
+        else for the windowed realised volatility, which stays NaN until
+        ``window`` returns have been seen.
+        """
+
+        out: dict[str, float] = {}
+        for t, st in self._state.items():
+            if method in {"garch", "garch_np"}:
+                g = self.garch._state.get(t)
+                out[t] = float(np.sqrt(g.sigma2) / _GARCH_SCALE) if g else float("nan")
+            elif method == "ewma":
+                out[t] = float(np.sqrt(st.ewma_var))
+            else:
+                n = len(st.window)
+                if n < self.window or n < 2:
+                    out[t] = float("nan")
+                    continue
+                var = (st.win_sumsq - st.win_sum**2 / n) / (n - 1)
+                out[t] = float(np.sqrt(max(var, 0.0)))
+        return pd.Series(out, dtype=float)
+
+    def fx_beta(self) -> pd.Series:
+        """Running :func:`fx_beta` over every bar fed with an FX return."""
+
+        return pd.Series(
+            {
+                t: st.c_xy / st.m2_x if st.fx_n > 1 and st.m2_x > 0 else float("nan")
+                for t, st in self._state.items()
+            },
+            dtype=float,
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return one row per ticker with ``ticker``, ``as_of`` and JSON ``state``."""
+
+        rows = []
+        for t, st in self._state.items():
+            g = self.garch._state.get(t)
+            state = {
+                "last_price": st.last_price,
+                "ewma_var": st.ewma_var,
+                "window": list(st.window),
+                "fx": [st.fx_n, st.fx_mean, st.asset_mean, st.c_xy, st.m2_x],
+                "garch": None
+                if g is None
+                else {
+                    "params": [float(p) for p in g.params],
+                    "period_start": g.period.start_time.isoformat(),
+                    "last_date": g.last_date.isoformat(),
+                    "last_ret": g.last_ret,
+                    "sigma2": g.sigma2,
+                },
+            }
+            rows.append({"ticker": t, "as_of": st.last_date, "state": json.dumps(state)})
+        return pd.DataFrame(rows, columns=["ticker", "as_of", "state"])
+
+    @classmethod
+    def from_frame(
+        cls,
+        frame: pd.DataFrame,
+        window: int = 63,
+        lam: float = 0.94,
+        refit_freq: str = "M",
+    ) -> OnlineRisk:
+        """Rebuild the estimators from :meth:`to_frame` output."""
+
+        online = cls(window, lam, refit_freq)
+        for ticker, as_of, raw in frame[["ticker", "as_of", "state"]].itertuples(index=False):
+            state = json.loads(raw)
+            returns = deque(float(r) for r in state["window"][-window:])
+            fx_n, fx_mean, asset_mean, c_xy, m2_x = state["fx"]
+            online._state[str(ticker)] = _OnlineState(
+                last_date=pd.Timestamp(as_of),
+                last_price=float(state["last_price"]),
+                ewma_var=float(state["ewma_var"]),
+                window=returns,
+                win_sum=float(sum(returns)),
+                win_sumsq=float(sum(r * r for r in returns)),
+                fx_n=int(fx_n),
+                fx_mean=float(fx_mean),
+                asset_mean=float(asset_mean),
+                c_xy=float(c_xy),
+                m2_x=float(m2_x),
+            )
+            g = state["garch"]
+            if g is not None:
+                online.garch._state[str(ticker)] = _GarchState(
+                    params=np.asarray(g["params"], dtype=float),
+                    period=pd.Timestamp(g["period_start"]).to_period(refit_freq),
+                    last_date=pd.Timestamp(g["last_date"]),
+                    last_ret=float(g["last_ret"]),
+                    sigma2=float(g["sigma2"]),
+                )
+        return online
+
+
+# per-process returns matrix filled by ``_init_garch_worker``
+_batch: dict[str, np.ndarray] = {}
+
+
+def _init_garch_worker(path: str) -> None:
+    _batch["returns"] = np.load(path, mmap_mode="r")
+
+
+def _garch_task(task: tuple[int, int, bool]) -> np.ndarray:
+    """Fit column ``j`` on the first ``end`` rows of the shared returns.
+
+    Returns the whole conditional volatility path (length ``end``) when
+    ``full`` is set, otherwise only its last value; NaN where the fit fails.
+    """
+
+    j, end, full = task
+    col = np.asarray(_batch["returns"][:end, j], dtype=float)
+    mask = np.isfinite(col)
+    out = np.full(end if full else 1, np.nan)
+    if mask.sum() < 20:
+        return out
+    res = _fit_garch(pd.Series(col[mask] * _GARCH_SCALE))
+    if res is None:
+        return out
+    vol = np.asarray(res.conditional_volatility) / _GARCH_SCALE
+    if full:
+        out[mask] = vol
+    elif mask[-1]:
+        out[0] = vol[-1]
+    return out
+
+
+def _run_garch_tasks(
+    returns: np.ndarray, tasks: list[tuple[int, int, bool]], workers: int | None
+) -> list[np.ndarray]:
+    if workers == 1 or len(tasks) < 2:
+        _batch["returns"] = returns
+        try:
+            return [_garch_task(t) for t in tasks]
+        finally:
+            _batch.pop("returns", None)
+    n_workers = workers or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory(prefix="metiseon-garch-") as tmp:
+        path = Path(tmp) / "returns.npy"
+        np.save(path, returns)
+        with ProcessPoolExecutor(
+            max_workers=n_workers, initializer=_init_garch_worker, initargs=(str(path),)
+        ) as pool:
+            chunk = max(1, len(tasks) // (4 * n_workers))
+            return list(pool.map(_garch_task, tasks, chunksize=chunk))
+
+
+def garch_sigma_batch(
+    prices: pd.DataFrame,
+    dates: Sequence[pd.Timestamp] | None = None,
+    denom_series: pd.Series | None = None,
+    workers: int | None = None,
+) -> pd.DataFrame:
+    """Fit GARCH(1,1) for every ticker (and window) across a process pool.
+
+    Log returns are written once to a memory-mapped ``.npy`` file that the
+    workers open read-only, so each task only ships a column index and a
+    window end.  Every fit is independent, which makes the work scale with
+    the number of cores.
+
+    Parameters
+    ----------
+    prices : pandas.DataFrame
+        Adjusted close prices with one column per ticker.
+    dates : sequence of pandas.Timestamp, optional
+        Window ends.  When given, each ticker is refitted on its history up
+        to every date, as :class:`GarchSigmaEngine` does in ``"refit"``
+        mode.  When omitted, one fit per ticker on the full history.
+    denom_series : pandas.Series, optional
+        MEΩ (or other numéraire) prices indexed like ``prices``.
+    workers : int, optional
+        Worker processes (default: CPU count); ``1`` fits in-process.
+
+    Returns
+    -------
+    pandas.DataFrame
+        ``dates × tickers`` latest conditional volatility, or the full
+        conditional volatility path aligned with ``prices`` when ``dates``
+        is omitted.  Tickers that cannot be fitted are NaN, matching
+        :func:`garch_sigma`.
+    """
+
+    prices = prices.sort_index()
+    rel = prices if denom_series is None else prices.div(denom_series, axis=0)
+    returns = np.log(rel).diff().to_numpy(dtype=float)
+    n, k = returns.shape
+    if dates is None:
+        tasks = [(j, n, True) for j in range(k)]
+        index = prices.index
+    else:
+        index = pd.DatetimeIndex(dates)
+        ends = prices.index.searchsorted(index, side="right")
+        tasks = [(j, int(e), False) for e in ends for j in range(k)]
+    if not tasks:
+        return pd.DataFrame(index=index, columns=prices.columns, dtype=float)
+
+    results = _run_garch_tasks(returns, tasks, workers)
+    if dates is None:
+        data = np.column_stack(results)
+    else:
+        data = np.concatenate(results).reshape(len(index), k)
+    return pd.DataFrame(data, index=index, columns=prices.columns)
+
+
+_LOG_2PI = float(np.log(2.0 * np.pi))
+_MIN_GARCH_OBS = 20
+
+
+def _garch_kernel_numpy(
+    r: np.ndarray,
+    valid: np.ndarray,
+    omega: np.ndarray,
+    alpha: np.ndarray,
+    beta: np.ndarray,
+    backcast: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """GARCH(1,1) recursion over ``T × K`` returns, vectorised across series.
+
+    Returns the conditional variance (NaN where ``valid`` is false), the
+    Gaussian negative log-likelihood per series and its gradient with
+    respect to ``(omega, alpha, beta)``.  Invalid observations are skipped,
+    so each column behaves as if its gaps had been dropped.
+    """
+
+    n, k = r.shape
+    sigma2 = np.full((n, k), np.nan)
+    nll = np.zeros(k)
+    grad = np.zeros((k, 3))
+    prev_r2 = backcast.copy()
+    prev_s2 = backcast.copy()
+    d_prev = np.zeros((k, 3))
+    ones = np.ones(k)
+    for t in range(n):
+        ok = valid[t]
+        s2 = omega + alpha * prev_r2 + beta * prev_s2
+        d = np.column_stack((ones, prev_r2, prev_s2)) + beta[:, None] * d_prev
+        r2 = r[t] ** 2
+        nll += np.where(ok, 0.5 * (_LOG_2PI + np.log(s2) + r2 / s2), 0.0)
+        grad += np.where(ok[:, None], (0.5 * (1.0 / s2 - r2 / s2**2))[:, None] * d, 0.0)
+        sigma2[t] = np.where(ok, s2, np.nan)
+        prev_r2 = np.where(ok, r2, prev_r2)
+        prev_s2 = np.where(ok, s2, prev_s2)
+        d_prev = np.where(ok[:, None], d, d_prev)
+    return sigma2, nll, grad
+
+
+def _garch_kernel_loops(
+    r: np.ndarray,
+    valid: np.ndarray,
+    omega: np.ndarray,
+    alpha: np.ndarray,
+    beta: np.ndarray,
+    backcast: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Scalar-loop twin of :func:`_garch_kernel_numpy` for ``numba.njit``."""
+
+    n, k = r.shape
+    sigma2 = np.full((n, k), np.nan)
+    nll = np.zeros(k)
+    grad = np.zeros((k, 3))
+    for j in range(k):
+        prev_r2 = backcast[j]
+        prev_s2 = backcast[j]
+        d0 = d1 = d2 = 0.0
+        for t in range(n):
+            if not valid[t, j]:
+                continue
+            s2 = omega[j] + alpha[j] * prev_r2 + beta[j] * prev_s2
+            d0 = 1.0 + beta[j] * d0
+            d1 = prev_r2 + beta[j] * d1
+            d2 = prev_s2 + beta[j] * d2
+            r2 = r[t, j] * r[t, j]
+            w = 0.5 * (1.0 / s2 - r2 / (s2 * s2))
+            nll[j] += 0.5 * (_LOG_2PI + np.log(s2) + r2 / s2)
+            grad[j, 0] += w * d0
+            grad[j, 1] += w * d1
+            grad[j, 2] += w * d2
+            sigma2[t, j] = s2
+            prev_r2 = r2
+            prev_s2 = s2
+    return sigma2, nll, grad
+
+
+_garch_kernel = (
+    numba.njit(cache=True)(_garch_kernel_loops) if numba is not None else _garch_kernel_numpy
+)
+
+
+def _garch_backcast(r: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Initial variance per column, as used by :mod:`arch` (EWMA of 75 obs)."""
+
+    out = np.full(r.shape[1], np.nan)
+    for j in range(r.shape[1]):
+        x = r[valid[:, j], j][:75]
+        if len(x):
+            w = 0.94 ** np.arange(len(x))
+            out[j] = float(np.sum(x**2 * w) / w.sum())
+    return out
+
+
+def _garch_params(x: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Map unconstrained ``(log omega, logit persistence, logit share)``."""
+
+    persistence = 1.0 / (1.0 + np.exp(-x[:, 1]))
+    share = 1.0 / (1.0 + np.exp(-x[:, 2]))
+    return np.exp(x[:, 0]), persistence * share, persistence * (1.0 - share)
+
+
+def garch11_filter(returns: np.ndarray, params: np.ndarray) -> np.ndarray:
+    """Conditional variance of zero-mean GARCH(1,1) for many series at once.
+
+    Parameters
+    ----------
+    returns : numpy.ndarray
+        ``T × K`` returns; NaN marks missing observations, which are skipped.
+    params : numpy.ndarray
+        ``K × 3`` array of ``(omega, alpha, beta)``.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``T × K`` conditional variance, NaN where the return is missing or
+        the parameters are not finite.
+    """
+
+    r = np.atleast_2d(np.asarray(returns, dtype=float).T).T
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    valid = np.isfinite(r) & np.isfinite(params).all(axis=1)
+    r = np.where(valid, r, 0.0)
+    omega, alpha, beta = (np.ascontiguousarray(params[:, i]) for i in range(3))
+    backcast = _garch_backcast(r, valid)
+    return _garch_kernel(r, valid, omega, alpha, beta, backcast)[0]
+
+
+def garch11_fit(returns: np.ndarray, maxiter: int = 500) -> np.ndarray:
+    """Maximum-likelihood GARCH(1,1) parameters for many series jointly.
+
+    The series are independent, so the joint likelihood is separable and a
+    single L-BFGS run with the analytic gradient from the recursion fits all
+    of them.  Parameters are kept in the stationary region
+    ``omega > 0, alpha, beta >= 0, alpha + beta < 1`` by construction.
+    Results agree with :func:`arch.arch_model` to optimiser tolerance.
+
+    Parameters
+    ----------
+    returns : numpy.ndarray
+        ``T × K`` returns (scaled as for :func:`garch_sigma`), NaN for gaps.
+    maxiter : int, default 500
+        L-BFGS iteration cap.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``K × 3`` array of ``(omega, alpha, beta)``; NaN rows for series
+        with fewer than 20 observations or a non-finite likelihood.
+    """
+
+    r = np.atleast_2d(np.asarray(returns, dtype=float).T).T
+    out = np.full((r.shape[1], 3), np.nan)
+    valid = np.isfinite(r)
+    n_obs = valid.sum(axis=0)
+    cols = np.flatnonzero(n_obs >= _MIN_GARCH_OBS)
+    if not len(cols):
+        return out
+    valid = valid[:, cols]
+    r = np.where(valid, r[:, cols], 0.0)
+    n_obs = n_obs[cols]
+    backcast = _garch_backcast(r, valid)
+    var = (r**2).sum(axis=0) / n_obs
+
+    def objective(x: np.ndarray) -> tuple[float, np.ndarray]:
+        z = x.reshape(-1, 3)
+        omega, alpha, beta = _garch_params(z)
+        _, nll, grad = _garch_kernel(r, valid, omega, alpha, beta, backcast)
+        persistence = alpha + beta
+        share = alpha / persistence
+        dp = persistence * (1.0 - persistence)
+        ds = share * (1.0 - share)
+        dz = np.column_stack(
+            (
+                grad[:, 0] * omega,
+                (grad[:, 1] * share + grad[:, 2] * (1.0 - share)) * dp,
+                (grad[:, 1] - grad[:, 2]) * persistence * ds,
+            )
+        )
+        return float(np.sum(nll / n_obs)), (dz / n_obs[:, None]).ravel()
+
+    x0 = np.column_stack(
+        (
+            np.log(var * 0.02),
+            np.full(len(cols), np.log(0.98 / 0.02)),
+            np.full(len(cols), np.log(0.08 / 0.90)),
+        )
+    )
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        res = minimize(
+            objective, x0.ravel(), jac=True, method="L-BFGS-B", options={"maxiter": maxiter}
+        )
+        params = np.column_stack(_garch_params(res.x.reshape(-1, 3)))
+        _, nll, _ = _garch_kernel(r, valid, *params.T.copy(), backcast)
+    params[~np.isfinite(nll)] = np.nan
+    out[cols] = params
+    return out
+
+
+def garch_np_sigma(
+    prices: pd.DataFrame,
+    dates: Sequence[pd.Timestamp],
+    refit_freq: str | None = "M",
+    denom_series: pd.Series | None = None,
+) -> pd.DataFrame:
+    """GARCH(1,1) volatility per rebalance date via the native estimator.
+
+    Mirrors :class:`GarchSigmaEngine`: parameters are refitted on the history
+    up to the first date of each ``refit_freq`` period (every date when
+    ``refit_freq`` is ``None``) and the variance recursion is extended with
+    those parameters until the next refit.  All tickers are fitted in one
+    vectorised pass per refit.
+
+    Returns
+    -------
+    pandas.DataFrame
+        ``dates × tickers`` latest conditional volatility, NaN where a
+        ticker cannot be fitted.
+    """
+
+    prices = prices.sort_index()
+    rel = prices if denom_series is None else prices.div(denom_series, axis=0)
+    r = np.log(rel).diff().to_numpy(dtype=float) * _GARCH_SCALE
+    index = pd.DatetimeIndex(dates)
+    ends = prices.index.searchsorted(index, side="right")
+    if refit_freq is None:
+        keys = np.arange(len(index))
+    else:
+        keys = np.asarray(index.to_period(refit_freq).ordinal)
+    out = np.full((len(index), r.shape[1]), np.nan)
+    for key in pd.unique(keys):
+        rows = np.flatnonzero((keys == key) & (ends > 0))
+        if not len(rows):
+            continue
+        params = garch11_fit(r[: ends[rows[0]]])
+        sigma2 = garch11_filter(r[: ends[rows].max()], params)
+        out[rows] = sigma2[ends[rows] - 1]
+    return pd.DataFrame(np.sqrt(out) / _GARCH_SCALE, index=index, columns=prices.columns)
+
+
 def realised_sigma(
     prices: pd.Series, window: int = 63, denom_series: pd.Series | None = None
 ) -> pd.Series:
@@ -67,6 +786,36 @@ def realised_sigma(
     return log_ret.rolling(window=window, min_periods=window).std()
 
 
+def realised_sigma_panel(
+    prices: pd.DataFrame, window: int = 63, denom_series: pd.Series | None = None
+) -> pd.DataFrame:
+    """Rolling volatility for a whole ``dates × tickers`` price panel.
+
+    Equivalent to calling :func:`realised_sigma` per ticker and date, but
+    computed in a single vectorised pass so that each rebalance becomes a
+    row lookup.
+
+    Parameters
+    ----------
+    prices : pandas.DataFrame
+        Adjusted close prices with one column per ticker.
+    window : int, default 63
+        Size of the rolling window in days.
+    denom_series : pandas.Series, optional
+        MEΩ (or other numéraire) prices indexed like ``prices``.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Rolling standard deviation of log returns aligned with ``prices``.
+    """
+
+    prices = prices.sort_index()
+    rel = prices if denom_series is None else prices.div(denom_series, axis=0)
+    log_ret = np.log(rel).diff()
+    return log_ret.rolling(window=window, min_periods=window).std()
+
+
 def fx_beta(asset_returns: pd.Series, fx_returns: pd.Series) -> float:
     """Estimate currency beta from asset and FX returns."""
 
@@ -94,10 +843,95 @@ def cvar(returns: pd.Series, level: float = 0.95) -> float:
     return float(-tail.mean())
 
 
+def _rolling_sum(a: np.ndarray, window: int) -> np.ndarray:
+    c = np.cumsum(a, axis=0)
+    c[window:] = c[window:] - c[:-window]
+    return c
+
+
+def rolling_fx_beta(
+    asset_returns: pd.DataFrame,
+    fx_returns: pd.Series | pd.DataFrame,
+    window: int = 252,
+    min_periods: int | None = None,
+) -> pd.DataFrame:
+    """Rolling :func:`fx_beta` for every ticker from cumulative sums.
+
+    Parameters
+    ----------
+    asset_returns : pandas.DataFrame
+        ``dates × tickers`` returns.
+    fx_returns : pandas.Series or pandas.DataFrame
+        One FX return series for all tickers, or one column per ticker.
+    window : int, default 252
+        Rolling window in observations.
+    min_periods : int, optional
+        Paired observations required in a window (default: ``window``).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Beta aligned with ``asset_returns``; NaN when the window has too few
+        pairs or zero FX variance.
+    """
+
+    index, columns = asset_returns.index, asset_returns.columns
+    y = asset_returns.to_numpy(dtype=float)
+    if isinstance(fx_returns, pd.Series):
+        x = np.repeat(fx_returns.reindex(index).to_numpy(dtype=float)[:, None], y.shape[1], 1)
+    else:
+        x = fx_returns.reindex(index=index, columns=columns).to_numpy(dtype=float)
+    valid = np.isfinite(x) & np.isfinite(y)
+    x = np.where(valid, x, 0.0)
+    y = np.where(valid, y, 0.0)
+    n = _rolling_sum(valid.astype(float), window)
+    sx, sy = _rolling_sum(x, window), _rolling_sum(y, window)
+    sxy, sxx = _rolling_sum(x * y, window), _rolling_sum(x * x, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / n
+        var = sxx - sx * sx / n
+        beta = np.where((n >= (min_periods or window)) & (var > 0), cov / var, np.nan)
+    return pd.DataFrame(beta, index=index, columns=columns)
+
+
+def rolling_cvar(
+    returns: pd.DataFrame, window: int = 252, level: float = 0.95
+) -> pd.DataFrame:
+    """Rolling :func:`cvar` for every ticker from sorted windows.
+
+    Windows are sorted in blocks of rows with a strided view, so the VaR
+    quantile (linear interpolation, as :meth:`pandas.Series.quantile`) and
+    the tail mean are read off every ``(date, ticker)`` window at once.
+
+    Returns
+    -------
+    pandas.DataFrame
+        CVaR aligned with ``returns``; NaN until ``window`` observations are
+        available and for windows containing missing returns.
+    """
+
+    x = returns.to_numpy(dtype=float)
+    n, k = x.shape
+    out = np.full((n, k), np.nan)
+    if n >= window and k:
+        windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=0)
+        h = (window - 1) * (1 - level)
+        lo = int(np.floor(h))
+        hi = min(lo + 1, window - 1)
+        frac = h - lo
+        rows = max(1, (1 << 22) // (k * window))
+        for start in range(0, len(windows), rows):
+            srt = np.sort(windows[start : start + rows], axis=-1)  # NaN last
+            var = srt[..., lo] + frac * (srt[..., hi] - srt[..., lo])
+            tail = srt <= var[..., None]
+            value = -np.where(tail, srt, 0.0).sum(axis=-1) / tail.sum(axis=-1)
+            first = window - 1 + start
+            out[first : first + len(srt)] = np.where(np.isnan(srt[..., -1]), np.nan, value)
+    return pd.DataFrame(out, index=returns.index, columns=returns.columns)
+
+
 def slipped_cost(qty: float, adv: float) -> float:
     """Almgren-Chriss square-root impact in decimal fraction (e.g., 0.001 = 10bp).
-    cost = 0.001 * sqrt(qty / adv)
+    cost = 0.001 * sqrt(qty / adv), see :func:`src.costs.impact`
     """
-    if adv <= 0:
-        return 0.0
-    return float(0.001 * (qty / adv) ** 0.5)
+    return float(costs.impact(qty, adv))
@@ -8,10 +8,21 @@ The expected columns in the input data are ``roe``, ``debt_equity``,
 ``profit_margin``, ``insider_own`` and ``rd_to_rev`` with values expressed in
 fractions (for example ``0.15`` for 15 %).  The resulting score is clamped to
 ``[0, 100]``.
+
+The rules themselves are data: a :class:`RuleSet` can be loaded from the
+``durability`` section of ``config.yml`` and is compiled into one vectorised
+NumPy pass (or a DuckDB SQL expression).  Many rule variants can be scored
+together with :func:`score_variants`.
 """
 
 from __future__ import annotations
 
+import operator
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Mapping, Sequence
+
 import numpy as np
 import pandas as pd
 
@@ -27,41 +38,242 @@ FACTOR_WEIGHTS = {
 
 _PENALTY = 10
 
+_OPS: dict[str, Callable[[Any, Any], Any]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+Condition = tuple[str, str, float]  # (factor, op, threshold)
+
+
+def _condition(factor: str, op: str, threshold: float) -> Condition:
+    if op not in _OPS:
+        raise ValueError(f"unsupported operator {op!r}")
+    if not _IDENT.match(factor):
+        raise ValueError(f"invalid factor name {factor!r}")
+    return (factor, op, float(threshold))
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Award ``points`` when ``factor op threshold`` holds."""
+
+    factor: str
+    op: str
+    threshold: float
+    points: float
+
+
+@dataclass(frozen=True)
+class Penalty:
+    """Deduct ``points`` when every condition in ``when`` holds."""
+
+    when: tuple[Condition, ...]
+    points: float
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """Thresholds, weights and penalties of a Durability-Lite variant.
+
+    NaN values never satisfy a condition, as in :func:`durability_score`.
+    A factor column missing from the input raises ``KeyError`` unless
+    ``fill_missing`` is set, in which case it counts as ``0``.
+    """
+
+    base: float
+    rules: tuple[Rule, ...]
+    penalties: tuple[Penalty, ...] = ()
+    floor: float = 0
+    cap: float = 100
+
+    @classmethod
+    def from_config(cls, cfg: Mapping[str, Any] | None) -> RuleSet:
+        """Build from the ``durability`` section of ``cfg`` (defaults if absent).
+
+        ``rules`` entries are ``{factor, op, threshold, points}``; each
+        ``penalties`` entry has ``points`` and ``when``, a list of
+        ``[factor, op, threshold]`` conditions that must all hold.
+        """
+
+        section = (cfg or {}).get("durability")
+        if not section:
+            return DEFAULT_RULES
+        rules = tuple(
+            Rule(*_condition(r["factor"], r["op"], r["threshold"]), r["points"])
+            for r in section.get("rules", [])
+        )
+        penalties = tuple(
+            Penalty(tuple(_condition(*c) for c in p["when"]), p["points"])
+            for p in section.get("penalties", [])
+        )
+        return cls(
+            base=section.get("base", BASE_SCORE),
+            rules=rules,
+            penalties=penalties,
+            floor=section.get("floor", 0),
+            cap=section.get("cap", 100),
+        )
+
+    def score(self, df: pd.DataFrame, fill_missing: bool = False) -> pd.Series:
+        """Score every row of ``df`` in one vectorised pass."""
+
+        values = compile_rules((self,)).evaluate(df, fill_missing)[:, 0]
+        return pd.Series(values, index=df.index)
+
+    def sql(self) -> str:
+        """Return the rule set as a DuckDB SQL expression over factor columns."""
 
-def durability_score(row: pd.Series) -> float:
-    """Compute the Durability-Lite score for a single asset."""
+        def cond(c: Condition) -> str:
+            return f'"{c[0]}" {c[1]} {c[2]!r}'
 
-    score = BASE_SCORE
-    if row.get("roe", 0) > 0.12:
-        score += FACTOR_WEIGHTS["roe"]
-    if row.get("debt_equity", 0) < 1:
-        score += FACTOR_WEIGHTS["debt_equity"]
-    if row.get("profit_margin", 0) > 0.10:
-        score += FACTOR_WEIGHTS["profit_margin"]
-    if row.get("insider_own", 0) > 0.02:
-        score += FACTOR_WEIGHTS["insider_own"]
-    if row.get("rd_to_rev", 0) > 0.05:
-        score += FACTOR_WEIGHTS["rd_to_rev"]
+        terms = [str(self.base)]
+        for r in self.rules:
+            when = cond((r.factor, r.op, r.threshold))
+            terms.append(f"+ CASE WHEN {when} THEN {r.points} ELSE 0 END")
+        for p in self.penalties:
+            when = " AND ".join(cond(c) for c in p.when)
+            terms.append(f"- CASE WHEN {when} THEN {p.points} ELSE 0 END")
+        return f"LEAST(GREATEST({' '.join(terms)}, {self.floor}), {self.cap})"
 
-    if row.get("debt_equity", 0) > 1 and row.get("insider_own", 0) < 0.01:
-        score -= _PENALTY
 
-    return float(np.clip(score, 0, 100))
+DEFAULT_RULES = RuleSet(
+    base=BASE_SCORE,
+    rules=(
+        Rule("roe", ">", 0.12, FACTOR_WEIGHTS["roe"]),
+        Rule("debt_equity", "<", 1.0, FACTOR_WEIGHTS["debt_equity"]),
+        Rule("profit_margin", ">", 0.10, FACTOR_WEIGHTS["profit_margin"]),
+        Rule("insider_own", ">", 0.02, FACTOR_WEIGHTS["insider_own"]),
+        Rule("rd_to_rev", ">", 0.05, FACTOR_WEIGHTS["rd_to_rev"]),
+    ),
+    penalties=(
+        Penalty((("debt_equity", ">", 1.0), ("insider_own", "<", 0.01)), _PENALTY),
+    ),
+)
 
 
-def apply_scores(df: pd.DataFrame) -> pd.Series:
-    """Apply :func:`durability_score` across a DataFrame."""
+@dataclass(frozen=True)
+class _Compiled:
+    """Rule variants lowered onto one shared set of unique conditions."""
 
-    score = (
-        BASE_SCORE
-        + (df["roe"] > 0.12) * FACTOR_WEIGHTS["roe"]
-        + (df["debt_equity"] < 1) * FACTOR_WEIGHTS["debt_equity"]
-        + (df["profit_margin"] > 0.10) * FACTOR_WEIGHTS["profit_margin"]
-        + (df["insider_own"] > 0.02) * FACTOR_WEIGHTS["insider_own"]
-        + (df["rd_to_rev"] > 0.05) * FACTOR_WEIGHTS["rd_to_rev"]
+    conditions: tuple[Condition, ...]
+    weights: np.ndarray  # variants × conditions
+    conjunctions: tuple[tuple[int, ...], ...]  # condition indices per penalty
+    penalties: np.ndarray  # variants × conjunctions
+    base: np.ndarray
+    floor: np.ndarray
+    cap: np.ndarray
+
+    def evaluate(self, df: pd.DataFrame, fill_missing: bool = False) -> np.ndarray:
+        """Return a ``rows × variants`` score matrix.
+
+        Raises ``KeyError`` for a factor column absent from ``df`` unless
+        ``fill_missing`` is set.
+        """
+
+        n = len(df)
+        missing = sorted({c[0] for c in self.conditions} - set(df.columns))
+        if missing and not fill_missing:
+            raise KeyError(f"missing factor columns: {missing}")
+        columns: dict[str, np.ndarray] = {}
+        hits = np.empty((n, len(self.conditions)), dtype=bool)
+        for k, (factor, op, threshold) in enumerate(self.conditions):
+            if factor not in columns:
+                columns[factor] = (
+                    df[factor].to_numpy(dtype=float) if factor in df else np.zeros(n)
+                )
+            with np.errstate(invalid="ignore"):
+                hits[:, k] = _OPS[op](columns[factor], threshold)
+        score = self.base + hits @ self.weights.T
+        if self.conjunctions:
+            penalised = np.column_stack(
+                [hits[:, list(idx)].all(axis=1) for idx in self.conjunctions]
+            )
+            score = score - penalised @ self.penalties.T
+        return np.clip(score, self.floor, self.cap)
+
+
+def _as_array(values: Sequence[float] | np.ndarray) -> np.ndarray:
+    # integral weights keep integer scores, as the hardcoded rules did
+    arr = np.asarray(values, dtype=float)
+    return arr.astype(np.int64) if np.all(arr == np.round(arr)) else arr
+
+
+@lru_cache(maxsize=64)
+def compile_rules(variants: tuple[RuleSet, ...]) -> _Compiled:
+    """Lower ``variants`` onto their shared conditions (cached per tuple)."""
+
+    conditions: dict[Condition, int] = {}
+    conjunctions: dict[tuple[int, ...], int] = {}
+
+    def index(c: Condition) -> int:
+        return conditions.setdefault(_condition(*c), len(conditions))
+
+    rule_idx = [[index((r.factor, r.op, r.threshold)) for r in v.rules] for v in variants]
+    pen_idx = [
+        [
+            conjunctions.setdefault(tuple(index(c) for c in p.when), len(conjunctions))
+            for p in v.penalties
+        ]
+        for v in variants
+    ]
+    weights = np.zeros((len(variants), len(conditions)))
+    penalties = np.zeros((len(variants), len(conjunctions)))
+    for i, v in enumerate(variants):
+        for k, r in zip(rule_idx[i], v.rules):
+            weights[i, k] += r.points
+        for k, p in zip(pen_idx[i], v.penalties):
+            penalties[i, k] += p.points
+    return _Compiled(
+        conditions=tuple(conditions),
+        weights=_as_array(weights),
+        conjunctions=tuple(conjunctions),
+        penalties=_as_array(penalties),
+        base=_as_array([v.base for v in variants]),
+        floor=_as_array([v.floor for v in variants]),
+        cap=_as_array([v.cap for v in variants]),
     )
 
-    penalty_mask = (df["debt_equity"] > 1) & (df["insider_own"] < 0.01)
-    score = score - penalty_mask * _PENALTY
 
-    return score.clip(0, 100)
+def durability_score(
+    row: pd.Series, rules: RuleSet | None = None, fill_missing: bool = True
+) -> float:
+    """Compute the Durability-Lite score for a single asset.
+
+    A factor absent from ``row`` counts as ``0`` unless ``fill_missing`` is
+    cleared, in which case it raises ``KeyError``.
+    """
+
+    frame = row.to_frame().T
+    return float((rules or DEFAULT_RULES).score(frame, fill_missing).iloc[0])
+
+
+def apply_scores(
+    df: pd.DataFrame, rules: RuleSet | None = None, fill_missing: bool = True
+) -> pd.Series:
+    """Apply :func:`durability_score` across a DataFrame.
+
+    Missing factor columns count as ``0``, as in :func:`durability_score`;
+    clear ``fill_missing`` to raise ``KeyError`` instead.
+    """
+
+    return (rules or DEFAULT_RULES).score(df, fill_missing)
+
+
+def score_variants(
+    df: pd.DataFrame, variants: Mapping[str, RuleSet], fill_missing: bool = True
+) -> pd.DataFrame:
+    """Score ``df`` under many rule variants at once.
+
+    Conditions shared by several variants are evaluated once; the result
+    has one column per variant name.  Missing factor columns are handled
+    as in :func:`apply_scores`.
+    """
+
+    compiled = compile_rules(tuple(variants.values()))
+    return pd.DataFrame(
+        compiled.evaluate(df, fill_missing), index=df.index, columns=list(variants)
+    )
@@ -0,0 +1,157 @@
+"""Parameter sweeps over the weekly backtest across a process pool."""
+
+from __future__ import annotations
+
+import itertools
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from . import backtest
+
+_FIELDS = ("adj_close", "volume")
+
+# per-process state filled by ``_init_worker``
+_worker: dict[str, Any] = {}
+
+
+def expand_grid(grid: dict[str, Iterable[Any]]) -> list[dict[str, Any]]:
+    """Return the cartesian product of ``grid`` as a list of overrides."""
+
+    keys = list(grid)
+    values = [list(grid[k]) for k in keys]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def _dump(inputs: backtest.BacktestInputs, directory: Path) -> dict[str, Any]:
+    """Write the numeric panels to ``.npy`` files and return a picklable spec.
+
+    Fiat numéraires already resolved on ``inputs`` travel in the spec, so
+    workers do not fetch FX series again.
+    """
+
+    close = inputs.close
+    for field in _FIELDS:
+        panel = inputs.panel(field).reindex(columns=close.columns)
+        np.save(directory / f"{field}.npy", panel.to_numpy(dtype=float))
+    np.save(directory / "meo.npy", inputs.meo.reindex(close.index).to_numpy(dtype=float))
+    return {
+        "dir": str(directory),
+        "index": close.index,
+        "tickers": list(close.columns),
+        "scores": inputs.scores,
+        "rebalance": inputs.rebalance,
+        "numeraires": {k: v for k, v in inputs.numeraires.items() if k != "MEΩ"},
+    }
+
+
+def _load(spec: dict[str, Any]) -> backtest.BacktestInputs:
+    """Rebuild :class:`backtest.BacktestInputs` on memory-mapped panels.
+
+    Each field panel wraps its read-only map without copying, so workers
+    share the pages instead of holding private copies of the inputs.
+    """
+
+    directory = Path(spec["dir"])
+    index, tickers = spec["index"], spec["tickers"]
+    panels = {
+        field: pd.DataFrame(
+            np.load(directory / f"{field}.npy", mmap_mode="r"),
+            index=index,
+            columns=tickers,
+            copy=False,
+        )
+        for field in _FIELDS
+    }
+    meo = pd.Series(np.load(directory / "meo.npy", mmap_mode="r"), index=index, copy=False)
+    return backtest.BacktestInputs(
+        prices=None,
+        meo=meo,
+        scores=spec["scores"],
+        rebalance=spec["rebalance"],
+        panels=panels,
+        numeraires=dict(spec["numeraires"]),
+    )
+
+
+def _init_worker(spec: dict[str, Any], cfg: dict) -> None:
+    _worker["inputs"] = _load(spec)
+    # the sweep already occupies every core; fit GARCH in-process
+    _worker["cfg"] = {**cfg, "garch_workers": 1}
+
+
+def run_config(
+    inputs: backtest.BacktestInputs, cfg: dict, overrides: dict[str, Any]
+) -> dict[str, Any]:
+    """Backtest one configuration with the in-memory engine.
+
+    ``overrides`` are applied on top of ``cfg``; the special key ``denom``
+    selects the numéraire (default ``"MEΩ"``).  Returns the overrides
+    together with final NAV, turnover and trading cost.
+
+    ``final_nav_usd`` is in USD for every row and is the column to compare
+    configurations by; ``final_nav`` is in the row's numéraire, named in
+    ``nav_unit`` (e.g. MEΩ or CHF), and is not comparable across
+    denominations.
+    """
+
+    run_cfg = {**cfg, **overrides}
+    denom = run_cfg.pop("denom", "MEΩ")
+    result = backtest.simulate(inputs, run_cfg, denom)
+    stats = result.stats()
+
+    nav_usd = result.nav_usd
+    mean_nav = float(nav_usd[nav_usd > 0].mean()) if (nav_usd > 0).any() else 0.0
+    numeraire = inputs.numeraire(denom)
+    final = result.nav_meo if denom == "MEΩ" else numeraire.convert(nav_usd)
+    return {
+        **overrides,
+        "final_nav_usd": float(nav_usd.iloc[-1]) if not nav_usd.empty else float("nan"),
+        "final_nav": float(final.iloc[-1]) if not final.empty else float("nan"),
+        "nav_unit": numeraire.name,
+        "turnover": stats["traded_usd"] / mean_nav if mean_nav > 0 else float("nan"),
+        "cost_usd": stats["fees_usd"] + stats["slippage_usd"],
+        **stats,
+    }
+
+
+def _run_worker(overrides: dict[str, Any]) -> dict[str, Any]:
+    return run_config(_worker["inputs"], _worker["cfg"], overrides)
+
+
+def run_sweep(
+    inputs: backtest.BacktestInputs,
+    cfg: dict,
+    grid: dict[str, Iterable[Any]],
+    workers: int | None = None,
+) -> pd.DataFrame:
+    """Run every configuration in ``grid`` across a process pool.
+
+    Prices, volumes and MEΩ are written once to memory-mapped ``.npy``
+    files that the workers open read-only, so the panels are neither
+    re-downloaded nor pickled per task.  Each configuration runs on the
+    in-memory engine, so workers never touch DuckDB.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per configuration with the swept keys and the statistics
+        returned by :func:`run_config`.
+    """
+
+    configs = expand_grid(grid)
+    if not configs:
+        return pd.DataFrame()
+    for denom in {c.get("denom", cfg.get("denom", "MEΩ")) for c in configs}:
+        inputs.numeraire(denom)
+    with tempfile.TemporaryDirectory(prefix="metiseon-sweep-") as tmp:
+        spec = _dump(inputs, Path(tmp))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(spec, cfg)
+        ) as pool:
+            rows = list(pool.map(_run_worker, configs))
+    return pd.DataFrame(rows)
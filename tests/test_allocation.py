@@ -1,14 +1,60 @@
+from decimal import ROUND_FLOOR, Decimal
+import numpy as np
 import pandas as pd
-import importlib.util
+import sys
 from pathlib import Path
 
-SRC = Path(__file__).resolve().parents[1] / "src" / "allocator.py"
-spec = importlib.util.spec_from_file_location("allocator", SRC)
-allocator = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(allocator)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src import allocator
 
 def test_pick_asset_last_ticker_excluded():
     scores = pd.Series({"A": 10, "B": 20, "C": 5})
     sigma = pd.Series({"A": 0.1, "B": 0.05, "C": 0.15})
     assert allocator.pick_asset(scores, sigma, None) == "B"
     assert allocator.pick_asset(scores, sigma, "B") == "A"
+
+
+def test_pick_assets_matches_scalar_chain():
+    rng = np.random.default_rng(3)
+    dates = pd.date_range("2024-01-05", periods=60, freq="W-FRI")
+    tickers = list("ABCDEF")
+    scores = pd.DataFrame(
+        rng.choice([30.0, 45.0, 60.0, 75.0], (60, 6)), index=dates, columns=tickers
+    )
+    scores = scores.mask(rng.random((60, 6)) < 0.1)
+    sigma = pd.DataFrame(
+        rng.choice([0.01, 0.02, 0.03], (60, 7)), index=dates, columns=tickers + ["G"]
+    )
+    sigma = sigma.mask(rng.random((60, 7)) < 0.05)
+
+    picks = allocator.pick_assets(scores, sigma, "C")
+    last = "C"
+    for d in dates:
+        expected = allocator.pick_asset(scores.loc[d].dropna(), sigma.loc[d], last)
+        assert picks[d] == expected
+        last = expected or last
+
+
+def test_vectorised_sizing_and_gate_match_scalar():
+    rng = np.random.default_rng(9)
+    price = rng.uniform(1, 500, 200)
+    price[::25] = 0.0
+    meo = rng.uniform(0.5, 5, 200)
+    budget = np.round(rng.uniform(10, 1000, 200), 2)
+    adv = rng.uniform(0, 1e5, 200)
+    adv[::30] = 0.0
+
+    qty = allocator.size_trades(price, budget, meo)
+    gate = allocator.decision_blocks(qty, adv, 12.0, 35.0)
+    for i in range(200):
+        expected = allocator.size_trade(price[i], Decimal(str(budget[i])), meo[i])
+        if qty[i] != float(expected):
+            # binary rounding may only flip a raw quantity sitting on a half lot
+            lots = Decimal(str(budget[i])) * Decimal(str(meo[i])) / Decimal(str(price[i]))
+            lots *= 10000
+            off_half = abs(lots - lots.to_integral_value(ROUND_FLOOR) - Decimal("0.5"))
+            assert float(off_half) <= 8 * np.finfo(float).eps * float(lots)
+            assert abs(qty[i] - float(expected)) <= 1.0001e-4
+        assert gate[i] == allocator.decision_block(Decimal(str(qty[i])), adv[i], 12.0, 35.0)
+    masked = allocator.size_trades(price, budget, meo, mask=np.arange(200) % 2 == 0)
+    assert (masked[1::2] == 0).all()
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src import backtest, denom, ledger
+
+
+def _inputs():
+    rng = np.random.default_rng(1)
+    idx = pd.bdate_range("2024-01-01", periods=120)
+    tickers = ["AAA", "BBB", "CCC"]
+    close = pd.DataFrame(
+        50 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(idx), 3)), axis=0)),
+        index=idx,
+        columns=tickers,
+    )
+    volume = pd.DataFrame(5e5, index=idx, columns=tickers)
+    prices = pd.concat({"adj_close": close, "volume": volume}, axis=1)
+    prices = prices.swaplevel(axis=1).sort_index(axis=1)
+    rebalance = [d for d in idx[70:] if d.weekday() == 4]
+    scores = {d: pd.Series([70.0, 70.0, 40.0], index=tickers) for d in rebalance[1:]}
+    meo = pd.Series(np.linspace(2.0, 2.2, len(idx)), index=idx)
+    return backtest.BacktestInputs(prices, meo, scores, rebalance)
+
+
+def test_engine_runs_without_ledger():
+    inputs = _inputs()
+    result = backtest.simulate(inputs, {"sigma_method": "std", "weekly_buy": 100})
+    assert len(result.trades) > 0
+    assert result.trades["ts"].min() >= inputs.rebalance[1]
+    final = result.holdings.iloc[-1]
+    traded = result.trades.groupby("ticker")["qty"].sum().astype(float)
+    pd.testing.assert_series_equal(
+        final[traded.index], traded, check_names=False, check_index_type=False
+    )
+    assert result.stats()["n_trades"] == len(result.trades)
+
+
+def test_persisted_engine_matches_ledger_nav(tmp_path):
+    inputs = _inputs()
+    cfg = {"sigma_method": "std", "weekly_pct": 0.5, "weekly_buy": 100}
+    book = ledger.Ledger(str(tmp_path / "p.db"))
+    book.book_trade(inputs.close.index[0].to_pydatetime(), "CCC", 3, 50.0)
+    chf_usd = pd.Series(1.1, index=inputs.close.index)
+    inputs.numeraires["CHF"] = denom.Denominator(chf_usd, "CHF")
+    result = backtest.simulate(inputs, cfg, "CHF", book=book)
+    curve = book.daily_nav(inputs.close, inputs.meo)
+    np.testing.assert_allclose(curve["nav"].to_numpy(), result.nav_usd.to_numpy())
+    assert book.last_ticker() == result.trades["ticker"].iloc[-1]
+
+
+def test_cost_surfaces_built_once_per_inputs():
+    inputs = _inputs()
+    cfg = {"sigma_method": "std", "weekly_buy": 100}
+    backtest.simulate(inputs, cfg)
+    model = inputs.cost_model()
+    surface = model.max_qty(35.0)
+    backtest.simulate(inputs, {**cfg, "risk_window": 21})
+    assert inputs.cost_model() is model
+    assert model.max_qty(35.0) is surface and len(model._max) == 1
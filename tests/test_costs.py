@@ -0,0 +1,49 @@
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src import allocator, costs, risk
+
+
+def _volume(n=40):
+    rng = np.random.default_rng(11)
+    idx = pd.bdate_range("2024-01-01", periods=n)
+    vol = pd.DataFrame(rng.uniform(1e3, 1e5, (n, 3)), index=idx, columns=["A", "B", "C"])
+    vol.iloc[:, 2] = 0.0
+    return vol
+
+
+def test_impact_matches_slipped_cost():
+    assert np.isclose(costs.impact(100000, 500000), risk.slipped_cost(100000, 500000))
+    assert costs.impact(5.0, 0.0) == 0.0
+
+
+def test_max_qty_inverts_cost():
+    adv = np.array([1e3, 5e4, 0.0, np.nan])
+    cap = costs.max_qty(adv, 12.0, 35.0)
+    assert np.allclose(costs.cost_bp(cap[:2], adv[:2], 12.0), 35.0)
+    assert np.isinf(cap[2]) and np.isnan(cap[3])
+    assert (costs.max_qty(adv, 40.0, 35.0) == 0).all()
+
+
+def test_cost_model_surfaces_match_gate():
+    model = costs.CostModel(_volume(), fee_bp=12.0)
+    adv = model.adv()
+    assert model.adv() is adv
+    pd.testing.assert_frame_equal(adv, _volume().rolling(10).mean())
+    surface = model.max_qty(35.0)
+    assert model.max_qty(35.0) is surface
+
+    rng = np.random.default_rng(12)
+    qty = pd.DataFrame(rng.uniform(0, 200, adv.shape), index=adv.index, columns=adv.columns)
+    bp = model.cost_bp(qty)
+    for d in adv.index[::7]:
+        for t in adv.columns:
+            q = qty.at[d, t]
+            gate = allocator.decision_block(Decimal(str(q)), adv.at[d, t], 12.0, 35.0)
+            assert gate == (q <= surface.at[d, t])
+            if gate:
+                assert bp.at[d, t] <= 35.0
@@ -0,0 +1,59 @@
+import threading
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src import db
+
+
+def test_shared_connection_per_path(tmp_path):
+    path = str(tmp_path / "p.db")
+    assert db.shared(path) is db.shared(str(tmp_path / "." / "p.db"))
+    a, b = db.cursor(path), db.cursor(path)
+    a.execute("INSERT INTO trades VALUES ('2024-01-01', 'AAA', 1, 10, 0)")
+    assert b.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 1
+
+
+def test_insert_frame_concurrent_writers(tmp_path):
+    path = str(tmp_path / "p.db")
+
+    def write(i):
+        frame = pd.DataFrame(
+            {
+                "date": pd.Timestamp("2024-01-01") + pd.Timedelta(days=i),
+                "symbol": ["USD", "XAU"],
+                "weight": [0.6, 0.4],
+                "meo_usd": 1e-3,
+                "m_world_usd": 1000.0,
+            }
+        )
+        db.insert_frame(path, "benchmarks", frame)
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    n_rows, n_dates = db.cursor(path).execute(
+        "SELECT COUNT(*), COUNT(DISTINCT date) FROM benchmarks"
+    ).fetchone()
+    assert (n_rows, n_dates) == (16, 8)
+
+
+def test_benchmarks_keyed_by_date_and_symbol(tmp_path):
+    path = str(tmp_path / "p.db")
+    for price in (1e-3, 2e-3):
+        frame = pd.DataFrame(
+            {
+                "date": pd.Timestamp("2024-01-01"),
+                "symbol": ["USD", "XAU"],
+                "weight": [0.6, 0.4],
+                "meo_usd": price,
+                "m_world_usd": price * 1e6,
+            }
+        )
+        db.insert_frame(path, "benchmarks", frame, replace=True)
+    rows = db.cursor(path).execute("SELECT DISTINCT date, meo_usd FROM benchmarks").fetchall()
+    assert len(rows) == 1 and rows[0][1] == 2e-3
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src import denom, meo
+
+
+def _panel():
+    idx = pd.date_range("2024-01-01", periods=4)
+    prices = pd.DataFrame(
+        {"AAA": [10.0, 11.0, 12.0, 13.0], "BBB": [20.0, 21.0, 19.0, 18.0]}, index=idx
+    )
+    meo_usd = pd.Series([2.0, 2.5, 0.0, 4.0], index=idx)
+    return prices, meo_usd
+
+
+def test_convert_panel_matches_division():
+    prices, meo_usd = _panel()
+    rel = denom.Denominator.meo_units(meo_usd).convert(prices)
+    expected = prices.div(meo_usd.where(meo_usd > 0), axis=0)
+    pd.testing.assert_frame_equal(rel, expected)
+    assert rel.iloc[2].isna().all()
+
+
+def test_convert_series_and_usd_identity():
+    prices, meo_usd = _panel()
+    nav = prices.sum(axis=1)
+    converted = denom.Denominator.meo_units(meo_usd).convert(nav)
+    assert converted.iloc[0] == 15.0
+    pd.testing.assert_series_equal(denom.Denominator().convert(nav), nav.astype(float))
+
+
+def test_factors_cached_per_index():
+    prices, meo_usd = _panel()
+    numeraire = denom.Denominator.meo_units(meo_usd)
+    first = numeraire.factors(prices.index)
+    assert numeraire.factors(prices.index) is first
+    other = numeraire.factors(prices.index[:2])
+    assert numeraire._aligned[1] is other  # only the latest index is kept
+    assert numeraire.factors(prices.index) is not first
+    assert numeraire.unit_price(prices.index[1]) == 2.5
+
+
+def test_fiat_panel_divides_by_fx_rate(monkeypatch):
+    meo.clear_cache()
+    prices, _ = _panel()
+    chf_usd = pd.Series([1.10, 1.12], index=pd.to_datetime(["2024-01-01", "2024-01-03"]))
+    monkeypatch.setattr(meo, "_fx_history", lambda sym, start, end: chf_usd)
+    numeraire = denom.Denominator.fiat("CHF", date(2024, 1, 1), date(2024, 1, 4))
+    rel = numeraire.convert(prices)
+    expected = prices.div(chf_usd.reindex(prices.index, method="ffill"), axis=0)
+    pd.testing.assert_frame_equal(rel, expected)
+    assert numeraire.name == "CHF"
+    assert numeraire.unit_price(prices.index[1]) == 1.10
+    assert denom.Denominator.fiat("USD", date(2024, 1, 1), date(2024, 1, 4)).name == "USD"
+
+
+def test_per_usd_scalar_and_unpriced():
+    assert float(denom.Denominator.per_usd(4.0)) == 0.25
+    assert np.isnan(denom.Denominator.per_usd(0.0))
+
+
+def test_meo_cross_price_vectorised():
+    px = pd.Series([10.0, 12.0, 9.0])
+    fx = pd.Series([2.0, 0.0, 3.0])
+    result = meo.meo_cross_price(px, fx)
+    assert result.iloc[0] == 5.0
+    assert pd.isna(result.iloc[1])
+    arr = meo.meo_cross_price(np.array([10.0, 12.0]), np.array([4.0, 0.0]))
+    assert arr[0] == 2.5 and np.isnan(arr[1])
@@ -0,0 +1,49 @@
+from datetime import timedelta
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src import fundamentals, score
+
+
+def _snapshots():
+    return pd.DataFrame(
+        {
+            "ticker": ["A", "B", "A", "B", "A", "C"],
+            "date": pd.to_datetime(
+                ["2024-01-01", "2024-01-15", "2024-02-01", "2024-03-01", "2024-04-01", "2024-05-01"]
+            ),
+            "roe": [0.1, 0.2, 0.15, 0.05, 0.2, 0.3],
+            "debt_equity": [0.5, 1.2, 0.5, 1.5, 0.4, 0.2],
+            "profit_margin": [0.2, 0.05, 0.2, 0.2, 0.1, 0.3],
+            "insider_own": [0.03, 0.005, 0.005, 0.001, 0.03, 0.05],
+            "rd_to_rev": [0.06, 0.1, 0.06, 0.0, 0.07, 0.1],
+        }
+    ).set_index("ticker")
+
+
+def test_as_of_matches_filter():
+    df = _snapshots()
+    store = fundamentals.PointInTimeStore(df)
+    flat = df.reset_index().sort_values("date")
+    for ts in pd.to_datetime(["2023-12-31", "2024-01-20", "2024-03-01", "2024-06-01"]):
+        expected = (
+            flat[flat["date"] <= ts].drop_duplicates("ticker", keep="last").set_index("ticker")
+        )
+        result = store.as_of(ts)
+        pd.testing.assert_frame_equal(result.sort_index(), expected.sort_index())
+
+
+def test_as_of_many_scores_whole_backtest():
+    store = fundamentals.PointInTimeStore(_snapshots())
+    dates = pd.to_datetime(["2024-02-16", "2024-04-19", "2024-06-21"])
+    lag = timedelta(days=45)
+    bulk = store.as_of_many(dates, lag=lag)
+    scores = score.apply_scores(bulk)
+    for d in dates:
+        expected = score.apply_scores(store.as_of(d - lag))
+        pd.testing.assert_series_equal(
+            scores.xs(d, level="rebalance").sort_index(), expected.sort_index()
+        )
@@ -0,0 +1,67 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src import async_data
+
+
+class FakeAV:
+    def __init__(self):
+        self.calls = []
+
+    def get_company_overview(self, ticker):
+        self.calls.append(("overview", ticker))
+        return pd.DataFrame(
+            [{"ReturnOnEquityTTM": "0.2", "ProfitMargin": "0.15", "LatestQuarter": "2024-03-31"}]
+        ), None
+
+    def get_income_statement_annual(self, ticker):
+        self.calls.append(("income", ticker))
+        frame = pd.DataFrame(
+            {
+                "fiscalDateEnding": ["2023-12-31", "2022-12-31"],
+                "netIncome": ["100", "80"],
+                "totalRevenue": ["1000", "800"],
+                "researchAndDevelopment": ["60", "None"],
+            }
+        )
+        return frame, None
+
+    def get_balance_sheet_annual(self, ticker):
+        self.calls.append(("balance", ticker))
+        frame = pd.DataFrame(
+            {
+                "fiscalDateEnding": ["2023-12-31", "2022-12-31"],
+                "totalLiabilities": ["500", "400"],
+                "totalShareholderEquity": ["1000", "800"],
+            }
+        )
+        return frame, None
+
+
+def test_fundamentals_history_cached_per_period(tmp_path, monkeypatch):
+    fake = FakeAV()
+    monkeypatch.setattr(async_data, "_av_client", lambda: fake)
+    monkeypatch.setattr(
+        async_data,
+        "PROVIDER_LIMITS",
+        {"alphavantage": async_data.ProviderLimits(concurrency=3, rate=1000.0, burst=10)},
+    )
+    path = str(tmp_path / "p.db")
+
+    df = asyncio.run(async_data.fetch_fundamentals(["AAA"], path, ttl_days=100_000))
+    assert len(fake.calls) == 3
+    assert list(df["date"]) == list(pd.to_datetime(["2022-12-31", "2023-12-31", "2024-03-31"]))
+    old, annual, ttm = df.iloc[0], df.iloc[1], df.iloc[2]
+    assert old["roe"] == 0.1 and old["debt_equity"] == 0.5
+    # the annual row keeps its statement ratios; TTM values get their own row
+    assert annual["roe"] == 0.1 and annual["profit_margin"] == 0.1
+    assert ttm["roe"] == 0.2 and ttm["profit_margin"] == 0.15
+    assert ttm["rd_to_rev"] == annual["rd_to_rev"] == 0.06
+
+    again = asyncio.run(async_data.fetch_fundamentals(["AAA"], path, ttl_days=100_000))
+    assert len(fake.calls) == 3
+    pd.testing.assert_frame_equal(again, df)
@@ -0,0 +1,82 @@
+from datetime import datetime
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src import db, ledger
+
+
+def test_book_trade_buffers_until_flush(tmp_path):
+    path = str(tmp_path / "p.db")
+    book = ledger.Ledger(path, batch_size=10)
+    book.book_trade(datetime(2024, 1, 1), "AAA", 2, 10.0, fee=1.0)
+    book.book_trade(datetime(2024, 1, 8), "AAA", 2, 12.0)
+    book.book_trade(datetime(2024, 1, 8), "BBB", 1, 5.0)
+
+    assert book.nav() == 4 * 12.0 + 5.0
+    assert book.last_ticker() == "BBB"
+    cur = db.cursor(path)
+    assert cur.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 0
+
+    book.close()
+    assert cur.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 3
+    cost = cur.execute(
+        "SELECT cost_basis FROM positions WHERE ticker = 'AAA' ORDER BY ts DESC LIMIT 1"
+    ).fetchone()[0]
+    assert cost == (2 * 10.0 + 1.0 + 2 * 12.0) / 4
+
+
+def test_state_reloaded_on_open(tmp_path):
+    path = str(tmp_path / "p.db")
+    with ledger.Ledger(path) as book:
+        book.book_trade(datetime(2024, 1, 1), "AAA", 1, 10.0)
+        book.book_trade(datetime(2024, 1, 8), "BBB", 3, 20.0)
+
+    book = ledger.Ledger(path, batch_size=1)
+    assert book.nav() == 70.0
+    assert book.last_ticker() == "BBB"
+    book.book_trade(datetime(2024, 1, 15), "AAA", 1, 11.0)
+    assert book.nav() == 2 * 11.0 + 60.0
+    assert db.cursor(path).execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 3
+
+
+def test_duplicate_trade_rejected_before_state_changes(tmp_path):
+    path = str(tmp_path / "p.db")
+    with ledger.Ledger(path) as book:
+        book.book_trade(datetime(2024, 1, 1), "AAA", 1, 10.0)
+
+    book = ledger.Ledger(path)
+    book.book_trade(datetime(2024, 1, 2), "AAA", 1, 11.0)
+    for ts in (datetime(2024, 1, 1), datetime(2024, 1, 2)):
+        with pytest.raises(ValueError):
+            book.book_trade(ts, "AAA", 5, 12.0)
+    assert book.holdings()["AAA"] == 2
+    book.close()
+    assert db.cursor(path).execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 2
+
+
+def test_daily_nav_marks_to_market(tmp_path):
+    book = ledger.Ledger(str(tmp_path / "p.db"))
+    book.book_trade(datetime(2024, 1, 2, 16), "AAA", 2, 10.0)
+    book.book_trade(datetime(2024, 1, 4, 16), "BBB", 1, 50.0)
+    book.book_trade(datetime(2024, 1, 4, 16), "AAA", 1, 12.0)
+    prices = pd.DataFrame(
+        {"AAA": [9.0, 10.0, 11.0, 12.0, 13.0], "BBB": [float("nan"), 48.0, 49.0, 50.0, 51.0]},
+        index=pd.date_range("2024-01-01", periods=5),
+    )
+    meo = pd.Series(2.0, index=prices.index)
+
+    curve = book.daily_nav(prices, meo)
+    assert list(curve["nav"]) == [0.0, 20.0, 22.0, 3 * 12.0 + 50.0, 3 * 13.0 + 51.0]
+    assert list(curve["nav_meo"]) == list(curve["nav"] / 2.0)
+
+
+def test_book_trade_quantises_float_quantity(tmp_path):
+    book = ledger.Ledger(str(tmp_path / "p.db"))
+    book.book_trade(datetime(2024, 1, 1), "AAA", 0.30000000000000004, 10.0)
+    book.book_trade(datetime(2024, 1, 2), "AAA", 1.23456, 10.0)
+    assert book.holdings()["AAA"] == 0.3 + 1.2346
+    book.close()
@@ -0,0 +1,79 @@
+import asyncio
+import sys
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src import async_data, db, meo
+
+
+def test_meo_history_only_fetches_missing_dates(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_history(dates):
+        idx = pd.DatetimeIndex(dates)
+        calls.append(list(idx))
+        mc = pd.DataFrame({"USD": 600.0, "XAU": 400.0}, index=idx)
+        mc.index.name = "date"
+        return mc, mc.sum(axis=1)
+
+    monkeypatch.setattr(async_data.meo, "fetch_meo_history", fake_history)
+    monkeypatch.setattr(async_data.meo, "component_requests", lambda start, end=None: [])
+    path = str(tmp_path / "p.db")
+
+    first = asyncio.run(
+        async_data.fetch_meo_history(pd.date_range("2024-01-01", "2024-01-03"), path)
+    )
+    second = asyncio.run(
+        async_data.fetch_meo_history(pd.date_range("2024-01-02", "2024-01-05"), path)
+    )
+
+    assert (first == 1000.0 * 1e-6).all()
+    assert (second == 1000.0 * 1e-6).all()
+    assert calls[1] == list(pd.to_datetime(["2024-01-04", "2024-01-05"]))
+
+    con = db.cursor(path)
+    rows = con.execute("SELECT COUNT(*), SUM(weight) FROM benchmarks").fetchone()
+    assert rows[0] == 10
+    assert abs(rows[1] - 5.0) < 1e-9
+
+
+def test_series_cache_reuses_covering_range(tmp_path):
+    calls = []
+
+    def loader(code, start, end):
+        calls.append((code, start, end))
+        return pd.Series(1.0, index=pd.date_range(start, end))
+
+    cache = meo.SeriesCache(maxsize=2, directory=tmp_path)
+    cache.get("fred", "A", date(2024, 1, 1), date(2024, 12, 31), loader)
+    cache.get("fred", "A", date(2024, 3, 1), date(2024, 6, 30), loader)
+    assert len(calls) == 1
+
+    cache.get("fred", "B", date(2024, 1, 1), date(2024, 12, 31), loader)
+    cache.get("fred", "C", date(2024, 1, 1), date(2024, 12, 31), loader)
+    assert len(calls) == 3
+    assert ("fred", "A", date(2024, 1, 1), date(2024, 12, 31)) not in cache._entries
+
+    fresh = meo.SeriesCache(directory=tmp_path)
+    s = fresh.get("fred", "A", date(2024, 2, 1), date(2024, 2, 29), loader)
+    assert len(calls) == 3
+    assert len(s) == 366
+
+
+def test_fred_series_as_of_lookup(monkeypatch):
+    meo.clear_cache()
+    calls = []
+
+    def fake_history(code, start, end):
+        calls.append(code)
+        index = pd.to_datetime(["2023-01-01", "2023-02-01", "2023-03-01"])
+        return pd.Series([1.0, 2.0, 3.0], index=index)
+
+    monkeypatch.setattr(meo, "_fred_history", fake_history)
+    assert meo._fred_series("X", date(2023, 2, 15)) == 2.0
+    assert meo._fred_series("X", date(2023, 3, 10)) == 3.0
+    assert meo._fred_series("X", date(2023, 6, 1)) is None
+    assert calls == ["X"]
@@ -0,0 +1,65 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src import meo
+
+
+def _components():
+    return pd.DataFrame(
+        {
+            "mc_native": [100.0, 50.0, 30.0, 20.0],
+            "fx_usd": [1.0, 1.1, 1.0, 1.0],
+            "mc_usd": [100.0, 55.0, 30.0, 20.0],
+        },
+        index=pd.Index(["USD", "EUR", "BTC", "XAU"], name="symbol"),
+    )
+
+
+def test_incremental_updates_match_full_recompute():
+    live = meo.StreamingMEO.from_components(_components())
+    assert live.m_world == 205.0
+    live.set_fx("EUR", 1.2)
+    live.set_cap("BTC", 45.0)
+    live.set_m2("USD", 110.0)
+    live.set_cap("XAU", None)
+
+    expected = pd.Series({"USD": 110.0, "EUR": 60.0, "BTC": 45.0})
+    assert abs(live.m_world - expected.sum()) < 1e-9
+    assert abs(live.price - meo.meo_price_usd(expected.sum())) < 1e-15
+    pd.testing.assert_series_equal(
+        live.weights(), (expected / expected.sum()).sort_index(), check_exact=False
+    )
+    assert live.weight("XAU") == 0.0
+
+
+def test_stream_emits_price_after_each_update():
+    live = meo.StreamingMEO.from_components(_components())
+
+    async def main():
+        stream = live.stream()
+        seen = [await stream.__anext__()]
+        live.set_cap("BTC", 40.0)
+        live.set_fx("EUR", 1.0)
+        seen.append(await stream.__anext__())
+        seen.append(await stream.__anext__())
+        await stream.aclose()
+        return seen
+
+    seen = asyncio.run(main())
+    assert seen == pytest.approx([205e-6, 215e-6, 210e-6])
+    assert live._subscribers == []
+
+
+def test_weights_are_nan_without_components():
+    live = meo.StreamingMEO({})
+    assert live.weights().empty and pd.isna(live.weight("USD"))
+    live.set_cap("BTC", 10.0)
+    live.set_cap("BTC", None)
+    assert live.m_world == 0.0
+    live = meo.StreamingMEO({"USD": 0.0})
+    assert live.weights().isna().all()
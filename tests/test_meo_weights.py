@@ -32,3 +32,45 @@ def test_cross_price():
     result = meo.meo_cross_price(10.0, 2.0)
     assert result == 5.0
     assert pd.isna(meo.meo_cross_price(10.0, 0.0))
+
+
+def test_meo_history_matches_single_date(monkeypatch):
+    meo.clear_cache()
+    obs = pd.Series(100.0, index=pd.to_datetime(["2023-12-01", "2024-01-01"]))
+
+    monkeypatch.setattr(meo, "_fred_series", lambda code, as_of: 100.0)
+    monkeypatch.setattr(meo, "_fx_rate", lambda sym, as_of: 1.0)
+    monkeypatch.setattr(meo, "_crypto_caps", lambda as_of: {"BTC": 50.0, "ETH": 30.0})
+    monkeypatch.setattr(meo, "_fred_history", lambda code, start, end: obs)
+    monkeypatch.setattr(
+        meo,
+        "_fx_history",
+        lambda sym, start, end: pd.Series(1.0, index=pd.date_range("2023-12-25", "2024-01-10")),
+    )
+
+    dates = pd.date_range("2024-01-02", "2024-01-05")
+    mc, m_world = meo.fetch_meo_history(dates)
+    df, expected = meo.fetch_meo_components(date(2024, 1, 2))
+    assert list(mc.columns) == list(df.index)
+    assert (m_world == expected).all()
+    weights = mc.div(m_world, axis=0)
+    assert ((weights.sum(axis=1) - 1).abs() < 1e-9).all()
+
+
+def test_meo_history_drops_stale_series(monkeypatch):
+    meo.clear_cache()
+    monkeypatch.setattr(meo, "_crypto_caps", lambda as_of: {})
+    monkeypatch.setattr(
+        meo,
+        "_fred_history",
+        lambda code, start, end: pd.Series(100.0, index=pd.to_datetime(["2024-01-01"])),
+    )
+    monkeypatch.setattr(
+        meo, "_fx_history", lambda sym, start, end: pd.Series(dtype=float)
+    )
+
+    mc, m_world = meo.fetch_meo_history(pd.to_datetime(["2024-02-01", "2024-04-01"]))
+    assert mc.loc["2024-02-01", "USD"] == 100.0
+    assert pd.isna(mc.loc["2024-02-01", "EUR"])
+    assert pd.isna(mc.loc["2024-04-01", "USD"])
+    assert m_world.loc["2024-04-01"] == 0
@@ -2,6 +2,7 @@ import importlib.util
 import sys
 from pathlib import Path
 import numpy as np
+import pandas as pd
 import pytest
 
 SRC = Path(__file__).resolve().parents[1] / "src" / "metior.py"
@@ -26,3 +27,26 @@ def test_evt_fit_lambda():
     assert evt.lambda_ > 0
 
 
+def test_evt_fit_rolling_matches_fit():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.standard_t(4, (80, 2)), columns=["a", "b"])
+    evt = metior.EVTThreshold(0.95)
+    rolled = evt.fit_rolling(df, 50, tail="left")
+    assert rolled.iloc[:49].isna().all().all()
+    for row in (49, 79):
+        for col in df.columns:
+            expected = metior.EVTThreshold(0.95).fit(df[col].iloc[row - 49 : row + 1], "left")
+            assert np.isclose(rolled.iloc[row][col], expected, rtol=1e-2)
+
+
+def test_evt_fit_rolling_keeps_lambda():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame(rng.standard_t(4, (60, 2)), columns=["a", "b"])
+    evt = metior.EVTThreshold(0.95)
+    evt.fit_rolling(df, 40)
+    with pytest.raises(AttributeError):
+        evt.lambda_
+    evt.fit(df["a"])
+    fitted = evt.lambda_
+    evt.fit_rolling(df, 40)
+    assert evt.lambda_ == fitted
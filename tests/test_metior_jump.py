@@ -20,4 +20,22 @@ def test_jump_variance():
     assert abs(emp_var - theo_var) / theo_var < 0.01
 
 
+def test_sample_seeded_and_chunked():
+    jd = metior.JumpDiffusionProcess(0.01, 0.1, 0.3, -0.02, 0.05)
+    a = jd.sample(50, 1.0, rng=7, paths=200)
+    b = jd.sample(50, 1.0, rng=np.random.default_rng(7), paths=200)
+    assert a.shape == (51, 200)
+    assert np.array_equal(a, b)
 
+    chunked = jd.sample(50, 1.0, rng=7, paths=200, max_bytes=200 * 24 * 8)
+    assert chunked.shape == a.shape and np.allclose(chunked[0], 1.0)
+    blocks = list(jd.sample_chunks(50, np.ones(200), chunk=8, rng=7))
+    assert np.allclose(np.concatenate(blocks), chunked[1:])
+
+
+def test_sample_float32_moments():
+    jd = metior.JumpDiffusionProcess(0.0, 0.1, 0.2, 0.0, 0.05)
+    path = jd.sample(20, 0.0, rng=3, paths=50000, dtype=np.float32)
+    assert path.dtype == np.float32
+    theo_var = 20 * (jd.sigma**2 + jd.lam * (jd.jump_mu**2 + jd.jump_delta**2)) * jd.dt
+    assert abs(path[-1].var() - theo_var) / theo_var < 0.03
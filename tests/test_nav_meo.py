@@ -18,3 +18,18 @@ def test_nav_meo_basic(tmp_path):
     meo_usd = 10.0
     nav = book.nav_meo(prices, meo_usd)
     assert nav == Decimal("5")
+
+
+def test_nav_meo_series_matches_scalar(tmp_path):
+    book = ledger.Ledger(str(tmp_path / "p.db"))
+    book.book_trade(datetime(2024, 1, 1), "AAA", Decimal("1.5"), 10.0)
+    book.book_trade(datetime(2024, 1, 1), "BBB", Decimal("2"), 20.0)
+    panel = pd.DataFrame(
+        {"AAA": [10.0, 11.0, 12.0], "BBB": [20.0, 19.0, 21.0], "CCC": [5.0, 5.0, 5.0]},
+        index=pd.date_range("2024-01-01", periods=3),
+    )
+    meo = pd.Series([10.0, 0.0, 12.5], index=panel.index)
+    series = book.nav_meo_series(panel, meo)
+    for d in panel.index:
+        assert abs(series[d] - float(book.nav_meo(panel.loc[d], meo[d]))) < 1e-12
+    assert series.iloc[1] == 0.0
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src import ledger, risk
+
+
+def _prices(n=260, tickers=("A", "B")):
+    rng = np.random.default_rng(7)
+    idx = pd.bdate_range("2024-01-01", periods=n)
+    data = {t: 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))) for t in tickers}
+    return pd.DataFrame(data, index=idx)
+
+
+def test_online_sigma_matches_batch_estimators():
+    close = _prices()
+    fx = pd.Series(np.random.default_rng(8).normal(0, 0.004, len(close)), index=close.index)
+    online = risk.OnlineRisk(window=20)
+    online.catch_up(close, fx)
+
+    realised = online.sigma("std")
+    ewma = online.sigma("ewma")
+    betas = online.fx_beta()
+    for t in close.columns:
+        assert np.isclose(realised[t], risk.realised_sigma(close[t], 20).iloc[-1])
+        r = np.log(close[t]).diff().dropna()
+        var = r.iloc[0] ** 2
+        for x in r.iloc[1:]:
+            var = 0.94 * var + 0.06 * x**2
+        assert np.isclose(ewma[t], np.sqrt(var))
+        assert np.isclose(betas[t], risk.fx_beta(np.log(close[t]).diff(), fx))
+
+
+def test_online_garch_matches_engine():
+    close = _prices()
+    panel = pd.concat({"adj_close": close}, axis=1).swaplevel(axis=1)
+    day0, day1 = close.index[200], close.index[205]
+    engine = risk.GarchSigmaEngine("incremental", refit_freq="Y")
+    engine.sigma(panel, day0)
+    expected = engine.sigma(panel, day1)
+
+    online = risk.OnlineRisk(refit_freq="Y")
+    online.catch_up(close.loc[:day0])
+    online.catch_up(close.loc[:day1])
+    assert np.allclose(online.sigma("garch")[expected.index], expected)
+
+
+def test_online_state_round_trips_through_ledger(tmp_path):
+    close = _prices()
+    head, tail = close.iloc[:200], close
+    online = risk.OnlineRisk(window=20, refit_freq="Y")
+    online.catch_up(head)
+
+    book = ledger.Ledger(str(tmp_path / "p.db"))
+    book.save_risk_state(online.to_frame(), "MEΩ")
+    resumed = risk.OnlineRisk.from_frame(book.risk_state("MEΩ"), 20, refit_freq="Y")
+    assert book.risk_state("USD").empty
+    book.close()
+
+    online.catch_up(tail)
+    resumed.catch_up(tail)
+    for method in ("garch", "ewma", "std"):
+        pd.testing.assert_series_equal(
+            resumed.sigma(method).sort_index(), online.sigma(method).sort_index()
+        )
+
+
+def test_risk_state_saved_on_in_memory_ledger():
+    online = risk.OnlineRisk(window=20)
+    online.catch_up(_prices(n=40))
+    book = ledger.Ledger(":memory:")
+    book.save_risk_state(online.to_frame(), "MEΩ")
+    book.save_risk_state(online.to_frame(), "MEΩ")
+    stored = book.risk_state("MEΩ")
+    assert sorted(stored["ticker"]) == ["A", "B"]
+
+
+def test_saving_risk_state_prunes_dropped_tickers():
+    online = risk.OnlineRisk(window=20)
+    online.catch_up(_prices(n=40, tickers=("A", "B", "C")))
+    book = ledger.Ledger(":memory:")
+    book.save_risk_state(online.to_frame(), "MEΩ")
+    book.save_risk_state(online.to_frame(), "USD")
+    kept = online.to_frame()
+    book.save_risk_state(kept[kept["ticker"] != "B"], "MEΩ")
+    assert sorted(book.risk_state("MEΩ")["ticker"]) == ["A", "C"]
+    assert sorted(book.risk_state("USD")["ticker"]) == ["A", "B", "C"]
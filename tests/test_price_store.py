@@ -0,0 +1,60 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src import async_data
+
+
+def _fake_yahoo(calls, scale):
+    def fake_download(ticker, start, end):
+        calls.append((ticker, start, end))
+        days = pd.bdate_range(start, end, inclusive="left")
+        return pd.DataFrame(
+            {
+                "date": days.date,
+                "ticker": ticker,
+                "adj_close": [float(d.day) * scale[ticker] for d in days],
+                "volume": 1000.0,
+            }
+        )
+
+    return fake_download
+
+
+def test_fetch_prices_only_downloads_missing_tail(tmp_path, monkeypatch):
+    calls = []
+    fake_download = _fake_yahoo(calls, {"AAA": 1.0, "BBB": 1.0})
+    monkeypatch.setattr(async_data, "_download_prices", fake_download)
+    path = str(tmp_path / "p.db")
+
+    first = asyncio.run(async_data.fetch_prices(["AAA", "BBB"], "2024-01-01", "2024-01-15", path))
+    assert len(calls) == 2
+    calls.clear()
+    second = asyncio.run(async_data.fetch_prices(["AAA", "BBB"], "2024-01-01", "2024-01-22", path))
+
+    assert {c[1].isoformat() for c in calls} == {"2024-01-12"}
+    assert list(second.columns.get_level_values(0).unique()) == ["AAA", "BBB"]
+    pd.testing.assert_frame_equal(second.loc[: "2024-01-12"], first)
+    assert second[("AAA", "adj_close")].iloc[-1] == 19.0
+
+
+def test_fetch_prices_refetches_readjusted_history(tmp_path, monkeypatch):
+    calls = []
+    scale = {"AAA": 1.0, "BBB": 1.0}
+    monkeypatch.setattr(async_data, "_download_prices", _fake_yahoo(calls, scale))
+    path = str(tmp_path / "p.db")
+
+    asyncio.run(async_data.fetch_prices(["AAA", "BBB"], "2024-01-08", "2024-01-15", path))
+    scale["AAA"] = 0.5  # dividend re-adjusts the whole AAA history
+    calls.clear()
+    panel = asyncio.run(
+        async_data.fetch_prices(["AAA", "BBB"], "2024-01-01", "2024-01-22", path)
+    )
+
+    assert ("AAA", pd.Timestamp("2024-01-01").date(), pd.Timestamp("2024-01-22").date()) in calls
+    days = panel.index.day.to_numpy(dtype=float)
+    assert list(panel[("AAA", "adj_close")]) == list(days * 0.5)
+    assert list(panel[("BBB", "adj_close")]) == list(days)
@@ -1,15 +1,10 @@
 import numpy as np
 import pandas as pd
-import importlib.util
 from pathlib import Path
 import sys
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
-
-SRC = Path(__file__).resolve().parents[1] / "src" / "risk.py"
-spec = importlib.util.spec_from_file_location("risk", SRC)
-risk = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(risk)
+from src import risk
 
 def test_garch_sigma_positive_finite():
     np.random.seed(0)
@@ -24,3 +19,161 @@ def test_slipped_cost():
     from src.risk import slipped_cost
     assert round(slipped_cost(100000, 500000), 5) == 0.00045  # ~4.47bp
     assert slipped_cost(0, 1000000) == 0.0  # Zero case
+
+
+def _price_panel(n=300, tickers=("A", "B")):
+    rng = np.random.default_rng(1)
+    idx = pd.bdate_range("2024-01-01", periods=n)
+    cols = {}
+    for t in tickers:
+        px = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+        cols[(t, "adj_close")] = px
+        cols[(t, "volume")] = np.full(n, 1e6)
+    return pd.DataFrame(cols, index=idx)
+
+
+def test_garch_engine_matches_refit_on_refit_dates():
+    prices = _price_panel()
+    denom = pd.Series(1.0, index=prices.index)
+    exact = risk.GarchSigmaEngine("refit")
+    inc = risk.GarchSigmaEngine("incremental", refit_freq="M")
+    period = None
+    for d in [d for d in prices.index[100:] if d.weekday() == 4]:
+        s_inc = inc.sigma(prices, d, denom)
+        assert list(s_inc.index) == ["A", "B"]
+        assert (s_inc > 0).all() and np.isfinite(s_inc).all()
+        if d.to_period("M") != period:
+            # first rebalance of a period refits, so both modes agree
+            assert np.allclose(s_inc, exact.sigma(prices, d, denom), rtol=1e-2)
+        period = d.to_period("M")
+
+
+def test_garch_engine_extends_recursion():
+    prices = _price_panel()
+    denom = pd.Series(1.0, index=prices.index)
+    engine = risk.GarchSigmaEngine(refit_freq="Y")
+    d0, d1 = prices.index[150], prices.index[155]
+    engine.sigma(prices, d0, denom)
+    state = engine._state["A"]
+    omega, alpha, beta = state.params
+    sigma2, last = state.sigma2, state.last_ret
+    r = np.log(prices["A"]["adj_close"]).diff().loc[d0:d1].iloc[1:] * 100
+    for ret in r:
+        sigma2 = omega + alpha * last**2 + beta * sigma2
+        last = ret
+    sigma = engine.sigma(prices, d1, denom)
+    assert np.isclose(sigma["A"], np.sqrt(sigma2) / 100)
+
+
+def test_realised_sigma_panel_matches_per_ticker():
+    prices = _price_panel()
+    adj = prices.xs("adj_close", level=1, axis=1)
+    denom = pd.Series(np.linspace(1.0, 1.2, len(adj)), index=adj.index)
+    panel = risk.realised_sigma_panel(adj, 20, denom)
+    date = adj.index[200]
+    for t in adj.columns:
+        series = adj[t].loc[:date]
+        expected = risk.realised_sigma(series, 20, denom.loc[series.index]).iloc[-1]
+        assert np.isclose(panel.at[date, t], expected)
+
+
+def test_garch_sigma_batch_matches_single_fits():
+    prices = _price_panel(n=200)
+    adj = prices.xs("adj_close", level=1, axis=1)
+    full = risk.garch_sigma_batch(adj, workers=1)
+    for t in adj.columns:
+        expected = risk.garch_sigma(adj[t])
+        assert np.allclose(full[t], expected, equal_nan=True)
+
+    dates = [adj.index[120], adj.index[199]]
+    per_date = risk.garch_sigma_batch(adj, dates, workers=2)
+    exact = risk.GarchSigmaEngine("refit")
+    for d in dates:
+        assert np.allclose(per_date.loc[d], exact.sigma(prices, d)[adj.columns])
+
+
+def test_garch_sigma_batch_short_history_is_nan():
+    adj = _price_panel(n=10).xs("adj_close", level=1, axis=1)
+    out = risk.garch_sigma_batch(adj, [adj.index[-1]], workers=1)
+    assert out.isna().all().all()
+
+
+def _simulate_garch(n, omega, alpha, beta, seed):
+    rng = np.random.default_rng(seed)
+    r = np.empty(n)
+    s2 = omega / (1 - alpha - beta)
+    for t in range(n):
+        r[t] = np.sqrt(s2) * rng.standard_normal()
+        s2 = omega + alpha * r[t] ** 2 + beta * s2
+    return r
+
+
+def test_garch11_fit_matches_arch():
+    r = np.column_stack(
+        [
+            _simulate_garch(1500, 0.05, 0.08, 0.90, 2),
+            _simulate_garch(1500, 0.10, 0.12, 0.80, 3),
+        ]
+    )
+    r[:40, 1] = np.nan  # later listing
+    params = risk.garch11_fit(r)
+    sigma2 = risk.garch11_filter(r, params)
+    for j in range(r.shape[1]):
+        col = pd.Series(r[:, j]).dropna()
+        res = risk._fit_garch(col)
+        assert np.allclose(params[j], np.asarray(res.params), atol=2e-2)
+        ours = sigma2[np.isfinite(r[:, j]), j]
+        assert np.allclose(np.sqrt(ours), res.conditional_volatility, rtol=2e-2)
+    assert np.isnan(sigma2[:40, 1]).all()
+
+
+def test_garch11_kernels_agree():
+    rng = np.random.default_rng(4)
+    r = rng.normal(0, 1, (200, 3))
+    r[5, 2] = np.nan
+    valid = np.isfinite(r)
+    r = np.where(valid, r, 0.0)
+    omega, alpha, beta = np.full(3, 0.05), np.full(3, 0.1), np.full(3, 0.85)
+    backcast = risk._garch_backcast(r, valid)
+    a = risk._garch_kernel_numpy(r, valid, omega, alpha, beta, backcast)
+    b = risk._garch_kernel_loops(r, valid, omega, alpha, beta, backcast)
+    for x, y in zip(a, b):
+        assert np.allclose(x, y, equal_nan=True)
+
+
+def test_garch_np_sigma_short_history_is_nan():
+    adj = _price_panel(n=10).xs("adj_close", level=1, axis=1)
+    out = risk.garch_np_sigma(adj, [adj.index[-1]])
+    assert out.isna().all().all()
+
+
+def _returns_panel(n=120):
+    rng = np.random.default_rng(5)
+    idx = pd.bdate_range("2024-01-01", periods=n)
+    return pd.DataFrame(rng.standard_t(4, (n, 3)) * 0.01, index=idx, columns=["A", "B", "C"])
+
+
+def test_rolling_cvar_matches_single_window():
+    rets = _returns_panel()
+    rets.iloc[50, 2] = np.nan
+    panel = risk.rolling_cvar(rets, 40, 0.95)
+    assert panel.iloc[:39].isna().all().all()
+    for row in (39, 80, 119):
+        for t in ("A", "B"):
+            expected = risk.cvar(rets[t].iloc[row - 39 : row + 1], 0.95)
+            assert np.isclose(panel.iloc[row][t], expected)
+    assert np.isnan(panel.iloc[60]["C"]) and np.isfinite(panel.iloc[100]["C"])
+
+
+def test_rolling_fx_beta_matches_single_window():
+    rets = _returns_panel()
+    fx = pd.Series(np.random.default_rng(6).normal(0, 0.005, len(rets)), index=rets.index)
+    rets = rets.add(0.5 * fx, axis=0)
+    rets.iloc[70, 0] = np.nan
+    panel = risk.rolling_fx_beta(rets, fx, 60, min_periods=50)
+    for row in (59, 90, 119):
+        for t in rets.columns:
+            window = slice(row - 59, row + 1)
+            expected = risk.fx_beta(rets[t].iloc[window], fx.iloc[window])
+            assert np.isclose(panel.iloc[row][t], expected)
+    assert panel.iloc[:49].isna().all().all()
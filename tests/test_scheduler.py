@@ -0,0 +1,104 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src import async_data
+
+FAST = async_data.ProviderLimits(concurrency=2, rate=1000.0, burst=10, retries=2, backoff=0.001)
+
+
+def test_identical_requests_are_coalesced():
+    calls = []
+
+    def slow(x):
+        calls.append(x)
+        time.sleep(0.05)
+        return x * 2
+
+    async def main():
+        sched = async_data.FetchScheduler({"test": FAST})
+        results = await asyncio.gather(*[sched.run("test", "k", slow, 21) for _ in range(5)])
+        return results, sched.metrics()
+
+    results, metrics = asyncio.run(main())
+    assert results == [42] * 5
+    assert calls == [21]
+    assert metrics.loc["test", "coalesced"] == 4
+
+
+def test_concurrency_cap_and_retries():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+    failures = {"n": 0}
+
+    def work(i):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        if i == 0 and failures["n"] < 2:
+            failures["n"] += 1
+            raise TimeoutError("flaky")
+        return i
+
+    async def main():
+        sched = async_data.FetchScheduler({"test": FAST})
+        results = await asyncio.gather(*[sched.run("test", i, work, i) for i in range(6)])
+        return results, sched.metrics()
+
+    results, metrics = asyncio.run(main())
+    assert results == list(range(6))
+    assert peak <= FAST.concurrency
+    assert metrics.loc["test", "retries"] == 2
+    assert metrics.loc["test", "completed"] == 6
+    assert metrics.loc["test", "queued"] == 0
+
+
+def test_exhausted_retries_raise():
+    def broken():
+        raise TimeoutError("down")
+
+    async def main():
+        sched = async_data.FetchScheduler({"test": FAST})
+        with pytest.raises(TimeoutError):
+            await sched.run("test", None, broken)
+        return sched.metrics()
+
+    metrics = asyncio.run(main())
+    assert metrics.loc["test", "failed"] == 1
+
+
+def test_only_transient_errors_are_retried():
+    calls = []
+
+    def bug():
+        calls.append(1)
+        raise KeyError("programming error")
+
+    class Throttled(Exception):
+        code = 429
+
+    def throttled():
+        calls.append(2)
+        raise Throttled()
+
+    async def main():
+        sched = async_data.FetchScheduler({"test": FAST})
+        with pytest.raises(KeyError):
+            await sched.run("test", None, bug)
+        with pytest.raises(Throttled):
+            await sched.run("test", None, throttled)
+        return sched.metrics()
+
+    metrics = asyncio.run(main())
+    assert calls == [1] + [2] * (FAST.retries + 1)
+    assert metrics.loc["test", "retries"] == FAST.retries
@@ -2,11 +2,32 @@ import pandas as pd
 import importlib.util
 from pathlib import Path
 
+import duckdb
+import numpy as np
+import pytest
+import yaml
+
 SRC = Path(__file__).resolve().parents[1] / "src" / "score.py"
 spec = importlib.util.spec_from_file_location("score", SRC)
 score = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(score)
 
+
+def _fundamentals(n=200):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "roe": rng.uniform(0, 0.3, n),
+            "debt_equity": rng.uniform(0, 2, n),
+            "profit_margin": rng.uniform(0, 0.3, n),
+            "insider_own": rng.uniform(0, 0.05, n),
+            "rd_to_rev": rng.uniform(0, 0.1, n),
+        }
+    )
+    df.iloc[::17, 0] = float("nan")
+    return df
+
+
 def test_apply_scores_vector():
     df = pd.DataFrame({
         "roe": [0.15, 0.1, 0.15],
@@ -18,3 +39,50 @@ def test_apply_scores_vector():
     expected = pd.Series([100, 30, 65], index=list("ABC"))
     result = score.apply_scores(df)
     pd.testing.assert_series_equal(result, expected)
+
+
+def test_missing_factors_count_as_zero():
+    df = _fundamentals(5).drop(columns="rd_to_rev")
+    filled = score.apply_scores(df)
+    pd.testing.assert_series_equal(filled, score.apply_scores(df.assign(rd_to_rev=0.0)))
+    assert score.durability_score(pd.Series({"roe": 0.2})) == 60
+    with pytest.raises(KeyError):
+        score.apply_scores(df, fill_missing=False)
+    with pytest.raises(KeyError):
+        score.DEFAULT_RULES.score(df)
+
+
+def test_rules_from_config_match_defaults():
+    cfg = yaml.safe_load((Path(__file__).resolve().parents[1] / "config.yml").read_text())
+    rules = score.RuleSet.from_config(cfg)
+    assert rules == score.DEFAULT_RULES
+    assert score.RuleSet.from_config({}) is score.DEFAULT_RULES
+    df = _fundamentals()
+    pd.testing.assert_series_equal(score.apply_scores(df, rules), score.apply_scores(df))
+    for i in (0, 5, 17):
+        assert score.durability_score(df.iloc[i]) == score.apply_scores(df).iloc[i]
+
+
+def test_score_variants_and_sql():
+    df = _fundamentals()
+    strict = score.RuleSet.from_config(
+        {
+            "durability": {
+                "base": 20,
+                "rules": [
+                    {"factor": "roe", "op": ">=", "threshold": 0.2, "points": 40},
+                    {"factor": "debt_equity", "op": "<", "threshold": 1.0, "points": 30},
+                ],
+                "penalties": [{"when": [["insider_own", "<", 0.01]], "points": 25}],
+            }
+        }
+    )
+    variants = score.score_variants(df, {"default": score.DEFAULT_RULES, "strict": strict})
+    pd.testing.assert_series_equal(variants["default"], score.apply_scores(df), check_names=False)
+    pd.testing.assert_series_equal(variants["strict"], strict.score(df), check_names=False)
+
+    con = duckdb.connect()
+    con.register("f", df)
+    for rules in (score.DEFAULT_RULES, strict):
+        sql = con.execute(f"SELECT {rules.sql()} AS s FROM f").df()["s"]
+        assert (sql.to_numpy() == rules.score(df).to_numpy()).all()
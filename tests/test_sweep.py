@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src import backtest, denom, sweep
+
+
+def _inputs():
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2024-01-01", periods=120)
+    tickers = ["AAA", "BBB", "CCC"]
+    close = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(idx), 3)), axis=0)),
+        index=idx,
+        columns=tickers,
+    )
+    volume = pd.DataFrame(1e6, index=idx, columns=tickers)
+    prices = pd.concat({"adj_close": close, "volume": volume}, axis=1)
+    prices = prices.swaplevel(axis=1).sort_index(axis=1)
+    rebalance = [d for d in idx[70:] if d.weekday() == 4]
+    scores = {d: pd.Series([80.0, 60.0, 40.0], index=tickers) for d in rebalance}
+    meo = pd.Series(np.linspace(1.0, 1.1, len(idx)), index=idx)
+    chf = denom.Denominator(pd.Series(1.1, index=idx), "CHF")
+    return backtest.BacktestInputs(prices, meo, scores, rebalance, numeraires={"CHF": chf})
+
+
+def test_expand_grid():
+    grid = sweep.expand_grid({"a": [1, 2], "b": ["x", "y", "z"]})
+    assert len(grid) == 6
+    assert grid[0] == {"a": 1, "b": "x"}
+
+
+def test_sweep_matches_serial_runs():
+    inputs = _inputs()
+    cfg = {"sigma_method": "std", "weekly_buy": 100}
+    grid = {"risk_window": [10, 21], "denom": ["CHF", "MEΩ"]}
+    result = sweep.run_sweep(inputs, cfg, grid, workers=2)
+    assert len(result) == 4
+    for row in result.to_dict("records"):
+        overrides = {"risk_window": row["risk_window"], "denom": row["denom"]}
+        expected = sweep.run_config(inputs, cfg, overrides)
+        assert row["final_nav"] == expected["final_nav"]
+        assert row["final_nav_usd"] == expected["final_nav_usd"]
+        assert row["nav_unit"] == row["denom"]
+        assert row["n_trades"] == expected["n_trades"] > 0
+
+
+def test_load_wraps_memmaps_without_copy(tmp_path):
+    inputs = _inputs()
+    loaded = sweep._load(sweep._dump(inputs, tmp_path))
+    for field in ("adj_close", "volume"):
+        data = base = loaded.panel(field).to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        assert base is not None
+        assert np.array_equal(data, inputs.panel(field).to_numpy())